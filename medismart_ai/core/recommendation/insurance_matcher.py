@@ -1,9 +1,40 @@
 
 # core/recommendation/insurance_matcher.py
+from dataclasses import dataclass, asdict
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+@dataclass(frozen=True)
+class CoverageInfo:
+    """Insurance coverage for a single medication"""
+    # Explicit slots: dataclass(slots=True) needs Python 3.10
+    __slots__ = ('covered', 'tier', 'coverage_percentage', 'copay', 'prior_authorization')
+    
+    covered: bool
+    tier: int
+    coverage_percentage: int
+    copay: int
+    prior_authorization: bool
+
+# Mock coverage data, shared read-only across calls
+MOCK_COVERAGE = {
+    # Generic medications
+    'amoxicillin': CoverageInfo(True, 1, 90, 5, False),
+    'lisinopril': CoverageInfo(True, 1, 90, 5, False),
+    'metformin': CoverageInfo(True, 1, 90, 5, False),
+    'atorvastatin': CoverageInfo(True, 1, 90, 5, False),
+    
+    # Brand medications
+    'lipitor': CoverageInfo(True, 2, 75, 30, False),
+    'zestril': CoverageInfo(True, 2, 75, 30, False),
+    'glucophage': CoverageInfo(True, 2, 75, 30, False),
+    
+    # Higher tier medications
+    'crestor': CoverageInfo(True, 3, 50, 60, True),
+    'humira': CoverageInfo(True, 4, 25, 150, True)
+}
+
 def match_insurance_coverage(medications, insurance_provider):
     """
     Match medications with insurance coverage information
@@ -25,21 +56,20 @@ def match_insurance_coverage(medications, insurance_provider):
             
             # Try exact match
             if med_name in coverage_info:
-                med['insurance'] = coverage_info[med_name]
+                med['insurance'] = asdict(coverage_info[med_name])
                 continue
                 
             # Try generic name match
             if 'generic_name' in med and med['generic_name']:
                 generic_name = med['generic_name'].lower()
                 if generic_name in coverage_info:
-                    med['insurance'] = coverage_info[generic_name]
+                    med['insurance'] = asdict(coverage_info[generic_name])
                     continue
             
             # Try partial matches (could be improved with fuzzy matching)
             for covered_med, info in coverage_info.items():
                 if covered_med in med_name or med_name in covered_med:
-                    med['insurance'] = info
-                    med['insurance']['partial_match'] = True
+                    med['insurance'] = {**asdict(info), 'partial_match': True}
                     break
             
             # No match found
@@ -52,83 +82,11 @@ def match_insurance_coverage(medications, insurance_provider):
         return medications
         
     except Exception as e:
-        logger.error(f"Insurance matching error: {str(e)}")
+        logger.error("Insurance matching error: %s", e)
         raise
 
 def _get_insurance_coverage(insurance_provider):
     """Get insurance coverage information (mock implementation)"""
     # In a real system, this would query an insurance API or database
     # For now, using mock data
-    
-    mock_coverage = {
-        # Generic medications
-        'amoxicillin': {
-            'covered': True,
-            'tier': 1,
-            'coverage_percentage': 90,
-            'copay': 5,
-            'prior_authorization': False
-        },
-        'lisinopril': {
-            'covered': True,
-            'tier': 1,
-            'coverage_percentage': 90,
-            'copay': 5,
-            'prior_authorization': False
-        },
-        'metformin': {
-            'covered': True,
-            'tier': 1,
-            'coverage_percentage': 90,
-            'copay': 5,
-            'prior_authorization': False
-        },
-        'atorvastatin': {
-            'covered': True,
-            'tier': 1,
-            'coverage_percentage': 90,
-            'copay': 5,
-            'prior_authorization': False
-        },
-        
-        # Brand medications
-        'lipitor': {
-            'covered': True,
-            'tier': 2,
-            'coverage_percentage': 75,
-            'copay': 30,
-            'prior_authorization': False
-        },
-        'zestril': {
-            'covered': True,
-            'tier': 2,
-            'coverage_percentage': 75,
-            'copay': 30,
-            'prior_authorization': False
-        },
-        'glucophage': {
-            'covered': True,
-            'tier': 2,
-            'coverage_percentage': 75,
-            'copay': 30,
-            'prior_authorization': False
-        },
-        
-        # Higher tier medications
-        'crestor': {
-            'covered': True,
-            'tier': 3,
-            'coverage_percentage': 50,
-            'copay': 60,
-            'prior_authorization': True
-        },
-        'humira': {
-            'covered': True,
-            'tier': 4,
-            'coverage_percentage': 25,
-            'copay': 150,
-            'prior_authorization': True
-        }
-    }
-    
-    return mock_coverage
+    return MOCK_COVERAGE
@@ -0,0 +1,149 @@
+# data/external/_base.py
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class BaseAPIClient:
+    """Shared HTTP plumbing for the external healthcare API clients"""
+
+    # Overridden by subclasses
+    service_name = "external"
+    base_url = None
+
+    # Where the API key is sent: a request header or a query parameter
+    api_key_header = None
+    api_key_param = None
+
+    # Responses worth retrying: rate limiting and transient server errors
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(self, api_key=None, base_url=None, retries=3, backoff=1, cache=None):
+        """
+        Initialize API client
+
+        Args:
+            api_key: API key (optional)
+            base_url: API base URL (defaults to the client's base_url)
+            retries: Number of retry attempts
+            backoff: Backoff multiplier
+            cache: CacheManager used to memoize lookups across workers (optional)
+        """
+        self.api_key = api_key
+        self.cache = cache
+        if base_url:
+            self.base_url = base_url
+        self.session = requests.Session()
+
+        # Let urllib3 handle retries with exponential backoff and Retry-After
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            respect_retry_after_header=True,
+            allowed_methods=frozenset(["GET", "POST"])
+        )
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Initialize headers
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        })
+
+        # Add API key to headers if the service expects it there
+        if self.api_key and self.api_key_header:
+            self.session.headers.update({self.api_key_header: self.api_key})
+
+        logger.info("%s client initialized", self.service_name)
+
+    def _prepare_request(self, endpoint, params=None):
+        """
+        Build the request URL and query parameters
+
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+
+        Returns:
+            tuple: (url, params)
+        """
+        url = f"{self.base_url}/{endpoint}"
+
+        # Add API key to the query string if the service expects it there
+        if self.api_key and self.api_key_param:
+            params = dict(params or {})
+            params[self.api_key_param] = self.api_key
+
+        return url, params
+
+    def _make_request(self, method, endpoint, params=None, data=None):
+        """
+        Make HTTP request to the API
+
+        Retries are handled by the session's HTTPAdapter.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint
+            params: Query parameters
+            data: Request body for POST/PUT
+
+        Returns:
+            dict: API response
+        """
+        if method not in ("GET", "POST"):
+            logger.error("Unsupported HTTP method: %s", method)
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        url, params = self._prepare_request(endpoint, params)
+
+        try:
+            response = self.session.request(
+                method,
+                url,
+                params=params,
+                json=data if method == "POST" else None,
+                timeout=10
+            )
+            response.raise_for_status()
+            return response.json()
+
+        except requests.exceptions.RequestException as e:
+            logger.error("Request to %s API failed: %s", self.service_name, e)
+            raise
+
+    @staticmethod
+    def _group_names(names):
+        """
+        Group names case-insensitively so each distinct name is looked up once
+
+        Args:
+            names: Iterable of names, possibly with duplicates
+
+        Returns:
+            dict: Lowercased name -> list of the input spellings that share it
+        """
+        groups = {}
+        for name in names:
+            if name:
+                groups.setdefault(name.strip().lower(), []).append(name)
+        return groups
+
+    @staticmethod
+    def _chunked(items, size):
+        """Yield successive chunks of at most size items"""
+        for i in range(0, len(items), size):
+            yield items[i:i + size]
+
+    def _get(self, endpoint, params=None, **kwargs):
+        """Make a GET request to the API"""
+        return self._make_request("GET", endpoint, params=params, **kwargs)
+
+    def _post(self, endpoint, data=None, params=None, **kwargs):
+        """Make a POST request to the API"""
+        return self._make_request("POST", endpoint, params=params, data=data, **kwargs)
@@ -1,34 +1,28 @@
 
 # data/external/fda_client.py
-import requests
 import json
+from data.external._base import BaseAPIClient
+from data.redis.cache_manager import redis_cached
 from utils.logger import get_logger
-import time
 
 logger = get_logger(__name__)
 
-class FDAClient:
+class FDAClient(BaseAPIClient):
     """Client for FDA's OpenFDA API"""
     
-    def __init__(self, api_key=None, base_url="https://api.fda.gov"):
-        """
-        Initialize FDA client
-        
-        Args:
-            api_key: FDA API key (optional)
-            base_url: FDA API base URL
-        """
-        self.api_key = api_key
-        self.base_url = base_url
-        self.session = requests.Session()
-        # Initialize headers
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        })
-        
-        logger.info("FDA client initialized")
-        
+    service_name = "FDA"
+    base_url = "https://api.fda.gov"
+    
+    # OpenFDA expects the API key as a query parameter
+    api_key_param = "api_key"
+
+    # Number of drugs OR'd together in one bulk label search
+    BULK_CHUNK_SIZE = 20
+    BULK_RESULTS_PER_DRUG = 5
+
+    # FDA label and event data is refreshed daily
+    CACHE_TTL = 86400
+
     def _construct_url(self, endpoint, params=None):
         """
         Construct request URL with parameters
@@ -47,7 +41,7 @@ class FDAClient:
             
         # Add API key if available
         if self.api_key:
-            params["api_key"] = self.api_key
+            params[self.api_key_param] = self.api_key
             
         # Convert params to query string
         if params:
@@ -63,53 +57,14 @@ class FDAClient:
             
         return url
         
-    def _make_request(self, method, endpoint, params=None, data=None, retries=3, backoff=1):
+    def _prepare_request(self, endpoint, params=None):
         """
-        Make HTTP request to FDA API with retry logic
+        Build the request URL with the query string already encoded
         
-        Args:
-            method: HTTP method (GET, POST, etc.)
-            endpoint: API endpoint
-            params: Query parameters
-            data: Request body for POST/PUT
-            retries: Number of retry attempts
-            backoff: Backoff multiplier
-            
-        Returns:
-            dict: API response
+        OpenFDA search syntax relies on unescaped "+" separators, so the
+        query string is assembled by _construct_url rather than requests.
         """
-        url = self._construct_url(endpoint, params)
-        attempt = 0
-        
-        while attempt < retries:
-            try:
-                # Make request
-                if method == "GET":
-                    response = self.session.get(url, timeout=10)
-                elif method == "POST":
-                    response = self.session.post(url, json=data, timeout=10)
-                else:
-                    logger.error(f"Unsupported HTTP method: {method}")
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                # Check for success
-                response.raise_for_status()
-                
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                attempt += 1
-                wait_time = backoff * (2 ** attempt)
-                
-                if attempt < retries:
-                    logger.warning(f"Request to FDA API failed ({e}). Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to connect to FDA API after {retries} attempts: {e}")
-                    raise
-                    
-        # This should never be reached due to the raise above
-        return None
+        return self._construct_url(endpoint, params), None
         
     def get_drug_information(self, drug_name):
         """
@@ -136,13 +91,75 @@ class FDAClient:
             if "results" in response and len(response["results"]) > 0:
                 return response["results"][0]
             else:
-                logger.warning(f"No FDA information found for drug: {drug_name}")
+                logger.warning("No FDA information found for drug: %s", drug_name)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving FDA information for drug {drug_name}: {str(e)}")
+            logger.error("Error retrieving FDA information for drug %s: %s", drug_name, e)
             return None
-            
+
+    def get_drug_information_bulk(self, drug_names):
+        """
+        Get FDA information for several drugs with as few requests as possible
+
+        Names are deduplicated case-insensitively and OR'd together in a
+        single search per chunk of BULK_CHUNK_SIZE drugs.
+
+        Args:
+            drug_names: List of drug names
+
+        Returns:
+            dict: Input drug name -> drug information (None if not found)
+        """
+        groups = self._group_names(drug_names)
+        found = {}
+
+        for chunk in self._chunked(list(groups), self.BULK_CHUNK_SIZE):
+            try:
+                params = {
+                    "search": "+OR+".join(
+                        f'generic_name:"{name}"+brand_name:"{name}"' for name in chunk
+                    ),
+                    # A drug can match several labels, leave room for every name
+                    "limit": len(chunk) * self.BULK_RESULTS_PER_DRUG
+                }
+
+                response = self._make_request(
+                    "GET",
+                    "drug/label.json",
+                    params=params
+                )
+
+                pending = set(chunk)
+                for result in response.get("results", []):
+                    openfda = result.get("openfda", {})
+                    label_names = {
+                        name.lower()
+                        for name in openfda.get("generic_name", []) + openfda.get("brand_name", [])
+                    }
+                    for name in pending & label_names:
+                        found[name] = result
+                    pending -= label_names
+                    if not pending:
+                        break
+
+                if pending:
+                    logger.warning("No FDA information found for drugs: %s", ', '.join(sorted(pending)))
+
+            except Exception as e:
+                logger.error("Error retrieving FDA information for drugs %s: %s", ', '.join(chunk), e)
+
+        return {
+            name: found.get(key)
+            for key, names in groups.items()
+            for name in names
+        }
+
+    @redis_cached(
+        "fda:interactions",
+        key=lambda self, drug_name: drug_name.lower(),
+        ttl=CACHE_TTL
+    )
     def get_drug_interactions(self, drug_name):
         """
         Get known drug interactions
@@ -162,11 +179,11 @@ class FDAClient:
                 # Parse interaction text
                 return self._parse_interaction_text(drug_info["drug_interactions"])
             else:
-                logger.warning(f"No interaction information found for drug: {drug_name}")
+                logger.warning("No interaction information found for drug: %s", drug_name)
                 return []
                 
         except Exception as e:
-            logger.error(f"Error retrieving interaction information for drug {drug_name}: {str(e)}")
+            logger.error("Error retrieving interaction information for drug %s: %s", drug_name, e)
             return []
             
     def _parse_interaction_text(self, interaction_text):
@@ -204,6 +221,11 @@ class FDAClient:
                 
         return interactions
         
+    @redis_cached(
+        "fda:adverse_events",
+        key=lambda self, drug_name, limit=10: f"{drug_name.lower()}:{limit}",
+        ttl=CACHE_TTL
+    )
     def get_adverse_events(self, drug_name, limit=10):
         """
         Get adverse events reported for a drug
@@ -231,13 +253,20 @@ class FDAClient:
             if "results" in response:
                 return response["results"]
             else:
-                logger.warning(f"No adverse events found for drug: {drug_name}")
+                logger.warning("No adverse events found for drug: %s", drug_name)
                 return []
                 
         except Exception as e:
-            logger.error(f"Error retrieving adverse events for drug {drug_name}: {str(e)}")
+            logger.error("Error retrieving adverse events for drug %s: %s", drug_name, e)
             return []
             
+    @redis_cached(
+        "fda:recalls",
+        key=lambda self, product_name=None, manufacturer=None, limit=10: (
+            f"{(product_name or '').lower()}:{(manufacturer or '').lower()}:{limit}"
+        ),
+        ttl=CACHE_TTL
+    )
     def search_recalls(self, product_name=None, manufacturer=None, limit=10):
         """
         Search for drug recalls
@@ -277,9 +306,9 @@ class FDAClient:
             if "results" in response:
                 return response["results"]
             else:
-                logger.warning(f"No recalls found for the specified criteria")
+                logger.warning("No recalls found for the specified criteria")
                 return []
                 
         except Exception as e:
-            logger.error(f"Error searching drug recalls: {str(e)}")
+            logger.error("Error searching drug recalls: %s", e)
             return []
@@ -1,86 +1,19 @@
 
 # data/external/nih_client.py
-import requests
 import json
+from data.external._base import BaseAPIClient
 from utils.logger import get_logger
-import time
 
 logger = get_logger(__name__)
 
-class NIHClient:
+class NIHClient(BaseAPIClient):
     """Client for National Institutes of Health (NIH) APIs"""
     
-    def __init__(self, api_key=None, base_url="https://api.nih.gov"):
-        """
-        Initialize NIH client
-        
-        Args:
-            api_key: NIH API key (if required)
-            base_url: NIH API base URL
-        """
-        self.api_key = api_key
-        self.base_url = base_url
-        self.session = requests.Session()
-        
-        # Initialize headers
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        })
-        
-        # Add API key to headers if available
-        if self.api_key:
-            self.session.headers.update({"X-API-Key": self.api_key})
-            
-        logger.info("NIH client initialized")
-        
-    def _make_request(self, method, endpoint, params=None, data=None, retries=3, backoff=1):
-        """
-        Make HTTP request to NIH API with retry logic
-        
-        Args:
-            method: HTTP method (GET, POST, etc.)
-            endpoint: API endpoint
-            params: Query parameters
-            data: Request body for POST/PUT
-            retries: Number of retry attempts
-            backoff: Backoff multiplier
-            
-        Returns:
-            dict: API response
-        """
-        url = f"{self.base_url}/{endpoint}"
-        attempt = 0
-        
-        while attempt < retries:
-            try:
-                # Make request
-                if method == "GET":
-                    response = self.session.get(url, params=params, timeout=10)
-                elif method == "POST":
-                    response = self.session.post(url, json=data, params=params, timeout=10)
-                else:
-                    logger.error(f"Unsupported HTTP method: {method}")
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                # Check for success
-                response.raise_for_status()
-                
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                attempt += 1
-                wait_time = backoff * (2 ** attempt)
-                
-                if attempt < retries:
-                    logger.warning(f"Request to NIH API failed ({e}). Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to connect to NIH API after {retries} attempts: {e}")
-                    raise
-                    
-        # This should never be reached due to the raise above
-        return None
+    service_name = "NIH"
+    base_url = "https://api.nih.gov"
+    
+    # NIH expects the API key as a request header
+    api_key_header = "X-API-Key"
         
     def search_clinical_trials(self, condition=None, drug=None, location=None, status="recruiting", limit=10):
         """
@@ -114,7 +47,7 @@ class NIHClient:
             return response.get("studies", [])
             
         except Exception as e:
-            logger.error(f"Error searching clinical trials: {str(e)}")
+            logger.error("Error searching clinical trials: %s", e)
             return []
             
     def get_drug_interactions(self, drug_name):
@@ -137,7 +70,7 @@ class NIHClient:
             return response.get("interactions", [])
             
         except Exception as e:
-            logger.error(f"Error retrieving drug interactions for {drug_name}: {str(e)}")
+            logger.error("Error retrieving drug interactions for %s: %s", drug_name, e)
             return []
             
     def get_medication_information(self, medication_name):
@@ -159,13 +92,33 @@ class NIHClient:
             if "results" in response and len(response["results"]) > 0:
                 return response["results"][0]
             else:
-                logger.warning(f"No NIH information found for medication: {medication_name}")
+                logger.warning("No NIH information found for medication: %s", medication_name)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving NIH information for medication {medication_name}: {str(e)}")
+            logger.error("Error retrieving NIH information for medication %s: %s", medication_name, e)
             return None
             
+    def get_medication_information_bulk(self, medication_names):
+        """
+        Get NIH information for several medications, looking up each distinct name once
+        
+        Args:
+            medication_names: List of medication names, possibly with duplicates
+            
+        Returns:
+            dict: Medication name -> medication information (None if not found)
+        """
+        # The NIH API has no multi-name search, so deduplication is the saving here
+        results = {}
+        
+        for names in self._group_names(medication_names).values():
+            info = self.get_medication_information(names[0])
+            for name in names:
+                results[name] = info
+                
+        return results
+            
     def search_pubmed(self, query, max_results=10):
         """
         Search for medical literature in PubMed
@@ -189,7 +142,7 @@ class NIHClient:
             return response.get("articles", [])
             
         except Exception as e:
-            logger.error(f"Error searching PubMed for '{query}': {str(e)}")
+            logger.error("Error searching PubMed for '%s': %s", query, e)
             return []
             
     def get_disease_information(self, disease_name):
@@ -211,9 +164,9 @@ class NIHClient:
             if "results" in response and len(response["results"]) > 0:
                 return response["results"][0]
             else:
-                logger.warning(f"No NIH information found for disease: {disease_name}")
+                logger.warning("No NIH information found for disease: %s", disease_name)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving NIH disease information for {disease_name}: {str(e)}")
+            logger.error("Error retrieving NIH disease information for %s: %s", disease_name, e)
             return None
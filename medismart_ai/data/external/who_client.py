@@ -1,86 +1,19 @@
 
 # data/external/who_client.py
-import requests
 import json
+from data.external._base import BaseAPIClient
 from utils.logger import get_logger
-import time
 
 logger = get_logger(__name__)
 
-class WHOClient:
+class WHOClient(BaseAPIClient):
     """Client for World Health Organization APIs"""
     
-    def __init__(self, api_key=None, base_url="https://api.who.int"):
-        """
-        Initialize WHO client
-        
-        Args:
-            api_key: WHO API key (if required)
-            base_url: WHO API base URL
-        """
-        self.api_key = api_key
-        self.base_url = base_url
-        self.session = requests.Session()
-        
-        # Initialize headers
-        self.session.headers.update({
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        })
-        
-        # Add API key to headers if available
-        if self.api_key:
-            self.session.headers.update({"X-API-Key": self.api_key})
-            
-        logger.info("WHO client initialized")
-        
-    def _make_request(self, method, endpoint, params=None, data=None, retries=3, backoff=1):
-        """
-        Make HTTP request to WHO API with retry logic
-        
-        Args:
-            method: HTTP method (GET, POST, etc.)
-            endpoint: API endpoint
-            params: Query parameters
-            data: Request body for POST/PUT
-            retries: Number of retry attempts
-            backoff: Backoff multiplier
-            
-        Returns:
-            dict: API response
-        """
-        url = f"{self.base_url}/{endpoint}"
-        attempt = 0
-        
-        while attempt < retries:
-            try:
-                # Make request
-                if method == "GET":
-                    response = self.session.get(url, params=params, timeout=10)
-                elif method == "POST":
-                    response = self.session.post(url, json=data, params=params, timeout=10)
-                else:
-                    logger.error(f"Unsupported HTTP method: {method}")
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                # Check for success
-                response.raise_for_status()
-                
-                return response.json()
-                
-            except requests.exceptions.RequestException as e:
-                attempt += 1
-                wait_time = backoff * (2 ** attempt)
-                
-                if attempt < retries:
-                    logger.warning(f"Request to WHO API failed ({e}). Retrying in {wait_time}s...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"Failed to connect to WHO API after {retries} attempts: {e}")
-                    raise
-                    
-        # This should never be reached due to the raise above
-        return None
+    service_name = "WHO"
+    base_url = "https://api.who.int"
+    
+    # WHO expects the API key as a request header
+    api_key_header = "X-API-Key"
         
     def get_essential_medicines(self, query=None, category=None):
         """
@@ -109,7 +42,7 @@ class WHOClient:
             return response.get("results", [])
             
         except Exception as e:
-            logger.error(f"Error retrieving WHO essential medicines data: {str(e)}")
+            logger.error("Error retrieving WHO essential medicines data: %s", e)
             return []
             
     def get_atc_classification(self, drug_name):
@@ -132,13 +65,33 @@ class WHOClient:
             if "results" in response and len(response["results"]) > 0:
                 return response["results"][0]
             else:
-                logger.warning(f"No ATC classification found for: {drug_name}")
+                logger.warning("No ATC classification found for: %s", drug_name)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving WHO ATC classification for {drug_name}: {str(e)}")
+            logger.error("Error retrieving WHO ATC classification for %s: %s", drug_name, e)
             return None
             
+    def get_atc_classification_bulk(self, drug_names):
+        """
+        Get ATC classifications for several drugs, looking up each distinct name once
+        
+        Args:
+            drug_names: List of drug names, possibly with duplicates
+            
+        Returns:
+            dict: Drug name -> ATC classification (None if not found)
+        """
+        # The WHO API has no multi-name search, so deduplication is the saving here
+        results = {}
+        
+        for names in self._group_names(drug_names).values():
+            info = self.get_atc_classification(names[0])
+            for name in names:
+                results[name] = info
+                
+        return results
+            
     def get_disease_information(self, disease_name):
         """
         Get information about a disease from WHO
@@ -159,11 +112,11 @@ class WHOClient:
             if "results" in response and len(response["results"]) > 0:
                 return response["results"][0]
             else:
-                logger.warning(f"No WHO information found for disease: {disease_name}")
+                logger.warning("No WHO information found for disease: %s", disease_name)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving WHO disease information for {disease_name}: {str(e)}")
+            logger.error("Error retrieving WHO disease information for %s: %s", disease_name, e)
             return None
             
     def get_treatment_guidelines(self, condition):
@@ -186,5 +139,5 @@ class WHOClient:
             return response.get("guidelines", [])
             
         except Exception as e:
-            logger.error(f"Error retrieving WHO treatment guidelines for {condition}: {str(e)}")
+            logger.error("Error retrieving WHO treatment guidelines for %s: %s", condition, e)
             return []
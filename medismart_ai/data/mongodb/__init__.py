@@ -1,3 +1,11 @@
 
 # data/mongodb/__init__.py
-from data.mongodb.prescription_repo import PrescriptionRepository
\ No newline at end of file
+from data.mongodb.prescription_repo import PrescriptionRepository
+
+def __getattr__(name):
+    # The async repository needs motor, which sync-only deployments may not
+    # install, so it is imported on first use
+    if name == "AsyncPrescriptionRepository":
+        from data.mongodb.async_prescription_repo import AsyncPrescriptionRepository
+        return AsyncPrescriptionRepository
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
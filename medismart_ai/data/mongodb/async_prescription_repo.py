@@ -0,0 +1,487 @@
+
+# data/mongodb/async_prescription_repo.py
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, errors
+from data.mongodb.prescription_repo import (
+    COLLECTION_INDEXES,
+    LIST_BATCH_SIZE,
+    PRESCRIPTION_SUMMARY_FIELDS,
+    SORT_CREATED_DESC,
+    _attach_medication_ids,
+    _keyset_query,
+    _next_after,
+    _oid,
+    _patient_with_prescriptions_pipeline,
+    _timestamped,
+    _unresolved_medication_names
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class AsyncPrescriptionRepository:
+    """Async (Motor) MongoDB repository for prescription data"""
+
+    def __init__(self, connection_string, db_name="medical_system",
+                 max_pool_size=256, min_pool_size=10, max_idle_time_ms=300_000,
+                 max_connecting=4, wait_queue_timeout_ms=5_000):
+        """
+        Initialize the repository
+
+        Mirrors PrescriptionRepository for asyncio handlers, so Mongo round
+        trips overlap with other work instead of holding a worker thread.
+        Sync code and scripts keep using PrescriptionRepository.
+
+        Motor connects lazily, so indexes are created by awaiting
+        create_indexes() once at application startup.
+
+        Args:
+            connection_string: MongoDB connection string
+            db_name: Database name
+            max_pool_size: Maximum connections in the pool
+            min_pool_size: Connections kept open while idle
+            max_idle_time_ms: Idle time before a pooled connection is closed
+            max_connecting: Maximum connections being established concurrently;
+                keeps async bursts on a cold pool from opening a connection storm
+            wait_queue_timeout_ms: Maximum time to wait for a pooled connection
+        """
+        self.client = AsyncIOMotorClient(
+            connection_string,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=max_idle_time_ms,
+            maxConnecting=max_connecting,
+            waitQueueTimeoutMS=wait_queue_timeout_ms,
+            retryWrites=True,
+            w="majority"
+        )
+        self.db = self.client[db_name]
+        self.prescriptions = self.db.prescriptions
+        self.patients = self.db.patients
+        self.doctors = self.db.doctors
+        self.medications = self.db.medications
+
+        logger.info(f"Configured async MongoDB client: {db_name}")
+
+    async def create_indexes(self):
+        """
+        Create necessary indexes for performance
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            for collection_name, indexes in COLLECTION_INDEXES.items():
+                await self.db[collection_name].create_indexes(indexes)
+
+            logger.info("MongoDB indexes created successfully")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error creating MongoDB indexes: {str(e)}")
+            return False
+
+    async def _resolve_medication_ids(self, prescriptions_data):
+        """
+        Add medication_id references to prescribed medications, looked up by name
+
+        Prescriptions are indexed and queried on medications.medication_id, so
+        names are resolved once at write time with a single $in query on the
+        unique medications.name index. Unknown names are left unresolved.
+
+        Args:
+            prescriptions_data: List of prescription dictionaries (updated in place)
+        """
+        names = _unresolved_medication_names(prescriptions_data)
+        if not names:
+            return
+
+        cursor = self.medications.find({"name": {"$in": names}}, projection={"name": 1})
+        medication_ids = {medication["name"]: medication["_id"] async for medication in cursor}
+        _attach_medication_ids(prescriptions_data, medication_ids)
+
+    async def save_prescription(self, prescription_data):
+        """
+        Save a new prescription
+
+        Args:
+            prescription_data: Dictionary containing prescription details
+
+        Returns:
+            str: ID of the saved prescription
+        """
+        try:
+            await self._resolve_medication_ids([prescription_data])
+
+            result = await self.prescriptions.insert_one(_timestamped(prescription_data))
+
+            logger.info(f"Saved prescription {result.inserted_id}")
+            return str(result.inserted_id)
+
+        except Exception as e:
+            logger.error(f"Error saving prescription: {str(e)}")
+            raise
+
+    async def bulk_save_prescriptions(self, prescriptions_data, chunk_size=1000):
+        """
+        Save many prescriptions with batched inserts
+
+        Each chunk is inserted with a single ordered insert_many, which
+        stops at the first failure such as a duplicate _id.
+
+        Args:
+            prescriptions_data: List of prescription dictionaries
+            chunk_size: Number of prescriptions per insert_many
+
+        Returns:
+            list: IDs of the saved prescriptions, in input order
+        """
+        try:
+            saved_ids = []
+
+            for start in range(0, len(prescriptions_data), chunk_size):
+                chunk = prescriptions_data[start:start + chunk_size]
+                await self._resolve_medication_ids(chunk)
+
+                result = await self.prescriptions.insert_many(
+                    [_timestamped(prescription_data) for prescription_data in chunk]
+                )
+
+                saved_ids.extend(str(prescription_id) for prescription_id in result.inserted_ids)
+
+            logger.info(f"Saved {len(saved_ids)} prescriptions in bulk")
+            return saved_ids
+
+        except Exception as e:
+            logger.error(f"Error bulk saving prescriptions: {str(e)}")
+            raise
+
+    async def get_prescription(self, prescription_id):
+        """
+        Get a prescription by ID
+
+        Args:
+            prescription_id: Prescription ID
+
+        Returns:
+            dict: Prescription data or None if not found
+        """
+        try:
+            return await self.prescriptions.find_one({"_id": _oid(prescription_id)})
+        except Exception as e:
+            logger.error(f"Error retrieving prescription {prescription_id}: {str(e)}")
+            raise
+
+    async def get_prescriptions_bulk(self, prescription_ids, fields=None):
+        """
+        Get several prescriptions by ID in one query
+
+        Args:
+            prescription_ids: List of prescription IDs
+            fields: Projection of the fields to return (None for full documents)
+
+        Returns:
+            dict: Prescription ID string -> prescription data (missing IDs are omitted)
+        """
+        try:
+            oids = list({_oid(prescription_id) for prescription_id in prescription_ids})
+            if not oids:
+                return {}
+
+            docs = await self.prescriptions.find(
+                {"_id": {"$in": oids}},
+                projection=fields
+            ).to_list(length=len(oids))
+
+            return {str(doc["_id"]): doc for doc in docs}
+
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions in bulk: {str(e)}")
+            raise
+
+    async def update_prescription(self, prescription_id, update_data):
+        """
+        Update an existing prescription
+
+        Args:
+            prescription_id: ID of the prescription to update
+            update_data: Dictionary containing fields to update
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            result = await self.prescriptions.update_one(
+                {"_id": _oid(prescription_id)},
+                {"$set": update_data, "$currentDate": {"updated_at": True}}
+            )
+
+            success = result.modified_count > 0
+            if success:
+                logger.info(f"Updated prescription {prescription_id}")
+            else:
+                logger.warning(f"No changes made to prescription {prescription_id}")
+
+            return success
+
+        except Exception as e:
+            logger.error(f"Error updating prescription {prescription_id}: {str(e)}")
+            raise
+
+    async def update_and_return_prescription(self, prescription_id, update_data, fields=None):
+        """
+        Update an existing prescription and return the updated document
+
+        Use this instead of update_prescription followed by get_prescription;
+        find_one_and_update does both in a single round trip.
+
+        Args:
+            prescription_id: ID of the prescription to update
+            update_data: Dictionary containing fields to update
+            fields: Projection of the fields to return (None for the full document)
+
+        Returns:
+            dict: Updated prescription or None if not found
+        """
+        try:
+            prescription = await self.prescriptions.find_one_and_update(
+                {"_id": _oid(prescription_id)},
+                {"$set": update_data, "$currentDate": {"updated_at": True}},
+                projection=fields,
+                return_document=ReturnDocument.AFTER
+            )
+
+            if prescription is not None:
+                logger.info(f"Updated prescription {prescription_id}")
+            else:
+                logger.warning(f"Prescription {prescription_id} not found for update")
+
+            return prescription
+
+        except Exception as e:
+            logger.error(f"Error updating prescription {prescription_id}: {str(e)}")
+            raise
+
+    async def delete_prescription(self, prescription_id):
+        """
+        Delete a prescription by ID
+
+        Args:
+            prescription_id: ID of the prescription to delete
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            result = await self.prescriptions.delete_one({"_id": _oid(prescription_id)})
+
+            success = result.deleted_count > 0
+            if success:
+                logger.info(f"Deleted prescription {prescription_id}")
+            else:
+                logger.warning(f"Prescription {prescription_id} not found for deletion")
+
+            return success
+
+        except Exception as e:
+            logger.error(f"Error deleting prescription {prescription_id}: {str(e)}")
+            raise
+
+    async def _list_prescriptions(self, query, limit, after, fields):
+        """
+        Run a keyset-paginated prescription listing, newest first
+
+        Args:
+            query: Equality filter for the listing
+            limit: Maximum number of prescriptions to return
+            after: (created_at, id) of the last document of the previous page
+            fields: Projection of the fields to return (must keep created_at)
+
+        Returns:
+            tuple: (list of prescription documents, next_after cursor or None)
+        """
+        cursor = self.prescriptions.find(
+            _keyset_query(query, after),
+            projection=fields
+        ).sort(SORT_CREATED_DESC).limit(limit).batch_size(LIST_BATCH_SIZE)
+
+        docs = await cursor.to_list(length=limit)
+        return docs, _next_after(docs[-1] if docs else None, len(docs), limit)
+
+    async def get_patient_prescriptions(self, patient_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
+        """
+        Get prescriptions for a specific patient
+
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of prescriptions to return
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
+
+        Returns:
+            tuple: (list of prescription documents, next_after cursor or None)
+        """
+        try:
+            return await self._list_prescriptions({"patient_id": patient_id}, limit, after, fields)
+
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions for patient {patient_id}: {str(e)}")
+            raise
+
+    async def get_patient_with_prescriptions(self, patient_id, limit=20):
+        """
+        Get a patient together with their most recent prescriptions
+
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of prescriptions to embed
+
+        Returns:
+            dict: Patient document with a 'prescriptions' list, or None if not found
+        """
+        try:
+            cursor = self.patients.aggregate(
+                _patient_with_prescriptions_pipeline(patient_id, limit, self.prescriptions.name)
+            )
+
+            docs = await cursor.to_list(length=1)
+            return docs[0] if docs else None
+
+        except Exception as e:
+            logger.error(f"Error retrieving patient {patient_id} with prescriptions: {str(e)}")
+            raise
+
+    async def get_doctor_prescriptions(self, doctor_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
+        """
+        Get prescriptions issued by a specific doctor
+
+        Args:
+            doctor_id: Doctor ID
+            limit: Maximum number of prescriptions to return
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
+
+        Returns:
+            tuple: (list of prescription documents, next_after cursor or None)
+        """
+        try:
+            return await self._list_prescriptions({"doctor_id": doctor_id}, limit, after, fields)
+
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions for doctor {doctor_id}: {str(e)}")
+            raise
+
+    async def get_medication_prescriptions(self, medication_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
+        """
+        Get prescriptions containing a specific medication
+
+        Args:
+            medication_id: Medication ID
+            limit: Maximum number of prescriptions to return
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
+
+        Returns:
+            tuple: (list of prescription documents, next_after cursor or None)
+        """
+        try:
+            return await self._list_prescriptions(
+                {"medications.medication_id": _oid(medication_id)}, limit, after, fields
+            )
+
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions for medication {medication_id}: {str(e)}")
+            raise
+
+    async def get_medication_prescriptions_by_name(self, medication_name, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
+        """
+        Get prescriptions containing a medication, looked up by its name
+
+        Args:
+            medication_name: Name of the medication
+            limit: Maximum number of prescriptions to return
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
+
+        Returns:
+            tuple: (list of prescription documents, next_after cursor or None)
+        """
+        try:
+            medication = await self.medications.find_one({"name": medication_name}, projection={"_id": 1})
+            if medication is None:
+                return [], None
+
+            return await self.get_medication_prescriptions(medication["_id"], limit, after, fields)
+
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions for medication {medication_name}: {str(e)}")
+            raise
+
+    async def save_patient(self, patient_data):
+        """
+        Save a new patient
+
+        Args:
+            patient_data: Dictionary containing patient details
+
+        Returns:
+            str: ID of the saved patient
+        """
+        try:
+            result = await self.patients.insert_one(_timestamped(patient_data))
+
+            logger.info(f"Saved patient {result.inserted_id}")
+            return str(result.inserted_id)
+
+        except errors.DuplicateKeyError:
+            logger.error(f"Duplicate medical ID for patient: {patient_data.get('medical_id')}")
+            raise
+        except Exception as e:
+            logger.error(f"Error saving patient: {str(e)}")
+            raise
+
+    async def save_doctor(self, doctor_data):
+        """
+        Save a new doctor
+
+        Args:
+            doctor_data: Dictionary containing doctor details
+
+        Returns:
+            str: ID of the saved doctor
+        """
+        try:
+            result = await self.doctors.insert_one(_timestamped(doctor_data))
+
+            logger.info(f"Saved doctor {result.inserted_id}")
+            return str(result.inserted_id)
+
+        except errors.DuplicateKeyError:
+            logger.error(f"Duplicate license number for doctor: {doctor_data.get('license_number')}")
+            raise
+        except Exception as e:
+            logger.error(f"Error saving doctor: {str(e)}")
+            raise
+
+    async def save_medication(self, medication_data):
+        """
+        Save a new medication
+
+        Args:
+            medication_data: Dictionary containing medication details
+
+        Returns:
+            str: ID of the saved medication
+        """
+        try:
+            result = await self.medications.insert_one(_timestamped(medication_data))
+
+            logger.info(f"Saved medication {result.inserted_id}")
+            return str(result.inserted_id)
+
+        except errors.DuplicateKeyError:
+            logger.error(f"Duplicate name for medication: {medication_data.get('name')}")
+            raise
+        except Exception as e:
+            logger.error(f"Error saving medication: {str(e)}")
+            raise
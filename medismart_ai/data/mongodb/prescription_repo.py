@@ -1,33 +1,253 @@
 
 # data/mongodb/prescription_repo.py
-from pymongo import MongoClient, ASCENDING, DESCENDING, errors
+from pymongo import MongoClient, IndexModel, ReturnDocument, ASCENDING, DESCENDING, errors
 from bson.objectid import ObjectId
 import datetime
+import functools
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Fields returned by the prescription listings; get_prescription returns the full document
+PRESCRIPTION_SUMMARY_FIELDS = {
+    "_id": 1,
+    "patient_id": 1,
+    "doctor_id": 1,
+    "created_at": 1,
+    "medications.medication_id": 1,
+    "medications.name": 1,
+    "medications.dosage": 1
+}
+
+# Documents per cursor batch (getMore size) for the prescription listings
+LIST_BATCH_SIZE = 200
+
+# Listing order: newest first, _id as tiebreaker for keyset pagination
+SORT_CREATED_DESC = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+@functools.lru_cache(maxsize=4096)
+def _oid_from_str(value):
+    """Parse a hex string into an ObjectId, caching recent conversions"""
+    return ObjectId(value)
+
+def _oid(value):
+    """Return value as an ObjectId, accepting either an ObjectId or its hex string"""
+    if isinstance(value, ObjectId):
+        return value
+    return _oid_from_str(value)
+
+# Timestamps set when a document is inserted rather than taken from it
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+def _timestamped(document):
+    """
+    Copy a document for insertion, stamping created_at and updated_at
+    
+    Both fields come from one UTC datetime so they are equal on insert.
+    
+    Args:
+        document: Document to insert
+        
+    Returns:
+        dict: Document ready for insert_one/insert_many
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    stamped = {k: v for k, v in document.items() if k not in TIMESTAMP_FIELDS}
+    stamped["created_at"] = now
+    stamped["updated_at"] = now
+    return stamped
+
+# Indexes per collection, shared by the sync and async repositories
+COLLECTION_INDEXES = {
+    # Equality field first, then the (created_at, _id) sort key, so the
+    # paginated listings avoid in-memory sorts
+    "prescriptions": [
+        IndexModel([("patient_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("doctor_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("medications.medication_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)])
+    ],
+    # Patients and doctors are only looked up by ID here; a name index
+    # would slow every write without serving any query
+    "patients": [
+        IndexModel([("medical_id", ASCENDING)], unique=True)
+    ],
+    "doctors": [
+        IndexModel([("license_number", ASCENDING)], unique=True)
+    ],
+    # Resolves medication names to the IDs referenced by prescriptions
+    "medications": [
+        IndexModel([("name", ASCENDING)], unique=True)
+    ]
+}
+
+def _unresolved_medication_names(prescriptions_data):
+    """Collect names of prescribed medications that lack a medication_id reference"""
+    return list({
+        medication["name"]
+        for prescription_data in prescriptions_data
+        for medication in prescription_data.get("medications", [])
+        if "medication_id" not in medication and medication.get("name")
+    })
+
+def _attach_medication_ids(prescriptions_data, medication_ids):
+    """
+    Reference prescribed medications by _id
+    
+    Args:
+        prescriptions_data: List of prescription dictionaries (updated in place)
+        medication_ids: Medication name -> medication ObjectId
+    """
+    for prescription_data in prescriptions_data:
+        for medication in prescription_data.get("medications", []):
+            if "medication_id" not in medication and medication.get("name") in medication_ids:
+                medication["medication_id"] = medication_ids[medication["name"]]
+
+def _keyset_query(query, after):
+    """
+    Restrict a listing query to documents after a keyset pagination cursor
+    
+    Args:
+        query: Equality filter for the listing
+        after: (created_at, id) of the last document of the previous page, or None
+        
+    Returns:
+        dict: Query for the next page
+    """
+    if not after:
+        return query
+        
+    created_at, last_id = after
+    query = dict(query)
+    query["$or"] = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": _oid(last_id)}}
+    ]
+    return query
+
+def _next_after(last_doc, count, limit):
+    """Build the cursor for the following page (None when this was the last page)"""
+    # A short page means there is nothing left to fetch
+    if last_doc is not None and count == limit:
+        return (last_doc["created_at"], str(last_doc["_id"]))
+    return None
+
+class PrescriptionPage:
+    """
+    One page of a prescription listing, streamed from the MongoDB cursor
+    
+    Iterating yields documents as the driver fetches them instead of
+    materializing the whole page; wrap in list() when a list is needed.
+    The cursor is consumed as it goes, so a page can be iterated only once
+    and a second iteration raises RuntimeError. next_after is available
+    once the page has been fully consumed.
+    
+    The query runs while the page is iterated, so server and network
+    errors are logged and raised from the iteration rather than from the
+    listing method that returned the page.
+    """
+    
+    __slots__ = ("_cursor", "_limit", "_label", "_count", "_last_doc", "_iterated")
+    
+    def __init__(self, cursor, limit, label="listing"):
+        """
+        Args:
+            cursor: Cursor over the page's documents
+            limit: Page size the cursor was limited to
+            label: Description of the listing used in error logs
+        """
+        self._cursor = cursor
+        self._limit = limit
+        self._label = label
+        self._count = 0
+        self._last_doc = None
+        self._iterated = False
+        
+    def __iter__(self):
+        if self._iterated:
+            raise RuntimeError("PrescriptionPage can only be iterated once")
+        self._iterated = True
+        
+        try:
+            for doc in self._cursor:
+                self._count += 1
+                self._last_doc = doc
+                yield doc
+        except errors.PyMongoError as e:
+            logger.error(f"Error retrieving prescriptions for {self._label}: {str(e)}")
+            raise
+            
+    @property
+    def next_after(self):
+        """Cursor for the following page, or None when this is the last page"""
+        return _next_after(self._last_doc, self._count, self._limit)
+
+def _patient_with_prescriptions_pipeline(patient_id, limit, prescriptions_collection):
+    """Build the $match + $lookup pipeline embedding a patient's latest prescriptions"""
+    return [
+        {"$match": {"_id": _oid(patient_id)}},
+        {"$lookup": {
+            "from": prescriptions_collection,
+            # Same filter and sort as get_patient_prescriptions, so the
+            # (patient_id, created_at) index serves the subquery
+            "pipeline": [
+                {"$match": {"patient_id": patient_id}},
+                {"$sort": dict(SORT_CREATED_DESC)},
+                {"$limit": limit},
+                {"$project": PRESCRIPTION_SUMMARY_FIELDS}
+            ],
+            "as": "prescriptions"
+        }}
+    ]
+
 class PrescriptionRepository:
     """MongoDB repository for prescription data"""
     
-    def __init__(self, connection_string, db_name="medical_system"):
+    # (connection_string, db_name) pairs whose indexes were built in this process
+    _indexes_built = set()
+    
+    def __init__(self, connection_string, db_name="medical_system",
+                 max_pool_size=256, min_pool_size=10, max_idle_time_ms=300_000,
+                 max_connecting=4, wait_queue_timeout_ms=5_000):
         """
         Initialize the repository
         
+        The pool is sized for I/O-bound API workers: a larger max_pool_size
+        lets concurrent requests proceed without queueing, min_pool_size keeps
+        warm connections across idle periods, and a low max_connecting avoids
+        connection storms on cold start. Callers waiting longer than
+        wait_queue_timeout_ms for a connection fail fast instead of piling up.
+        
         Args:
             connection_string: MongoDB connection string
             db_name: Database name
+            max_pool_size: Maximum connections in the pool
+            min_pool_size: Connections kept open while idle
+            max_idle_time_ms: Idle time before a pooled connection is closed
+            max_connecting: Maximum connections being established concurrently
+            wait_queue_timeout_ms: Maximum time to wait for a pooled connection
         """
         try:
-            self.client = MongoClient(connection_string)
+            self.client = MongoClient(
+                connection_string,
+                maxPoolSize=max_pool_size,
+                minPoolSize=min_pool_size,
+                maxIdleTimeMS=max_idle_time_ms,
+                maxConnecting=max_connecting,
+                waitQueueTimeoutMS=wait_queue_timeout_ms,
+                retryWrites=True,
+                w="majority"
+            )
             self.db = self.client[db_name]
             self.prescriptions = self.db.prescriptions
             self.patients = self.db.patients
             self.doctors = self.db.doctors
             self.medications = self.db.medications
             
-            # Create indexes
-            self._create_indexes()
+            # Create indexes once per database per process
+            index_key = (connection_string, db_name)
+            if index_key not in PrescriptionRepository._indexes_built:
+                if self._create_indexes():
+                    PrescriptionRepository._indexes_built.add(index_key)
             
             logger.info(f"Connected to MongoDB: {db_name}")
             
@@ -36,30 +256,44 @@ class PrescriptionRepository:
             raise
             
     def _create_indexes(self):
-        """Create necessary indexes for performance"""
+        """
+        Create necessary indexes for performance
+        
+        Each collection's indexes are sent in a single createIndexes command.
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
         try:
-            # Prescriptions collection indexes
-            self.prescriptions.create_index([("patient_id", ASCENDING)])
-            self.prescriptions.create_index([("doctor_id", ASCENDING)])
-            self.prescriptions.create_index([("created_at", DESCENDING)])
-            self.prescriptions.create_index([("medications.name", ASCENDING)])
-            
-            # Patients collection indexes
-            self.patients.create_index([("medical_id", ASCENDING)], unique=True)
-            self.patients.create_index([("name", ASCENDING)])
-            
-            # Doctors collection indexes
-            self.doctors.create_index([("license_number", ASCENDING)], unique=True)
-            self.doctors.create_index([("name", ASCENDING)])
-            
-            # Medications collection indexes
-            self.medications.create_index([("name", ASCENDING)], unique=True)
-            
+            for collection_name, indexes in COLLECTION_INDEXES.items():
+                self.db[collection_name].create_indexes(indexes)
+                
             logger.info("MongoDB indexes created successfully")
+            return True
             
         except Exception as e:
             logger.error(f"Error creating MongoDB indexes: {str(e)}")
+            return False
+            
+    def _resolve_medication_ids(self, prescriptions_data):
+        """
+        Add medication_id references to prescribed medications, looked up by name
+        
+        Prescriptions are indexed and queried on medications.medication_id, so
+        names are resolved once at write time with a single $in query on the
+        unique medications.name index. Unknown names are left unresolved.
+        
+        Args:
+            prescriptions_data: List of prescription dictionaries (updated in place)
+        """
+        names = _unresolved_medication_names(prescriptions_data)
+        if not names:
+            return
             
+        cursor = self.medications.find({"name": {"$in": names}}, projection={"name": 1})
+        medication_ids = {medication["name"]: medication["_id"] for medication in cursor}
+        _attach_medication_ids(prescriptions_data, medication_ids)
+
     def save_prescription(self, prescription_data):
         """
         Save a new prescription
@@ -71,25 +305,51 @@ class PrescriptionRepository:
             str: ID of the saved prescription
         """
         try:
-            # Add timestamp
-            prescription_data["created_at"] = datetime.datetime.now()
-            prescription_data["updated_at"] = prescription_data["created_at"]
-            
-            # Insert prescription
-            result = self.prescriptions.insert_one(prescription_data)
-            
-            # Update patient's prescription history
-            if "patient_id" in prescription_data:
-                self.patients.update_one(
-                    {"_id": ObjectId(prescription_data["patient_id"])},
-                    {"$push": {"prescription_ids": result.inserted_id}}
+            # Insert prescription with timestamps
+            self._resolve_medication_ids([prescription_data])
+            
+            result = self.prescriptions.insert_one(_timestamped(prescription_data))
+            inserted_id = result.inserted_id
+            
+            logger.info(f"Saved prescription {inserted_id}")
+            return str(inserted_id)
+            
+        except Exception as e:
+            logger.error(f"Error saving prescription: {str(e)}")
+            raise
+    
+    def bulk_save_prescriptions(self, prescriptions_data, chunk_size=1000):
+        """
+        Save many prescriptions with batched inserts
+        
+        Each chunk is inserted with a single ordered insert_many, which
+        stops at the first failure such as a duplicate _id.
+        
+        Args:
+            prescriptions_data: List of prescription dictionaries
+            chunk_size: Number of prescriptions per insert_many
+            
+        Returns:
+            list: IDs of the saved prescriptions, in input order
+        """
+        try:
+            saved_ids = []
+            
+            for start in range(0, len(prescriptions_data), chunk_size):
+                chunk = prescriptions_data[start:start + chunk_size]
+                self._resolve_medication_ids(chunk)
+                
+                result = self.prescriptions.insert_many(
+                    [_timestamped(prescription_data) for prescription_data in chunk]
                 )
                 
-            logger.info(f"Saved prescription {result.inserted_id}")
-            return str(result.inserted_id)
+                saved_ids.extend(str(prescription_id) for prescription_id in result.inserted_ids)
+                
+            logger.info(f"Saved {len(saved_ids)} prescriptions in bulk")
+            return saved_ids
             
         except Exception as e:
-            logger.error(f"Error saving prescription: {str(e)}")
+            logger.error(f"Error bulk saving prescriptions: {str(e)}")
             raise
     
     def get_prescription(self, prescription_id):
@@ -103,12 +363,39 @@ class PrescriptionRepository:
             dict: Prescription data or None if not found
         """
         try:
-            result = self.prescriptions.find_one({"_id": ObjectId(prescription_id)})
+            result = self.prescriptions.find_one({"_id": _oid(prescription_id)})
             return result
         except Exception as e:
             logger.error(f"Error retrieving prescription {prescription_id}: {str(e)}")
             raise
 
+    def get_prescriptions_bulk(self, prescription_ids, fields=None):
+        """
+        Get several prescriptions by ID in one query
+        
+        Args:
+            prescription_ids: List of prescription IDs
+            fields: Projection of the fields to return (None for full documents)
+            
+        Returns:
+            dict: Prescription ID string -> prescription data (missing IDs are omitted)
+        """
+        try:
+            oids = list({_oid(prescription_id) for prescription_id in prescription_ids})
+            if not oids:
+                return {}
+                
+            docs = list(self.prescriptions.find(
+                {"_id": {"$in": oids}},
+                projection=fields
+            ))
+            
+            return {str(doc["_id"]): doc for doc in docs}
+            
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions in bulk: {str(e)}")
+            raise
+
     def update_prescription(self, prescription_id, update_data):
         """
         Update an existing prescription
@@ -121,12 +408,9 @@ class PrescriptionRepository:
             bool: True if successful, False otherwise
         """
         try:
-            # Add updated timestamp
-            update_data["updated_at"] = datetime.datetime.now()
-            
             result = self.prescriptions.update_one(
-                {"_id": ObjectId(prescription_id)},
-                {"$set": update_data}
+                {"_id": _oid(prescription_id)},
+                {"$set": update_data, "$currentDate": {"updated_at": True}}
             )
             
             success = result.modified_count > 0
@@ -141,6 +425,40 @@ class PrescriptionRepository:
             logger.error(f"Error updating prescription {prescription_id}: {str(e)}")
             raise
 
+    def update_and_return_prescription(self, prescription_id, update_data, fields=None):
+        """
+        Update an existing prescription and return the updated document
+        
+        Use this instead of update_prescription followed by get_prescription;
+        find_one_and_update does both in a single round trip.
+        
+        Args:
+            prescription_id: ID of the prescription to update
+            update_data: Dictionary containing fields to update
+            fields: Projection of the fields to return (None for the full document)
+            
+        Returns:
+            dict: Updated prescription or None if not found
+        """
+        try:
+            prescription = self.prescriptions.find_one_and_update(
+                {"_id": _oid(prescription_id)},
+                {"$set": update_data, "$currentDate": {"updated_at": True}},
+                projection=fields,
+                return_document=ReturnDocument.AFTER
+            )
+            
+            if prescription is not None:
+                logger.info(f"Updated prescription {prescription_id}")
+            else:
+                logger.warning(f"Prescription {prescription_id} not found for update")
+                
+            return prescription
+            
+        except Exception as e:
+            logger.error(f"Error updating prescription {prescription_id}: {str(e)}")
+            raise
+
     def delete_prescription(self, prescription_id):
         """
         Delete a prescription by ID
@@ -152,18 +470,7 @@ class PrescriptionRepository:
             bool: True if successful, False otherwise
         """
         try:
-            # Get prescription to find patient ID
-            prescription = self.prescriptions.find_one({"_id": ObjectId(prescription_id)})
-            
-            if prescription and "patient_id" in prescription:
-                # Remove prescription reference from patient document
-                self.patients.update_one(
-                    {"_id": ObjectId(prescription["patient_id"])},
-                    {"$pull": {"prescription_ids": ObjectId(prescription_id)}}
-                )
-            
-            # Delete the prescription
-            result = self.prescriptions.delete_one({"_id": ObjectId(prescription_id)})
+            result = self.prescriptions.delete_one({"_id": _oid(prescription_id)})
             
             success = result.deleted_count > 0
             if success:
@@ -177,70 +484,151 @@ class PrescriptionRepository:
             logger.error(f"Error deleting prescription {prescription_id}: {str(e)}")
             raise
 
-    def get_patient_prescriptions(self, patient_id, limit=20, skip=0):
+    def _list_prescriptions(self, query, limit, after, fields, label):
+        """
+        Run a keyset-paginated prescription listing, newest first
+        
+        Pages are anchored on (created_at, _id) rather than skipped, so every
+        page is a bounded seek on the (field, created_at, _id) indexes no matter
+        how deep it is.
+        
+        Args:
+            query: Equality filter for the listing
+            limit: Maximum number of prescriptions to return
+            after: (created_at, id) of the last document of the previous page
+            fields: Projection of the fields to return (must keep created_at)
+            label: Description of the listing used in error logs
+            
+        Returns:
+            PrescriptionPage: Single-use iterable of prescription documents
+                with next_after
+        """
+        cursor = self.prescriptions.find(
+            _keyset_query(query, after),
+            projection=fields
+        ).sort(SORT_CREATED_DESC).limit(limit).batch_size(LIST_BATCH_SIZE)
+        
+        return PrescriptionPage(cursor, limit, label)
+
+    def get_patient_prescriptions(self, patient_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
         """
         Get prescriptions for a specific patient
         
         Args:
             patient_id: Patient ID
             limit: Maximum number of prescriptions to return
-            skip: Number of prescriptions to skip (for pagination)
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
             
         Returns:
-            list: List of prescription documents
+            PrescriptionPage: Single-use iterable of prescription documents
+                with next_after; query errors are raised while iterating it
         """
+        # Only building the query can fail here; the page logs its own errors
         try:
-            cursor = self.prescriptions.find(
-                {"patient_id": patient_id}
-            ).sort("created_at", DESCENDING).skip(skip).limit(limit)
-            
-            return list(cursor)
+            return self._list_prescriptions(
+                {"patient_id": patient_id}, limit, after, fields, f"patient {patient_id}"
+            )
             
         except Exception as e:
             logger.error(f"Error retrieving prescriptions for patient {patient_id}: {str(e)}")
             raise
 
-    def get_doctor_prescriptions(self, doctor_id, limit=20, skip=0):
+    def get_patient_with_prescriptions(self, patient_id, limit=20):
+        """
+        Get a patient together with their most recent prescriptions
+        
+        Uses a single aggregation ($match + $lookup) instead of fetching the
+        patient and the prescriptions in separate round trips.
+        
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of prescriptions to embed
+            
+        Returns:
+            dict: Patient document with a 'prescriptions' list, or None if not found
+        """
+        try:
+            cursor = self.patients.aggregate(
+                _patient_with_prescriptions_pipeline(patient_id, limit, self.prescriptions.name)
+            )
+            
+            return next(cursor, None)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving patient {patient_id} with prescriptions: {str(e)}")
+            raise
+
+    def get_doctor_prescriptions(self, doctor_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
         """
         Get prescriptions issued by a specific doctor
         
         Args:
             doctor_id: Doctor ID
             limit: Maximum number of prescriptions to return
-            skip: Number of prescriptions to skip (for pagination)
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
             
         Returns:
-            list: List of prescription documents
+            PrescriptionPage: Single-use iterable of prescription documents
+                with next_after; query errors are raised while iterating it
         """
+        # Only building the query can fail here; the page logs its own errors
         try:
-            cursor = self.prescriptions.find(
-                {"doctor_id": doctor_id}
-            ).sort("created_at", DESCENDING).skip(skip).limit(limit)
-            
-            return list(cursor)
+            return self._list_prescriptions(
+                {"doctor_id": doctor_id}, limit, after, fields, f"doctor {doctor_id}"
+            )
             
         except Exception as e:
             logger.error(f"Error retrieving prescriptions for doctor {doctor_id}: {str(e)}")
             raise
 
-    def get_medication_prescriptions(self, medication_name, limit=20, skip=0):
+    def get_medication_prescriptions(self, medication_id, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
         """
         Get prescriptions containing a specific medication
         
         Args:
-            medication_name: Name of the medication
+            medication_id: Medication ID
             limit: Maximum number of prescriptions to return
-            skip: Number of prescriptions to skip (for pagination)
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
             
         Returns:
-            list: List of prescription documents
+            PrescriptionPage: Single-use iterable of prescription documents
+                with next_after; query errors are raised while iterating it
         """
+        # Only building the query can fail here; the page logs its own errors
         try:
-            cursor = self.prescriptions.find(
-                {"medications.name": medication_name}
-            ).sort("created_at", DESCENDING).skip(skip).limit(limit)
+            return self._list_prescriptions(
+                {"medications.medication_id": _oid(medication_id)}, limit, after, fields,
+                f"medication {medication_id}"
+            )
             
-            return list(cursor)
+        except Exception as e:
+            logger.error(f"Error retrieving prescriptions for medication {medication_id}: {str(e)}")
+            raise
+
+    def get_medication_prescriptions_by_name(self, medication_name, limit=20, after=None, fields=PRESCRIPTION_SUMMARY_FIELDS):
+        """
+        Get prescriptions containing a medication, looked up by its name
+        
+        Args:
+            medication_name: Name of the medication
+            limit: Maximum number of prescriptions to return
+            after: next_after value from the previous page (None for the first page)
+            fields: Projection of the fields to return (None for full documents)
+            
+        Returns:
+            PrescriptionPage: Single-use iterable of prescription documents
+                with next_after; query errors are raised while iterating it
+        """
+        # Only building the query can fail here; the page logs its own errors
+        try:
+            medication = self.medications.find_one({"name": medication_name}, projection={"_id": 1})
+            if medication is None:
+                return PrescriptionPage(iter(()), limit, f"medication {medication_name}")
+                
+            return self.get_medication_prescriptions(medication["_id"], limit, after, fields)
             
         except Exception as e:
             logger.error(f"Error retrieving prescriptions for medication {medication_name}: {str(e)}")
@@ -257,16 +645,8 @@ class PrescriptionRepository:
             str: ID of the saved patient
         """
         try:
-            # Add timestamp
-            patient_data["created_at"] = datetime.datetime.now()
-            patient_data["updated_at"] = patient_data["created_at"]
-            
-            # Initialize prescription list if not present
-            if "prescription_ids" not in patient_data:
-                patient_data["prescription_ids"] = []
-            
-            # Insert patient
-            result = self.patients.insert_one(patient_data)
+            # Insert patient with timestamps
+            result = self.patients.insert_one(_timestamped(patient_data))
             
             logger.info(f"Saved patient {result.inserted_id}")
             return str(result.inserted_id)
@@ -289,12 +669,8 @@ class PrescriptionRepository:
             str: ID of the saved doctor
         """
         try:
-            # Add timestamp
-            doctor_data["created_at"] = datetime.datetime.now()
-            doctor_data["updated_at"] = doctor_data["created_at"]
-            
-            # Insert doctor
-            result = self.doctors.insert_one(doctor_data)
+            # Insert doctor with timestamps
+            result = self.doctors.insert_one(_timestamped(doctor_data))
             
             logger.info(f"Saved doctor {result.inserted_id}")
             return str(result.inserted_id)
@@ -317,12 +693,8 @@ class PrescriptionRepository:
             str: ID of the saved medication
         """
         try:
-            # Add timestamp
-            medication_data["created_at"] = datetime.datetime.now()
-            medication_data["updated_at"] = medication_data["created_at"]
-            
-            # Insert medication
-            result = self.medications.insert_one(medication_data)
+            # Insert medication with timestamps
+            result = self.medications.insert_one(_timestamped(medication_data))
             
             logger.info(f"Saved medication {result.inserted_id}")
             return str(result.inserted_id)
@@ -1,3 +1,4 @@
 
 # data/neo4j/__init__.py
-from data.neo4j.graph_manager import GraphManager
\ No newline at end of file
+from data.neo4j.graph_manager import GraphManager
+from data.neo4j.async_graph_manager import AsyncGraphManager
@@ -0,0 +1,169 @@
+# data/neo4j/_queries.py
+# Cypher statements shared by GraphManager and AsyncGraphManager.
+# Built once at import time so every call sends the identical string and
+# the server-side query plan cache keeps hitting.
+import hashlib
+import json
+from textwrap import dedent
+
+def content_hash(props):
+    """
+    Hash a node's property map so unchanged re-ingests can skip the SET
+    
+    Args:
+        props: Node properties
+        
+    Returns:
+        str: Hex digest of the canonical JSON form of props
+    """
+    canonical = json.dumps(props, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+# Connectivity check
+Q_VERIFY = "RETURN 1 AS num"
+
+# Idempotent schema DDL: uniqueness constraints back every MERGE key, and
+# medication names are indexed for the name-based MATCHes
+Q_SCHEMA = (
+    "CREATE CONSTRAINT patient_id IF NOT EXISTS FOR (p:Patient) REQUIRE p.patient_id IS UNIQUE",
+    "CREATE CONSTRAINT doctor_id IF NOT EXISTS FOR (d:Doctor) REQUIRE d.doctor_id IS UNIQUE",
+    "CREATE CONSTRAINT medication_id IF NOT EXISTS FOR (m:Medication) REQUIRE m.medication_id IS UNIQUE",
+    "CREATE CONSTRAINT prescription_id IF NOT EXISTS FOR (p:Prescription) REQUIRE p.prescription_id IS UNIQUE",
+    "CREATE INDEX medication_name IF NOT EXISTS FOR (m:Medication) ON (m.name)",
+)
+
+# Entity writers only SET when the stored content hash differs, so an
+# unchanged re-ingest writes nothing to the transaction log
+Q_ADD_PATIENT = dedent("""
+    MERGE (p:Patient {patient_id: $patient_id})
+    WITH p WHERE coalesce(p.content_hash, "") <> $content_hash
+    SET p += $props, p.content_hash = $content_hash
+""").strip()
+
+Q_ADD_DOCTOR = dedent("""
+    MERGE (d:Doctor {doctor_id: $doctor_id})
+    WITH d WHERE coalesce(d.content_hash, "") <> $content_hash
+    SET d += $props, d.content_hash = $content_hash
+""").strip()
+
+# Node and interaction relationships in one statement; an empty
+# $interactions list still creates the node. The interactions are merged
+# even when the node is unchanged, since their targets may be new.
+Q_ADD_MEDICATION = dedent("""
+    MERGE (m1:Medication {medication_id: $medication_id})
+    FOREACH (_ IN CASE WHEN coalesce(m1.content_hash, "") <> $content_hash THEN [1] ELSE [] END |
+        SET m1 += $props, m1.content_hash = $content_hash
+    )
+    WITH m1
+    UNWIND $interactions AS interaction
+    MATCH (m2:Medication {name: interaction.medication})
+    MERGE (m1)-[r:INTERACTS_WITH]->(m2)
+    SET r.severity = interaction.severity, r.description = interaction.description
+""").strip()
+
+Q_ADD_PRESCRIPTION = dedent("""
+    MERGE (p:Prescription {prescription_id: $prescription_id})
+    SET p += $props
+""").strip()
+
+Q_LINK_PATIENT_PRESCRIPTION = dedent("""
+    MATCH (p:Prescription {prescription_id: $prescription_id})
+    MATCH (patient:Patient {patient_id: $patient_id})
+    MERGE (patient)-[r:HAS_PRESCRIPTION]->(p)
+""").strip()
+
+Q_LINK_DOCTOR_PRESCRIPTION = dedent("""
+    MATCH (p:Prescription {prescription_id: $prescription_id})
+    MATCH (doctor:Doctor {doctor_id: $doctor_id})
+    MERGE (doctor)-[r:PRESCRIBED]->(p)
+""").strip()
+
+Q_ADD_PRESCRIPTION_MEDICATIONS = dedent("""
+    MATCH (p:Prescription {prescription_id: $prescription_id})
+    UNWIND $meds AS med
+    MATCH (m:Medication {name: med.name})
+    MERGE (p)-[r:INCLUDES]->(m)
+    SET r += med.props
+""").strip()
+
+Q_PATIENT_MEDICATION_HISTORY = dedent("""
+    MATCH (p:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(pr:Prescription)-[i:INCLUDES]->(m:Medication)
+    RETURN m.name as medication,
+           collect({
+               prescription_id: pr.prescription_id,
+               created_at: pr.created_at,
+               dosage: i.dosage,
+               frequency: i.frequency,
+               duration: i.duration,
+               instructions: i.instructions
+           }) as prescriptions
+    ORDER BY m.name
+""").strip()
+
+Q_POTENTIAL_DRUG_INTERACTIONS = dedent("""
+    MATCH (p:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(pr:Prescription)-[:INCLUDES]->(m1:Medication)
+    MATCH (m1)-[i:INTERACTS_WITH]->(m2:Medication)
+    MATCH (p)-[:HAS_PRESCRIPTION]->(pr2:Prescription)-[:INCLUDES]->(m2)
+    WHERE pr.status = 'active' AND pr2.status = 'active'
+    RETURN m1.name as medication1,
+           m2.name as medication2,
+           i.severity as severity,
+           i.description as description
+    ORDER BY i.severity DESC
+""").strip()
+
+Q_DOCTOR_PRESCRIPTION_PATTERNS = dedent("""
+    MATCH (d:Doctor {doctor_id: $doctor_id})-[:PRESCRIBED]->(:Prescription)-[:INCLUDES]->(m:Medication)
+    RETURN m.name as medication, count(*) as prescription_count
+    ORDER BY prescription_count DESC
+    LIMIT 10
+""").strip()
+
+Q_MEDICATION_PRESCRIPTION_COUNT = dedent("""
+    MATCH (:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
+    RETURN count(*) as total_prescriptions
+""").strip()
+
+Q_MEDICATION_TOP_DOCTORS = dedent("""
+    MATCH (d:Doctor)-[:PRESCRIBED]->(p:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
+    RETURN d.name as doctor, count(*) as count
+    ORDER BY count DESC
+    LIMIT 5
+""").strip()
+
+Q_MEDICATION_COPRESCRIBED = dedent("""
+    MATCH (p:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
+    MATCH (p)-[:INCLUDES]->(other:Medication)
+    WHERE other.name <> $medication_name
+    RETURN other.name as medication, count(*) as count
+    ORDER BY count DESC
+    LIMIT 5
+""").strip()
+
+# Only patients sharing at least one medication are expanded, instead of
+# every patient's full medication list
+Q_SIMILAR_PATIENTS = dedent("""
+    MATCH (:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(:Prescription)-[:INCLUDES]->(m:Medication)
+    WITH collect(distinct m.name) as p1Meds
+
+    MATCH (m:Medication)<-[:INCLUDES]-(:Prescription)<-[:HAS_PRESCRIPTION]-(p2:Patient)
+    WHERE m.name IN p1Meds AND p2.patient_id <> $patient_id
+    WITH p1Meds, p2, collect(distinct m.name) as commonMeds
+
+    MATCH (p2)-[:HAS_PRESCRIPTION]->(:Prescription)-[:INCLUDES]->(m2:Medication)
+    WITH p2, commonMeds,
+         size(p1Meds) as p1MedsCount,
+         count(distinct m2.name) as p2MedsCount
+
+    WITH p2, commonMeds,
+         1.0 * size(commonMeds) / (p1MedsCount + p2MedsCount - size(commonMeds)) as similarity
+
+    RETURN p2.patient_id as patient_id,
+           p2.name as name,
+           p2.age as age,
+           p2.gender as gender,
+           similarity,
+           commonMeds
+    ORDER BY similarity DESC
+    LIMIT $limit
+""").strip()
@@ -0,0 +1,440 @@
+
+# data/neo4j/async_graph_manager.py
+import asyncio
+from neo4j import AsyncGraphDatabase, RoutingControl
+from data.neo4j._queries import (
+    content_hash,
+    Q_SCHEMA,
+    Q_ADD_PATIENT,
+    Q_ADD_DOCTOR,
+    Q_ADD_MEDICATION,
+    Q_ADD_PRESCRIPTION,
+    Q_LINK_PATIENT_PRESCRIPTION,
+    Q_LINK_DOCTOR_PRESCRIPTION,
+    Q_ADD_PRESCRIPTION_MEDICATIONS,
+    Q_PATIENT_MEDICATION_HISTORY,
+    Q_POTENTIAL_DRUG_INTERACTIONS,
+    Q_DOCTOR_PRESCRIPTION_PATTERNS,
+    Q_MEDICATION_PRESCRIPTION_COUNT,
+    Q_MEDICATION_TOP_DOCTORS,
+    Q_MEDICATION_COPRESCRIBED,
+    Q_SIMILAR_PATIENTS,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+async def _run_statements(tx, statements):
+    """Transaction function running (query, params) pairs in order"""
+    for query, params in statements:
+        result = await tx.run(query, **params)
+        await result.consume()
+
+class AsyncGraphManager:
+    """Async Neo4j graph database manager for the medical system"""
+
+    def __init__(self, uri, username, password, database="neo4j", *,
+                 max_connection_pool_size=100, connection_acquisition_timeout=60.0,
+                 connection_timeout=30.0, max_transaction_retry_time=30.0,
+                 keep_alive=True):
+        """
+        Initialize async Neo4j graph manager
+
+        Mirrors GraphManager for asyncio handlers: every query goes through
+        driver.execute_query, so Bolt round trips never block the event loop.
+        The driver connects lazily; await verify_connectivity() at startup to
+        fail fast on a bad URI or credentials. Pool options are tuned as for
+        GraphManager.
+
+        Args:
+            uri: Neo4j URI
+            username: Neo4j username
+            password: Neo4j password
+            database: Neo4j database name
+            max_connection_pool_size: Maximum Bolt connections in the pool
+            connection_acquisition_timeout: Seconds to wait for a pooled connection
+            connection_timeout: Seconds to wait when opening a new connection
+            max_transaction_retry_time: Seconds to keep retrying managed transactions
+            keep_alive: Enable TCP keep-alive on Bolt connections
+        """
+        self.database = database
+        self.driver = AsyncGraphDatabase.driver(
+            uri,
+            auth=(username, password),
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            connection_timeout=connection_timeout,
+            max_transaction_retry_time=max_transaction_retry_time,
+            keep_alive=keep_alive
+        )
+        logger.info(f"Configured async Neo4j driver for {uri}")
+
+    async def verify_connectivity(self):
+        """Verify the driver can reach the Neo4j server"""
+        try:
+            await self.driver.verify_connectivity()
+        except Exception as e:
+            logger.error(f"Failed to connect to Neo4j: {str(e)}")
+            raise
+
+    async def create_schema(self):
+        """
+        Create uniqueness constraints and indexes if they do not exist
+
+        Call once at application startup.
+
+        Returns:
+            bool: True if the schema is in place, False otherwise
+        """
+        try:
+            for statement in Q_SCHEMA:
+                await self._write(statement)
+            logger.info("Ensured Neo4j constraints and indexes")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error creating Neo4j schema: {str(e)}")
+            return False
+
+    async def close(self):
+        """Close the Neo4j driver"""
+        try:
+            await self.driver.close()
+            logger.info("Neo4j connection closed")
+        except Exception as e:
+            logger.error(f"Error closing Neo4j connection: {str(e)}")
+
+    async def _write(self, query, **params):
+        """Run a write query and return its records"""
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            database_=self.database,
+            routing_=RoutingControl.WRITE
+        )
+        return records
+
+    async def _read(self, query, **params):
+        """Run a read query (routed to readers in a cluster) and return its rows as dicts"""
+        records, _, _ = await self.driver.execute_query(
+            query,
+            parameters_=params,
+            database_=self.database,
+            routing_=RoutingControl.READ
+        )
+        return [record.data() for record in records]
+
+    async def _write_transaction(self, statements):
+        """
+        Run several write queries in one managed transaction
+
+        They commit together or not at all; transient failures are retried
+        by the driver.
+
+        Args:
+            statements: List of (query, params) pairs
+        """
+        async with self.driver.session(database=self.database) as session:
+            await session.execute_write(_run_statements, statements)
+
+    async def add_patient(self, patient_id, patient_data):
+        """
+        Add a patient node to the graph
+
+        Args:
+            patient_id: Patient ID
+            patient_data: Dictionary containing patient attributes
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            # Convert patient data to a map of properties
+            props = {k: v for k, v in patient_data.items()
+                    if k not in ['prescription_ids'] and v is not None}
+            props['patient_id'] = patient_id
+
+            await self._write(
+                Q_ADD_PATIENT,
+                patient_id=patient_id,
+                props=props,
+                content_hash=content_hash(props)
+            )
+
+            logger.info(f"Added patient node for {patient_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error adding patient node {patient_id}: {str(e)}")
+            raise
+
+    async def add_doctor(self, doctor_id, doctor_data):
+        """
+        Add a doctor node to the graph
+
+        Args:
+            doctor_id: Doctor ID
+            doctor_data: Dictionary containing doctor attributes
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            # Convert doctor data to a map of properties
+            props = {k: v for k, v in doctor_data.items() if v is not None}
+            props['doctor_id'] = doctor_id
+
+            await self._write(
+                Q_ADD_DOCTOR,
+                doctor_id=doctor_id,
+                props=props,
+                content_hash=content_hash(props)
+            )
+
+            logger.info(f"Added doctor node for {doctor_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error adding doctor node {doctor_id}: {str(e)}")
+            raise
+
+    async def add_medication(self, medication_id, medication_data):
+        """
+        Add a medication node to the graph
+
+        Args:
+            medication_id: Medication ID
+            medication_data: Dictionary containing medication attributes
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            # Convert medication data to a map of properties; interactions
+            # become relationships rather than a node property
+            props = {k: v for k, v in medication_data.items()
+                    if k != 'interactions' and v is not None}
+            props['medication_id'] = medication_id
+
+            interactions = [
+                {
+                    'medication': interaction['medication'],
+                    'severity': interaction['severity'],
+                    'description': interaction['description']
+                }
+                for interaction in medication_data.get('interactions') or []
+            ]
+
+            # Create medication node and its interaction relationships
+            await self._write(
+                Q_ADD_MEDICATION,
+                medication_id=medication_id,
+                props=props,
+                content_hash=content_hash(props),
+                interactions=interactions
+            )
+
+            logger.info(f"Added medication node for {medication_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error adding medication node {medication_id}: {str(e)}")
+            raise
+
+    async def add_prescription(self, prescription_id, prescription_data):
+        """
+        Add a prescription node and related relationships
+
+        The node and all of its relationships are written in a single
+        transaction so they commit atomically.
+
+        Args:
+            prescription_id: Prescription ID
+            prescription_data: Dictionary containing prescription details
+
+        Returns:
+            bool: True if successful
+        """
+        try:
+            # Basic prescription properties
+            props = {
+                'prescription_id': prescription_id,
+                'created_at': prescription_data.get('created_at'),
+                'notes': prescription_data.get('notes'),
+                'status': prescription_data.get('status', 'active')
+            }
+
+            # Create prescription node
+            statements = [(Q_ADD_PRESCRIPTION, {
+                'prescription_id': prescription_id,
+                'props': props
+            })]
+
+            # Create relationship to patient
+            if 'patient_id' in prescription_data:
+                statements.append((Q_LINK_PATIENT_PRESCRIPTION, {
+                    'prescription_id': prescription_id,
+                    'patient_id': prescription_data['patient_id']
+                }))
+
+            # Create relationship to doctor
+            if 'doctor_id' in prescription_data:
+                statements.append((Q_LINK_DOCTOR_PRESCRIPTION, {
+                    'prescription_id': prescription_id,
+                    'doctor_id': prescription_data['doctor_id']
+                }))
+
+            # Create relationships to medications, in one query
+            if prescription_data.get('medications'):
+                meds = [
+                    {
+                        'name': med['name'],
+                        'props': {
+                            'dosage': med.get('dosage'),
+                            'frequency': med.get('frequency'),
+                            'duration': med.get('duration'),
+                            'instructions': med.get('instructions')
+                        }
+                    }
+                    for med in prescription_data['medications']
+                ]
+
+                statements.append((Q_ADD_PRESCRIPTION_MEDICATIONS, {
+                    'prescription_id': prescription_id,
+                    'meds': meds
+                }))
+
+            await self._write_transaction(statements)
+
+            logger.info(f"Added prescription node and relationships for {prescription_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error adding prescription node {prescription_id}: {str(e)}")
+            raise
+
+    async def get_patient_medication_history(self, patient_id):
+        """
+        Get all medications a patient has been prescribed
+
+        Args:
+            patient_id: Patient ID
+
+        Returns:
+            list: List of medications with prescription details
+        """
+        try:
+            return await self._read(
+                Q_PATIENT_MEDICATION_HISTORY,
+                patient_id=patient_id
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting medication history for patient {patient_id}: {str(e)}")
+            raise
+
+    async def get_potential_drug_interactions(self, patient_id):
+        """
+        Identify potential drug interactions for a patient's active medications
+
+        Args:
+            patient_id: Patient ID
+
+        Returns:
+            list: List of potential interactions
+        """
+        try:
+            return await self._read(
+                Q_POTENTIAL_DRUG_INTERACTIONS,
+                patient_id=patient_id
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting drug interactions for patient {patient_id}: {str(e)}")
+            raise
+
+    async def get_doctor_prescription_patterns(self, doctor_id):
+        """
+        Analyze prescription patterns for a specific doctor
+
+        Args:
+            doctor_id: Doctor ID
+
+        Returns:
+            list: Analysis of doctor's prescription patterns
+        """
+        try:
+            return await self._read(
+                Q_DOCTOR_PRESCRIPTION_PATTERNS,
+                doctor_id=doctor_id
+            )
+
+        except Exception as e:
+            logger.error(f"Error getting prescription patterns for doctor {doctor_id}: {str(e)}")
+            raise
+
+    async def get_medication_analytics(self, medication_name):
+        """
+        Get analytics for a specific medication
+
+        The three independent sub-queries run concurrently on separate
+        pooled connections.
+
+        Args:
+            medication_name: Name of the medication
+
+        Returns:
+            dict: Analytics for the medication
+        """
+        try:
+            count_records, doctor_records, coprescribed_records = await asyncio.gather(
+                # Get total prescriptions
+                self._read(
+                    Q_MEDICATION_PRESCRIPTION_COUNT,
+                    medication_name=medication_name
+                ),
+                # Get doctor distribution
+                self._read(
+                    Q_MEDICATION_TOP_DOCTORS,
+                    medication_name=medication_name
+                ),
+                # Get common co-prescribed medications
+                self._read(
+                    Q_MEDICATION_COPRESCRIBED,
+                    medication_name=medication_name
+                )
+            )
+
+            analytics = {
+                "total_prescriptions": count_records[0]["total_prescriptions"],
+                "top_prescribing_doctors": doctor_records,
+                "common_coprescribed_medications": coprescribed_records
+            }
+
+            return analytics
+
+        except Exception as e:
+            logger.error(f"Error getting analytics for medication {medication_name}: {str(e)}")
+            raise
+
+    async def find_similar_patients(self, patient_id, limit=5):
+        """
+        Find patients with similar medication profiles
+
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of similar patients to return
+
+        Returns:
+            list: Similar patients with similarity score
+        """
+        try:
+            return await self._read(
+                Q_SIMILAR_PATIENTS,
+                patient_id=patient_id,
+                limit=limit
+            )
+
+        except Exception as e:
+            logger.error(f"Error finding similar patients for {patient_id}: {str(e)}")
+            raise
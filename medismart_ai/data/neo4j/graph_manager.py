@@ -1,7 +1,28 @@
 
 
 # data/neo4j/graph_manager.py
-from neo4j import GraphDatabase
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from neo4j import GraphDatabase, Transaction, READ_ACCESS, WRITE_ACCESS
+from data.neo4j._queries import (
+    content_hash,
+    Q_VERIFY,
+    Q_SCHEMA,
+    Q_ADD_PATIENT,
+    Q_ADD_DOCTOR,
+    Q_ADD_MEDICATION,
+    Q_ADD_PRESCRIPTION,
+    Q_LINK_PATIENT_PRESCRIPTION,
+    Q_LINK_DOCTOR_PRESCRIPTION,
+    Q_ADD_PRESCRIPTION_MEDICATIONS,
+    Q_PATIENT_MEDICATION_HISTORY,
+    Q_POTENTIAL_DRUG_INTERACTIONS,
+    Q_DOCTOR_PRESCRIPTION_PATTERNS,
+    Q_MEDICATION_PRESCRIPTION_COUNT,
+    Q_MEDICATION_TOP_DOCTORS,
+    Q_MEDICATION_COPRESCRIBED,
+    Q_SIMILAR_PATIENTS,
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -9,20 +30,56 @@ logger = get_logger(__name__)
 class GraphManager:
     """Neo4j graph database manager for the medical system"""
     
-    def __init__(self, uri, username, password):
+    # Read cache TTLs in seconds, tiered by how quickly the answer goes stale
+    ENTITY_CACHE_TTL = 300
+    SEARCH_CACHE_TTL = 120
+    STATS_CACHE_TTL = 60
+    
+    def __init__(self, uri, username, password, database="neo4j", *, cache=None, create_schema=True,
+                 max_connection_pool_size=100, connection_acquisition_timeout=60.0,
+                 connection_timeout=30.0, max_transaction_retry_time=30.0,
+                 keep_alive=True):
         """
         Initialize Neo4j graph manager
         
+        Pool sizing: if requests fail with connection acquisition timeouts,
+        raise max_connection_pool_size (or the acquisition timeout); if the
+        database itself is over-subscribed, lower it so fewer concurrent
+        queries compete for server threads and memory.
+        
         Args:
             uri: Neo4j URI
             username: Neo4j username
             password: Neo4j password
+            database: Neo4j database name
+            cache: CacheManager used as a read-through cache for the getters (optional)
+            create_schema: Ensure constraints and indexes exist on startup
+            max_connection_pool_size: Maximum Bolt connections in the pool
+            connection_acquisition_timeout: Seconds to wait for a pooled connection
+            connection_timeout: Seconds to wait when opening a new connection
+            max_transaction_retry_time: Seconds to keep retrying managed transactions
+            keep_alive: Enable TCP keep-alive on Bolt connections
         """
+        self.database = database
+        self.cache = cache
+        
+        # Cache keys made stale by writes in transactions opened by
+        # transaction(), by transaction id, dropped once they commit
+        self._pending_invalidations = {}
+        
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(username, password))
+            self.driver = GraphDatabase.driver(
+                uri,
+                auth=(username, password),
+                max_connection_pool_size=max_connection_pool_size,
+                connection_acquisition_timeout=connection_acquisition_timeout,
+                connection_timeout=connection_timeout,
+                max_transaction_retry_time=max_transaction_retry_time,
+                keep_alive=keep_alive
+            )
             # Verify connection by running a simple query
-            with self.driver.session() as session:
-                result = session.run("RETURN 1 AS num")
+            with self._session(read_only=True) as session:
+                result = session.run(Q_VERIFY)
                 result.single()
             logger.info(f"Connected to Neo4j at {uri}")
             
@@ -30,6 +87,27 @@ class GraphManager:
             logger.error(f"Failed to connect to Neo4j: {str(e)}")
             raise
             
+        if create_schema:
+            self._create_schema()
+            
+    def _create_schema(self):
+        """
+        Create uniqueness constraints and indexes if they do not exist
+        
+        Returns:
+            bool: True if the schema is in place, False otherwise
+        """
+        try:
+            with self._session() as session:
+                for statement in Q_SCHEMA:
+                    session.run(statement).consume()
+            logger.info("Ensured Neo4j constraints and indexes")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error creating Neo4j schema: {str(e)}")
+            return False
+            
     def close(self):
         """Close the Neo4j driver"""
         try:
@@ -38,138 +116,260 @@ class GraphManager:
         except Exception as e:
             logger.error(f"Error closing Neo4j connection: {str(e)}")
             
-    def add_patient(self, patient_id, patient_data):
+    def _session(self, read_only=False):
+        """
+        Open a session on the configured database
+        
+        Naming the database skips the home-database lookup, and read-only
+        sessions are routed to read replicas in a cluster.
+        
+        Args:
+            read_only: Open the session in read access mode
+            
+        Returns:
+            Session: New Neo4j session
+        """
+        return self.driver.session(
+            database=self.database,
+            default_access_mode=READ_ACCESS if read_only else WRITE_ACCESS
+        )
+        
+    def _run(self, query, session=None, read_only=False, **params):
+        """
+        Run a query on a caller-supplied session or transaction
+        
+        Without one, a short-lived session is opened for the single query.
+        Records are materialized before the session closes.
+        
+        Args:
+            query: Cypher query
+            session: Open Session or Transaction to run on (optional)
+            read_only: Open any new session in read access mode
+            **params: Query parameters
+            
+        Returns:
+            list: Result records
+        """
+        if session is not None:
+            return list(session.run(query, **params))
+        
+        with self._session(read_only) as new_session:
+            return list(new_session.run(query, **params))
+            
+    @contextmanager
+    def transaction(self):
+        """
+        Open one session and explicit transaction for a group of related writes
+        
+        Pass the yielded transaction as the session argument of the add_*
+        methods. It commits when the block exits cleanly and rolls back if
+        it raises. Cached reads made stale by the writes are dropped only
+        after the commit, so a read in between cannot re-cache old data.
+        
+        Yields:
+            Transaction: Open Neo4j transaction
+        """
+        stale = []
+        with self._session() as session:
+            with session.begin_transaction() as tx:
+                self._pending_invalidations[id(tx)] = stale
+                try:
+                    yield tx
+                finally:
+                    self._pending_invalidations.pop(id(tx), None)
+                    
+        # Only reached once the transaction has committed
+        self._invalidate(*stale)
+        
+    def _cached(self, key_type, key_id, fetch, expire_time):
+        """
+        Read through the cache when one is configured
+        
+        Args:
+            key_type: Cache key type
+            key_id: Cache key ID
+            fetch: Function running the query on a cache miss
+            expire_time: Cache expiration time in seconds
+            
+        Returns:
+            object: Cached or freshly queried data
+        """
+        if self.cache is None:
+            return fetch()
+        return self.cache.cache_with_fallback(key_type, key_id, fetch, expire_time)
+        
+    def _invalidate(self, *keys, session=None):
+        """
+        Drop cached reads made stale by a write
+        
+        Writes made through a transaction from transaction() are not
+        visible until it commits, so their keys are dropped after the
+        commit instead. A transaction the caller opened some other way
+        gives no commit hook; its keys are left to expire.
+        
+        Args:
+            *keys: (key_type, key_id) pairs; a key_id ending in '*' is
+                flushed as a pattern
+            session: Session or Transaction the write ran on (optional)
+        """
+        if self.cache is None:
+            return
+            
+        if isinstance(session, Transaction):
+            pending = self._pending_invalidations.get(id(session))
+            if pending is not None:
+                pending.extend(keys)
+            elif keys:
+                logger.warning(
+                    "Cache not invalidated for writes in a transaction not opened "
+                    "by GraphManager.transaction(); cached reads expire by TTL"
+                )
+            return
+            
+        for key_type, key_id in keys:
+            if str(key_id).endswith('*'):
+                self.cache.flush_by_pattern(f"{key_type}:{key_id}")
+            else:
+                self.cache.delete(key_type, key_id)
+                
+    def add_patient(self, patient_id, patient_data, session=None):
         """
         Add a patient node to the graph
         
         Args:
             patient_id: Patient ID
             patient_data: Dictionary containing patient attributes
+            session: Open Session or Transaction to reuse (optional)
             
         Returns:
             bool: True if successful
         """
         try:
-            with self.driver.session() as session:
-                # Convert patient data to a map of properties
-                props = {k: v for k, v in patient_data.items() 
-                        if k not in ['prescription_ids'] and v is not None}
-                props['patient_id'] = patient_id
-                
-                # Create patient node
-                session.run(
-                    """
-                    MERGE (p:Patient {patient_id: $patient_id})
-                    SET p += $props
-                    """,
-                    patient_id=patient_id,
-                    props=props
-                )
-                
-                logger.info(f"Added patient node for {patient_id}")
-                return True
+            # Convert patient data to a map of properties
+            props = {k: v for k, v in patient_data.items() 
+                    if k not in ['prescription_ids'] and v is not None}
+            props['patient_id'] = patient_id
+            
+            # Create patient node
+            self._run(
+                Q_ADD_PATIENT,
+                session=session,
+                patient_id=patient_id,
+                props=props,
+                content_hash=content_hash(props)
+            )
+            
+            logger.info(f"Added patient node for {patient_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error adding patient node {patient_id}: {str(e)}")
             raise
             
-    def add_doctor(self, doctor_id, doctor_data):
+    def add_doctor(self, doctor_id, doctor_data, session=None):
         """
         Add a doctor node to the graph
         
         Args:
             doctor_id: Doctor ID
             doctor_data: Dictionary containing doctor attributes
+            session: Open Session or Transaction to reuse (optional)
             
         Returns:
             bool: True if successful
         """
         try:
-            with self.driver.session() as session:
-                # Convert doctor data to a map of properties
-                props = {k: v for k, v in doctor_data.items() if v is not None}
-                props['doctor_id'] = doctor_id
-                
-                # Create doctor node
-                session.run(
-                    """
-                    MERGE (d:Doctor {doctor_id: $doctor_id})
-                    SET d += $props
-                    """,
-                    doctor_id=doctor_id,
-                    props=props
-                )
-                
-                logger.info(f"Added doctor node for {doctor_id}")
-                return True
+            # Convert doctor data to a map of properties
+            props = {k: v for k, v in doctor_data.items() if v is not None}
+            props['doctor_id'] = doctor_id
+            
+            # Create doctor node
+            self._run(
+                Q_ADD_DOCTOR,
+                session=session,
+                doctor_id=doctor_id,
+                props=props,
+                content_hash=content_hash(props)
+            )
+            
+            logger.info(f"Added doctor node for {doctor_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error adding doctor node {doctor_id}: {str(e)}")
             raise
             
-    def add_medication(self, medication_id, medication_data):
+    def add_medication(self, medication_id, medication_data, session=None):
         """
         Add a medication node to the graph
         
         Args:
             medication_id: Medication ID
             medication_data: Dictionary containing medication attributes
+            session: Open Session or Transaction to reuse (optional)
             
         Returns:
             bool: True if successful
         """
         try:
-            with self.driver.session() as session:
-                # Convert medication data to a map of properties
-                props = {k: v for k, v in medication_data.items() if v is not None}
-                props['medication_id'] = medication_id
-                
-                # Create medication node
-                session.run(
-                    """
-                    MERGE (m:Medication {medication_id: $medication_id})
-                    SET m += $props
-                    """,
-                    medication_id=medication_id,
-                    props=props
-                )
-                
-                # Add relationships for interactions if they exist
-                if 'interactions' in medication_data and medication_data['interactions']:
-                    for interaction in medication_data['interactions']:
-                        session.run(
-                            """
-                            MATCH (m1:Medication {medication_id: $med1_id})
-                            MATCH (m2:Medication {name: $med2_name})
-                            MERGE (m1)-[r:INTERACTS_WITH]->(m2)
-                            SET r.severity = $severity, r.description = $description
-                            """,
-                            med1_id=medication_id,
-                            med2_name=interaction['medication'],
-                            severity=interaction['severity'],
-                            description=interaction['description']
-                        )
+            # Convert medication data to a map of properties; interactions
+            # become relationships rather than a node property
+            props = {k: v for k, v in medication_data.items()
+                    if k != 'interactions' and v is not None}
+            props['medication_id'] = medication_id
+            
+            interactions = [
+                {
+                    'medication': interaction['medication'],
+                    'severity': interaction['severity'],
+                    'description': interaction['description']
+                }
+                for interaction in medication_data.get('interactions') or []
+            ]
+            
+            # Create medication node and its interaction relationships
+            self._run(
+                Q_ADD_MEDICATION,
+                session=session,
+                medication_id=medication_id,
+                props=props,
+                content_hash=content_hash(props),
+                interactions=interactions
+            )
                 
-                logger.info(f"Added medication node for {medication_id}")
-                return True
+            # New interactions can surface for any patient taking this medication
+            stale = [('medication_analytics', medication_data['name'])] if medication_data.get('name') else []
+            if medication_data.get('interactions'):
+                stale.append(('interactions', '*'))
+            self._invalidate(*stale, session=session)
+            
+            logger.info(f"Added medication node for {medication_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error adding medication node {medication_id}: {str(e)}")
             raise
             
-    def add_prescription(self, prescription_id, prescription_data):
+    def add_prescription(self, prescription_id, prescription_data, session=None):
         """
         Add a prescription node and related relationships
         
+        Without a session, the node and all of its relationships are written
+        in a single transaction so they commit atomically.
+        
         Args:
             prescription_id: Prescription ID
             prescription_data: Dictionary containing prescription details
+            session: Open Session or Transaction to reuse (optional)
             
         Returns:
             bool: True if successful
         """
         try:
-            with self.driver.session() as session:
+            with ExitStack() as stack:
+                if session is None:
+                    session = stack.enter_context(self.transaction())
+                    
                 # Basic prescription properties
                 props = {
                     'prescription_id': prescription_id,
@@ -179,63 +379,68 @@ class GraphManager:
                 }
                 
                 # Create prescription node
-                session.run(
-                    """
-                    MERGE (p:Prescription {prescription_id: $prescription_id})
-                    SET p += $props
-                    """,
+                self._run(
+                    Q_ADD_PRESCRIPTION,
+                    session=session,
                     prescription_id=prescription_id,
                     props=props
                 )
                 
                 # Create relationship to patient
                 if 'patient_id' in prescription_data:
-                    session.run(
-                        """
-                        MATCH (p:Prescription {prescription_id: $prescription_id})
-                        MATCH (patient:Patient {patient_id: $patient_id})
-                        MERGE (patient)-[r:HAS_PRESCRIPTION]->(p)
-                        """,
+                    self._run(
+                        Q_LINK_PATIENT_PRESCRIPTION,
+                        session=session,
                         prescription_id=prescription_id,
                         patient_id=prescription_data['patient_id']
                     )
                 
                 # Create relationship to doctor
                 if 'doctor_id' in prescription_data:
-                    session.run(
-                        """
-                        MATCH (p:Prescription {prescription_id: $prescription_id})
-                        MATCH (doctor:Doctor {doctor_id: $doctor_id})
-                        MERGE (doctor)-[r:PRESCRIBED]->(p)
-                        """,
+                    self._run(
+                        Q_LINK_DOCTOR_PRESCRIPTION,
+                        session=session,
                         prescription_id=prescription_id,
                         doctor_id=prescription_data['doctor_id']
                     )
                 
-                # Create relationships to medications
-                if 'medications' in prescription_data:
-                    for med in prescription_data['medications']:
-                        med_props = {
-                            'dosage': med.get('dosage'),
-                            'frequency': med.get('frequency'),
-                            'duration': med.get('duration'),
-                            'instructions': med.get('instructions')
+                # Create relationships to medications, in one query
+                if prescription_data.get('medications'):
+                    meds = [
+                        {
+                            'name': med['name'],
+                            'props': {
+                                'dosage': med.get('dosage'),
+                                'frequency': med.get('frequency'),
+                                'duration': med.get('duration'),
+                                'instructions': med.get('instructions')
+                            }
                         }
-                        
-                        session.run(
-                            """
-                            MATCH (p:Prescription {prescription_id: $prescription_id})
-                            MATCH (m:Medication {name: $medication_name})
-                            MERGE (p)-[r:INCLUDES]->(m)
-                            SET r += $props
-                            """,
-                            prescription_id=prescription_id,
-                            medication_name=med['name'],
-                            props=med_props
-                        )
+                        for med in prescription_data['medications']
+                    ]
+                    
+                    self._run(
+                        Q_ADD_PRESCRIPTION_MEDICATIONS,
+                        session=session,
+                        prescription_id=prescription_id,
+                        meds=meds
+                    )
+                    
+                # Invalidate once the writes above commit
+                stale = [('medication_analytics', med['name']) for med in prescription_data.get('medications') or []]
+                if 'patient_id' in prescription_data:
+                    patient_id = prescription_data['patient_id']
+                    stale += [
+                        ('patient_history', patient_id),
+                        ('interactions', patient_id),
+                        ('similar_patients', f"{patient_id}:*")
+                    ]
+                if 'doctor_id' in prescription_data:
+                    stale.append(('doctor_patterns', prescription_data['doctor_id']))
+                self._invalidate(*stale, session=session)
                 
-                logger.info(f"Added prescription node and relationships for {prescription_id}")
-                return True
+            logger.info(f"Added prescription node and relationships for {prescription_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"Error adding prescription node {prescription_id}: {str(e)}")
@@ -252,30 +457,27 @@ class GraphManager:
             list: List of medications with prescription details
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (p:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(pr:Prescription)-[i:INCLUDES]->(m:Medication)
-                    RETURN m.name as medication, 
-                           collect({
-                               prescription_id: pr.prescription_id, 
-                               created_at: pr.created_at,
-                               dosage: i.dosage,
-                               frequency: i.frequency,
-                               duration: i.duration,
-                               instructions: i.instructions
-                           }) as prescriptions
-                    ORDER BY m.name
-                    """,
-                    patient_id=patient_id
-                )
-                
-                return [record for record in result]
+            return self._cached(
+                "patient_history",
+                patient_id,
+                lambda: self._query_patient_medication_history(patient_id),
+                self.ENTITY_CACHE_TTL
+            )
                 
         except Exception as e:
             logger.error(f"Error getting medication history for patient {patient_id}: {str(e)}")
             raise
             
+    def _query_patient_medication_history(self, patient_id):
+        """Query a patient's medication history"""
+        records = self._run(
+            Q_PATIENT_MEDICATION_HISTORY,
+            read_only=True,
+            patient_id=patient_id
+        )
+        
+        return [record.data() for record in records]
+            
     def get_potential_drug_interactions(self, patient_id):
         """
         Identify potential drug interactions for a patient's active medications
@@ -287,28 +489,27 @@ class GraphManager:
             list: List of potential interactions
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (p:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(pr:Prescription)-[:INCLUDES]->(m1:Medication)
-                    MATCH (m1)-[i:INTERACTS_WITH]->(m2:Medication)
-                    MATCH (p)-[:HAS_PRESCRIPTION]->(pr2:Prescription)-[:INCLUDES]->(m2)
-                    WHERE pr.status = 'active' AND pr2.status = 'active'
-                    RETURN m1.name as medication1, 
-                           m2.name as medication2,
-                           i.severity as severity,
-                           i.description as description
-                    ORDER BY i.severity DESC
-                    """,
-                    patient_id=patient_id
-                )
-                
-                return [record for record in result]
+            return self._cached(
+                "interactions",
+                patient_id,
+                lambda: self._query_potential_drug_interactions(patient_id),
+                self.ENTITY_CACHE_TTL
+            )
                 
         except Exception as e:
             logger.error(f"Error getting drug interactions for patient {patient_id}: {str(e)}")
             raise
             
+    def _query_potential_drug_interactions(self, patient_id):
+        """Query interactions between a patient's active medications"""
+        records = self._run(
+            Q_POTENTIAL_DRUG_INTERACTIONS,
+            read_only=True,
+            patient_id=patient_id
+        )
+        
+        return [record.data() for record in records]
+            
     def get_doctor_prescription_patterns(self, doctor_id):
         """
         Analyze prescription patterns for a specific doctor
@@ -320,23 +521,27 @@ class GraphManager:
             list: Analysis of doctor's prescription patterns
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (d:Doctor {doctor_id: $doctor_id})-[:PRESCRIBED]->(:Prescription)-[:INCLUDES]->(m:Medication)
-                    RETURN m.name as medication, count(*) as prescription_count
-                    ORDER BY prescription_count DESC
-                    LIMIT 10
-                    """,
-                    doctor_id=doctor_id
-                )
-                
-                return [record for record in result]
+            return self._cached(
+                "doctor_patterns",
+                doctor_id,
+                lambda: self._query_doctor_prescription_patterns(doctor_id),
+                self.STATS_CACHE_TTL
+            )
                 
         except Exception as e:
             logger.error(f"Error getting prescription patterns for doctor {doctor_id}: {str(e)}")
             raise
             
+    def _query_doctor_prescription_patterns(self, doctor_id):
+        """Query a doctor's most prescribed medications"""
+        records = self._run(
+            Q_DOCTOR_PRESCRIPTION_PATTERNS,
+            read_only=True,
+            doctor_id=doctor_id
+        )
+        
+        return [record.data() for record in records]
+            
     
     def get_medication_analytics(self, medication_name):
         """
@@ -349,57 +554,39 @@ class GraphManager:
             dict: Analytics for the medication
         """
         try:
-            with self.driver.session() as session:
-                # Get total prescriptions
-                count_result = session.run(
-                    """
-                    MATCH (:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
-                    RETURN count(*) as total_prescriptions
-                    """,
-                    medication_name=medication_name
-                ).single()
-                
-                # Get doctor distribution
-                doctor_result = session.run(
-                    """
-                    MATCH (d:Doctor)-[:PRESCRIBED]->(p:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
-                    RETURN d.name as doctor_name, count(*) as prescription_count
-                    ORDER BY prescription_count DESC
-                    LIMIT 5
-                    """,
-                    medication_name=medication_name
-                )
-                
-                # Get common co-prescribed medications
-                coprescribed_result = session.run(
-                    """
-                    MATCH (p:Prescription)-[:INCLUDES]->(m:Medication {name: $medication_name})
-                    MATCH (p)-[:INCLUDES]->(other:Medication)
-                    WHERE other.name <> $medication_name
-                    RETURN other.name as other_medication, count(*) as coprescribed_count
-                    ORDER BY coprescribed_count DESC
-                    LIMIT 5
-                    """,
-                    medication_name=medication_name
-                )
-                
-                analytics = {
-                    "total_prescriptions": count_result["total_prescriptions"],
-                    "top_prescribing_doctors": [
-                        {"doctor": record["doctor_name"], "count": record["prescription_count"]} 
-                        for record in doctor_result
-                    ],
-                    "common_coprescribed_medications": [
-                        {"medication": record["other_medication"], "count": record["coprescribed_count"]} 
-                        for record in coprescribed_result
-                    ]
-                }
-                
-                return analytics
+            return self._cached(
+                "medication_analytics",
+                medication_name,
+                lambda: self._query_medication_analytics(medication_name),
+                self.STATS_CACHE_TTL
+            )
                 
         except Exception as e:
             logger.error(f"Error getting analytics for medication {medication_name}: {str(e)}")
             raise
+            
+    def _query_medication_analytics(self, medication_name):
+        """
+        Query prescription counts, top doctors and co-prescriptions for a medication
+        
+        The three sub-queries are independent, so each runs on its own
+        pooled session in parallel and the total latency is that of the
+        slowest one.
+        """
+        def run(query):
+            return self._run(query, read_only=True, medication_name=medication_name)
+            
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # Get total prescriptions, doctor distribution and common co-prescribed medications
+            count_future = executor.submit(run, Q_MEDICATION_PRESCRIPTION_COUNT)
+            doctor_future = executor.submit(run, Q_MEDICATION_TOP_DOCTORS)
+            coprescribed_future = executor.submit(run, Q_MEDICATION_COPRESCRIBED)
+            
+            return {
+                "total_prescriptions": count_future.result()[0]["total_prescriptions"],
+                "top_prescribing_doctors": [record.data() for record in doctor_future.result()],
+                "common_coprescribed_medications": [record.data() for record in coprescribed_future.result()]
+            }
 
     def find_similar_patients(self, patient_id, limit=5):
         """
@@ -413,48 +600,24 @@ class GraphManager:
             list: Similar patients with similarity score
         """
         try:
-            with self.driver.session() as session:
-                result = session.run(
-                    """
-                    MATCH (p1:Patient {patient_id: $patient_id})-[:HAS_PRESCRIPTION]->(pr1:Prescription)-[:INCLUDES]->(m:Medication)
-                    WITH p1, collect(distinct m.name) as p1Meds
-                    
-                    MATCH (p2:Patient)-[:HAS_PRESCRIPTION]->(pr2:Prescription)-[:INCLUDES]->(m2:Medication)
-                    WHERE p2.patient_id <> $patient_id
-                    WITH p1, p1Meds, p2, collect(distinct m2.name) as p2Meds
-                    
-                    WITH p1, p2, 
-                         p1Meds, p2Meds,
-                         [med in p1Meds WHERE med in p2Meds] as commonMeds,
-                         size(p1Meds) as p1MedsCount,
-                         size(p2Meds) as p2MedsCount
-                    
-                    WITH p1, p2, 
-                         p1MedsCount, p2MedsCount,
-                         size(commonMeds) as commonMedsCount,
-                         commonMeds
-                    
-                    WITH p2, 
-                         1.0 * commonMedsCount / (p1MedsCount + p2MedsCount - commonMedsCount) as similarity,
-                         commonMeds
-                    
-                    WHERE similarity > 0
-                    RETURN p2.patient_id as patient_id, 
-                           p2.name as name,
-                           p2.age as age,
-                           p2.gender as gender,
-                           similarity,
-                           commonMeds
-                    ORDER BY similarity DESC
-                    LIMIT $limit
-                    """,
-                    patient_id=patient_id,
-                    limit=limit
-                )
-                
-                return [record for record in result]
+            return self._cached(
+                "similar_patients",
+                f"{patient_id}:{limit}",
+                lambda: self._query_similar_patients(patient_id, limit),
+                self.SEARCH_CACHE_TTL
+            )
                 
         except Exception as e:
             logger.error(f"Error finding similar patients for {patient_id}: {str(e)}")
             raise
-
+            
+    def _query_similar_patients(self, patient_id, limit):
+        """Query patients ranked by Jaccard similarity of their medications"""
+        records = self._run(
+            Q_SIMILAR_PATIENTS,
+            read_only=True,
+            patient_id=patient_id,
+            limit=limit
+        )
+        
+        return [record.data() for record in records]
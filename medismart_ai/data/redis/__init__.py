@@ -1,3 +1,3 @@
 
 # data/redis/__init__.py
-from data.redis.cache_manager import CacheManager
\ No newline at end of file
+from data.redis.cache_manager import CacheManager, redis_cached
\ No newline at end of file
@@ -2,40 +2,328 @@
 # data/redis/cache_manager.py
 import redis
 import json
-import pickle
+import zlib
+import fnmatch
+import functools
+import threading
+from concurrent.futures import Future, TimeoutError as FuturesTimeoutError
+from collections import Counter, OrderedDict, defaultdict, deque
 from utils.logger import get_logger
 import time
 
 logger = get_logger(__name__)
 
+# Payloads above this size are compressed before they are stored
+COMPRESSION_THRESHOLD = 4096
+
+# Maximum keys per UNLINK command when flushing by pattern
+UNLINK_BATCH_SIZE = 512
+
+# One-byte tag prefixed to every stored payload
+_RAW_TAG = b"\x00"
+_ZLIB_TAG = b"\x01"
+
+def _dumps(data):
+    """
+    Serialize cache data to tagged, compact JSON bytes
+    
+    Values JSON has no type for (datetimes, Neo4j temporal types) are
+    stored as their string form. Large payloads, such as result sets
+    with many repeated keys, are zlib-compressed.
+    """
+    payload = json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    if len(payload) > COMPRESSION_THRESHOLD:
+        return _ZLIB_TAG + zlib.compress(payload, 3)
+    return _RAW_TAG + payload
+
+def _loads(raw):
+    """Deserialize bytes written by _dumps"""
+    tag, payload = raw[:1], raw[1:]
+    if tag == _ZLIB_TAG:
+        return json.loads(zlib.decompress(payload))
+    if tag == _RAW_TAG:
+        return json.loads(payload)
+    # Untagged JSON written before payloads were tagged
+    return json.loads(raw)
+
+def _is_wrong_type(error):
+    """Whether a Redis error is a command run against a key of another type"""
+    return isinstance(error, redis.ResponseError) and str(error).startswith("WRONGTYPE")
+
+def _walk_path(value, path):
+    """Follow a dotted JSONPath such as '$.a.b' through decoded JSON"""
+    for field in path.lstrip("$").split("."):
+        if not field:
+            continue
+        if not isinstance(value, dict):
+            return None
+        value = value.get(field)
+    return value
+
+def redis_cached(key_type, key, ttl=None):
+    """
+    Decorator memoizing a client method's JSON result in Redis
+    
+    The decorated object must expose a `cache` attribute holding a
+    CacheManager; when it is None the method is called directly. Empty
+    results are not cached so that failed lookups are retried.
+    
+    Args:
+        key_type: Type of the key (e.g., 'fda:interactions')
+        key: Function building the key ID from the method's arguments
+        ttl: Cache expiration time in seconds (defaults to the cache's expire_time)
+        
+    Returns:
+        function: Decorator
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "cache", None)
+            if cache is None:
+                return func(self, *args, **kwargs)
+                
+            key_id = key(self, *args, **kwargs)
+            cached_data = cache.get_json(key_type, key_id)
+            if cached_data is not None:
+                return cached_data
+                
+            data = func(self, *args, **kwargs)
+            if data:
+                cache.set_json(key_type, key_id, data, ttl)
+                
+            return data
+        return wrapper
+    return decorator
+
+class _LocalCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after a TTL
+    
+    Entries hold the encoded payload read from Redis rather than the
+    decoded object, so every hit decodes a fresh copy that callers are
+    free to modify.
+    """
+    
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        
+    def get(self, key):
+        """Return the live payload for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+                
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+                
+            self._entries.move_to_end(key)
+            return value
+            
+    def set(self, key, value):
+        """Store a payload, evicting the least recently used entries beyond maxsize"""
+        if self.maxsize <= 0:
+            return
+            
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                
+    def pop(self, key):
+        """Drop key if present"""
+        with self._lock:
+            self._entries.pop(key, None)
+            
+    def pop_matching(self, pattern):
+        """Drop every key matching a Redis-style glob pattern"""
+        with self._lock:
+            for key in [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]:
+                del self._entries[key]
+
+class _CacheStats:
+    """Thread-safe hit/miss counters and recent operation latencies"""
+    
+    # Latency samples kept per operation for the percentiles
+    LATENCY_SAMPLES = 1000
+    
+    def __init__(self):
+        self._hits = Counter()
+        self._misses = Counter()
+        self._latencies = defaultdict(lambda: deque(maxlen=self.LATENCY_SAMPLES))
+        self._lock = threading.Lock()
+        
+    def record_lookup(self, key_type, hit):
+        """Count a lookup of key_type as a hit or a miss"""
+        with self._lock:
+            (self._hits if hit else self._misses)[key_type] += 1
+            
+    def record_latency(self, op, seconds):
+        """Record how long one operation took"""
+        with self._lock:
+            self._latencies[op].append(seconds)
+            
+    def snapshot(self):
+        """Return hit/miss totals per key type and latency percentiles per operation"""
+        with self._lock:
+            hits, misses = dict(self._hits), dict(self._misses)
+            latencies = {op: sorted(samples) for op, samples in self._latencies.items()}
+            
+        total_hits, total_misses = sum(hits.values()), sum(misses.values())
+        lookups = total_hits + total_misses
+        
+        return {
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": total_hits / lookups if lookups else None,
+            "by_key_type": {
+                key_type: {"hits": hits.get(key_type, 0), "misses": misses.get(key_type, 0)}
+                for key_type in sorted(set(hits) | set(misses))
+            },
+            "latency_ms": {
+                op: {
+                    f"p{q}": samples[min(len(samples) - 1, len(samples) * q // 100)] * 1000
+                    for q in (50, 95, 99)
+                }
+                for op, samples in latencies.items() if samples
+            }
+        }
+
+def _timed(op):
+    """Decorator recording a CacheManager method's latency under op"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                self._stats.record_latency(op, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
 class CacheManager:
     """Redis cache manager for the medical system"""
     
-    def __init__(self, host='localhost', port=6379, db=0, password=None, expire_time=3600):
+    # Minimum seconds between "Redis unavailable" error logs
+    UNAVAILABLE_LOG_INTERVAL = 10
+    
+    # Seconds a caller waits on another thread's in-flight fallback
+    SINGLEFLIGHT_TIMEOUT = 5
+    
+    def __init__(self, host='localhost', port=6379, db=0, password=None, expire_time=3600,
+                 local_cache_size=10000, local_cache_ttl=60, max_connections=64,
+                 socket_timeout=1.0, health_check_interval=30):
         """
         Initialize Redis cache manager
         
+        Reads are served from a small in-process cache before Redis. Entries
+        there live at most local_cache_ttl seconds, which bounds how stale a
+        worker can be after another process writes or deletes the key.
+        
+        An unreachable Redis does not fail construction or callers: every
+        operation degrades to a cache miss (or a failed write) and the
+        outage is logged at most once per UNAVAILABLE_LOG_INTERVAL seconds.
+        
         Args:
             host: Redis host
             port: Redis port
             db: Redis DB number
             password: Redis password
             expire_time: Default cache expiration time in seconds
+            local_cache_size: Maximum entries in the in-process cache (0 disables it)
+            local_cache_ttl: Maximum lifetime of an in-process entry in seconds
+            max_connections: Maximum pooled Redis connections
+            socket_timeout: Seconds to wait on connect and on each command
+            health_check_interval: Seconds of idleness before a pooled
+                connection is checked with PING on reuse
         """
+        self._local = _LocalCache(local_cache_size, min(local_cache_ttl, expire_time))
+        self._stats = _CacheStats()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        self.expire_time = expire_time
+        self._last_unavailable_log = 0.0
+        
+        pool = redis.ConnectionPool(
+            host=host,
+            port=port,
+            db=db,
+            password=password,
+            max_connections=max_connections,
+            socket_keepalive=True,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+            health_check_interval=health_check_interval
+        )
+        self.redis_client = redis.Redis(connection_pool=pool)
+        
+        self._has_json = False
         try:
-            self.redis_client = redis.Redis(
-                host=host,
-                port=port,
-                db=db,
-                password=password,
-                decode_responses=False
-            )
-            self.expire_time = expire_time
+            self.redis_client.ping()
+            self._has_json = self._detect_redis_json()
             logger.info(f"Connected to Redis: {host}:{port}")
             
-        except redis.ConnectionError as e:
-            logger.error(f"Failed to connect to Redis: {str(e)}")
-            raise
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            logger.error(f"Redis unavailable at {host}:{port}, continuing without cache: {str(e)}")
+            
+    def _detect_redis_json(self):
+        """
+        Check whether the RedisJSON module is loaded
+        
+        Returns:
+            bool: True if JSON.* commands are available
+        """
+        try:
+            modules = self.redis_client.execute_command("MODULE", "LIST")
+            for module in modules:
+                # Each entry is a flat [b"name", <name>, b"ver", <version>, ...] list
+                fields = dict(zip(module[::2], module[1::2]))
+                if fields.get(b"name", b"").lower() in (b"rejson", b"redisjson"):
+                    logger.info("RedisJSON detected, storing JSON entries natively")
+                    return True
+        except redis.ResponseError:
+            # MODULE LIST is not available (e.g. disabled or a managed Redis)
+            pass
+        return False
+        
+    def _log_unavailable(self, error):
+        """Log a Redis outage, rate-limited so a down server does not flood the logs"""
+        now = time.monotonic()
+        if now - self._last_unavailable_log >= self.UNAVAILABLE_LOG_INTERVAL:
+            self._last_unavailable_log = now
+            logger.error(f"Redis unavailable, serving without cache: {str(error)}")
+            
+    def _read(self, key, native_json=False):
+        """
+        Read the payload stored under key by either set or set_json
+        
+        With RedisJSON, set_json stores native JSON documents while set
+        stores strings, so reading with the other command fails with
+        WRONGTYPE and is retried with the matching one.
+        
+        Args:
+            key: Redis key
+            native_json: Try JSON.GET before GET
+            
+        Returns:
+            bytes: Payload accepted by _loads, or None if the key is missing
+        """
+        first, second = ("JSON.GET", "GET") if native_json else ("GET", "JSON.GET")
+        try:
+            return self.redis_client.execute_command(first, key)
+        except redis.ResponseError as e:
+            if not self._has_json or not _is_wrong_type(e):
+                raise
+            return self.redis_client.execute_command(second, key)
             
     def _generate_key(self, key_type, key_id):
         """
@@ -50,6 +338,7 @@ class CacheManager:
         """
         return f"{key_type}:{key_id}"
         
+    @_timed("set")
     def set(self, key_type, key_id, data, expire_time=None):
         """
         Set data in cache
@@ -57,7 +346,7 @@ class CacheManager:
         Args:
             key_type: Type of the key
             key_id: ID or unique identifier
-            data: Data to cache (will be pickled)
+            data: JSON-serializable data to cache
             expire_time: Custom expiration time in seconds
             
         Returns:
@@ -68,11 +357,12 @@ class CacheManager:
             if expire_time is None:
                 expire_time = self.expire_time
                 
-            # Pickle the data to preserve type information
-            pickled_data = pickle.dumps(data)
+            # JSON rather than pickle: faster for plain records and safe to load
+            payload = _dumps(data)
             
             # Set the value with expiration
-            success = self.redis_client.setex(key, expire_time, pickled_data)
+            success = self.redis_client.setex(key, expire_time, payload)
+            self._local.pop(key)
             
             if success:
                 logger.debug(f"Cached {key_type}:{key_id}")
@@ -81,10 +371,15 @@ class CacheManager:
                 
             return success
             
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return False
+            
         except Exception as e:
             logger.error(f"Error caching {key_type}:{key_id}: {str(e)}")
             return False
             
+    @_timed("get")
     def get(self, key_type, key_id):
         """
         Get data from cache
@@ -98,21 +393,33 @@ class CacheManager:
         """
         try:
             key = self._generate_key(key_type, key_id)
-            data = self.redis_client.get(key)
+            data = self._local.get(key)
+            if data is not None:
+                self._stats.record_lookup(key_type, True)
+                return _loads(data)
+                
+            data = self._read(key)
             
             if data:
-                # Unpickle the data
-                unpickled_data = pickle.loads(data)
                 logger.debug(f"Cache hit for {key_type}:{key_id}")
-                return unpickled_data
+                self._stats.record_lookup(key_type, True)
+                value = _loads(data)
+                self._local.set(key, data)
+                return value
             else:
                 logger.debug(f"Cache miss for {key_type}:{key_id}")
+                self._stats.record_lookup(key_type, False)
                 return None
                 
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return None
+            
         except Exception as e:
             logger.error(f"Error retrieving from cache {key_type}:{key_id}: {str(e)}")
             return None
             
+    @_timed("delete")
     def delete(self, key_type, key_id):
         """
         Delete data from cache
@@ -126,6 +433,7 @@ class CacheManager:
         """
         try:
             key = self._generate_key(key_type, key_id)
+            self._local.pop(key)
             result = self.redis_client.delete(key)
             
             success = result > 0
@@ -136,10 +444,91 @@ class CacheManager:
                 
             return success
             
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return False
+            
         except Exception as e:
             logger.error(f"Error deleting from cache {key_type}:{key_id}: {str(e)}")
             return False
             
+    @_timed("mget")
+    def mget(self, key_pairs):
+        """
+        Get several entries from cache in one round trip
+        
+        Args:
+            key_pairs: List of (key_type, key_id) tuples
+            
+        Returns:
+            list: Cached data (None where not found), in key_pairs order
+        """
+        try:
+            keys = [self._generate_key(key_type, key_id) for key_type, key_id in key_pairs]
+            payloads = [self._local.get(key) for key in keys]
+            missing = [i for i, data in enumerate(payloads) if data is None]
+            if missing:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for i in missing:
+                    pipe.get(keys[i])
+                    
+                for i, data in zip(missing, pipe.execute(raise_on_error=False)):
+                    if isinstance(data, Exception):
+                        # Keys written by set_json hold native JSON documents
+                        if not (self._has_json and _is_wrong_type(data)):
+                            raise data
+                        data = self._read(keys[i], native_json=True)
+                    if data:
+                        payloads[i] = data
+                        self._local.set(keys[i], data)
+                        
+            values = [_loads(data) if data is not None else None for data in payloads]
+                        
+            for (key_type, _), value in zip(key_pairs, values):
+                self._stats.record_lookup(key_type, value is not None)
+                
+            return values
+            
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return [None] * len(key_pairs)
+            
+        except Exception as e:
+            logger.error(f"Error retrieving {len(key_pairs)} keys from cache: {str(e)}")
+            return [None] * len(key_pairs)
+            
+    @_timed("mset")
+    def mset(self, items, expire_time=None):
+        """
+        Set several entries in cache in one round trip
+        
+        Args:
+            items: Dictionary mapping (key_type, key_id) tuples to data
+            expire_time: Custom expiration time in seconds
+            
+        Returns:
+            bool: True if every entry was set, False otherwise
+        """
+        try:
+            if expire_time is None:
+                expire_time = self.expire_time
+                
+            pipe = self.redis_client.pipeline(transaction=False)
+            for (key_type, key_id), data in items.items():
+                key = self._generate_key(key_type, key_id)
+                pipe.setex(key, expire_time, _dumps(data))
+                self._local.pop(key)
+                
+            return all(pipe.execute())
+            
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return False
+            
+        except Exception as e:
+            logger.error(f"Error caching {len(items)} keys: {str(e)}")
+            return False
+            
     def flush_by_pattern(self, pattern):
         """
         Delete keys matching a pattern
@@ -151,20 +540,30 @@ class CacheManager:
             int: Number of keys deleted
         """
         try:
-            cursor = 0
-            deleted_count = 0
+            self._local.pop_matching(pattern)
+            pipe = self.redis_client.pipeline(transaction=False)
             
-            while True:
-                cursor, keys = self.redis_client.scan(cursor, pattern, 100)
-                if keys:
-                    deleted_count += self.redis_client.delete(*keys)
+            # UNLINK frees memory in a background thread instead of blocking
+            # Redis; keys are sent in bounded batches over one pipeline
+            batch = []
+            for key in self.redis_client.scan_iter(match=pattern, count=1000):
+                batch.append(key)
+                if len(batch) == UNLINK_BATCH_SIZE:
+                    pipe.unlink(*batch)
+                    batch = []
+                    
+            if batch:
+                pipe.unlink(*batch)
                 
-                if cursor == 0:
-                    break
+            deleted_count = sum(pipe.execute())
                     
             logger.info(f"Flushed {deleted_count} keys matching pattern '{pattern}'")
             return deleted_count
             
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return 0
+            
         except Exception as e:
             logger.error(f"Error flushing keys with pattern '{pattern}': {str(e)}")
             return 0
@@ -173,6 +572,10 @@ class CacheManager:
         """
         Set JSON data in cache
         
+        With RedisJSON loaded the document is stored natively so that
+        get_json_path can fetch parts of it server-side; otherwise this is
+        the same as set.
+        
         Args:
             key_type: Type of the key
             key_id: ID or unique identifier
@@ -182,12 +585,29 @@ class CacheManager:
         Returns:
             bool: True if successful, False otherwise
         """
+        if not self._has_json:
+            return self.set(key_type, key_id, json_data, expire_time)
+        return self._set_native_json(key_type, key_id, json_data, expire_time)
+        
+    @_timed("set")
+    def _set_native_json(self, key_type, key_id, json_data, expire_time):
+        """Store a document with JSON.SET; see set_json"""
         try:
-            # Convert to JSON string
-            json_string = json.dumps(json_data)
+            key = self._generate_key(key_type, key_id)
+            if expire_time is None:
+                expire_time = self.expire_time
+                
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.execute_command("JSON.SET", key, "$", json.dumps(json_data, default=str))
+            pipe.expire(key, expire_time)
+            success = all(pipe.execute())
+            self._local.pop(key)
             
-            # Store as regular string
-            return self.set(key_type, key_id, json_string, expire_time)
+            return success
+            
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return False
             
         except Exception as e:
             logger.error(f"Error caching JSON for {key_type}:{key_id}: {str(e)}")
@@ -204,24 +624,87 @@ class CacheManager:
         Returns:
             object: Deserialized JSON data or None if not found
         """
+        if not self._has_json:
+            return self.get(key_type, key_id)
+        return self._get_native_json(key_type, key_id)
+        
+    @_timed("get")
+    def _get_native_json(self, key_type, key_id):
+        """Read a document with JSON.GET, or GET if set stored it; see get_json"""
         try:
-            # Get the JSON string
-            json_string = self.get(key_type, key_id)
+            key = self._generate_key(key_type, key_id)
+            data = self._local.get(key)
+            if data is None:
+                data = self._read(key, native_json=True)
+                if data:
+                    self._local.set(key, data)
+                    
+            # JSON.GET returns untagged JSON, which _loads also accepts
+            value = _loads(data) if data else None
+            self._stats.record_lookup(key_type, value is not None)
+            return value
             
-            if json_string:
-                # Parse JSON
-                return json.loads(json_string)
-            else:
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return None
+            
+        except Exception as e:
+            logger.error(f"Error retrieving JSON from cache {key_type}:{key_id}: {str(e)}")
+            return None
+            
+    @_timed("get_path")
+    def get_json_path(self, key_type, key_id, path):
+        """
+        Get one field of a cached JSON document
+        
+        With RedisJSON the path is evaluated server-side and only the field
+        crosses the network; otherwise the whole document is read and the
+        path walked locally.
+        
+        Args:
+            key_type: Type of the key
+            key_id: ID or unique identifier
+            path: Dotted JSONPath from the root, e.g. '$.top_prescribing_doctors'
+            
+        Returns:
+            object: Value at path, or None if the key or field is missing
+        """
+        if not self._has_json:
+            return _walk_path(self.get(key_type, key_id), path)
+            
+        try:
+            key = self._generate_key(key_type, key_id)
+            try:
+                data = self.redis_client.execute_command("JSON.GET", key, path)
+            except redis.ResponseError as e:
+                if not _is_wrong_type(e):
+                    raise
+                # Written by set as a string; walk the whole document locally
+                return _walk_path(self.get(key_type, key_id), path)
+                
+            if not data:
                 return None
                 
+            # JSONPath queries return the list of matches
+            matches = json.loads(data)
+            return matches[0] if matches else None
+            
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            self._log_unavailable(e)
+            return None
+            
         except Exception as e:
-            logger.error(f"Error retrieving JSON from cache {key_type}:{key_id}: {str(e)}")
+            logger.error(f"Error retrieving JSON path {path} from cache {key_type}:{key_id}: {str(e)}")
             return None
 
     def cache_with_fallback(self, key_type, key_id, fallback_func, expire_time=None):
         """
         Get data from cache or execute fallback function if not found
         
+        Concurrent misses on the same key within this process share one
+        fallback call: the first caller runs it and the others wait for its
+        result, so an expired hot key costs the backend a single query.
+        
         Args:
             key_type: Type of the key
             key_id: ID or unique identifier
@@ -231,28 +714,57 @@ class CacheManager:
         Returns:
             object: Data from cache or from fallback function
         """
-        try:
-            # Try to get from cache
-            cached_data = self.get(key_type, key_id)
+        # Try to get from cache
+        cached_data = self.get(key_type, key_id)
+        
+        if cached_data is not None:
+            return cached_data
             
-            if cached_data is not None:
-                return cached_data
+        key = self._generate_key(key_type, key_id)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
                 
-            # Cache miss, execute fallback function
-            logger.debug(f"Cache miss for {key_type}:{key_id}, executing fallback")
+        if not owner:
+            try:
+                return future.result(timeout=self.SINGLEFLIGHT_TIMEOUT)
+            except FuturesTimeoutError:
+                logger.warning(f"Timed out waiting for in-flight fallback for {key}, executing fallback")
+                return fallback_func()
+                
+        # Cache miss, execute fallback function
+        logger.debug(f"Cache miss for {key_type}:{key_id}, executing fallback")
+        try:
             data = fallback_func()
             
-            # Cache the result
+            # Cache the result before releasing waiters so later misses hit it
             if data is not None:
                 self.set(key_type, key_id, data, expire_time)
                 
+            future.set_result(data)
             return data
             
         except Exception as e:
-            logger.error(f"Error in cache_with_fallback for {key_type}:{key_id}: {str(e)}")
-            # Execute fallback on error
-            return fallback_func()
+            future.set_exception(e)
+            raise
+            
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
 
+    def stats(self):
+        """
+        Get cache effectiveness statistics for this process
+        
+        Returns:
+            dict: Hit/miss totals and hit rate, per-key-type counts, and
+                p50/p95/p99 latency in milliseconds per operation
+        """
+        return self._stats.snapshot()
+        
     def health_check(self):
         """
         Check if Redis connection is healthy
@@ -1,4 +1,8 @@
+import asyncio
+import functools
+from collections import Counter
 import spacy
+import torch
 from transformers import pipeline
 import numpy as np
 import re
@@ -6,42 +10,144 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Common medical contexts
+MEDICAL_CONTEXTS = (
+    "emergency", "routine care", "chronic condition",
+    "acute illness", "preventative care", "post-surgery",
+    "pregnancy", "pediatric", "geriatric", "mental health",
+    "infectious disease", "cardiovascular"
+)
+
+# Medical urgency indicators
+URGENCY_INDICATORS = (
+    "emergency", "urgent", "immediately", "asap", "critical",
+    "severe", "life-threatening", "deteriorating", "acute"
+)
+
+# Symptoms and conditions treated as key concerns
+SYMPTOMS = (
+    "pain", "ache", "discomfort", "fever", "cough", "nausea",
+    "vomiting", "diarrhea", "fatigue", "weakness", "dizziness",
+    "headache", "inflammation", "swelling", "rash", "infection"
+)
+
+
+def _plural(term):
+    """Regular English plural of a term, e.g. 'rash' to 'rashes'"""
+    if term.endswith(("s", "sh", "ch", "x", "z")):
+        return term + "es"
+    return term + "s"
+
+
+# Tokens are matched as whole words and the lemmatizer is disabled, so
+# plurals ("headaches", "rashes") are listed alongside the base forms
+SYMPTOM_TERMS = frozenset(SYMPTOMS) | frozenset(_plural(term) for term in SYMPTOMS)
+
+# Patient condition indicators
+CONDITION_INDICATORS = {
+    'stable': ("stable", "improving", "better", "good", "satisfactory"),
+    'unstable': ("unstable", "worsening", "deteriorating", "poor", "critical"),
+    'chronic': ("chronic", "long-term", "persistent", "recurring", "ongoing"),
+    'acute': ("acute", "sudden", "severe", "intense", "new onset")
+}
+
+# Treatment stage indicators
+TREATMENT_STAGES = {
+    'initial': ("new", "initial", "first", "start", "beginning", "diagnose"),
+    'ongoing': ("continue", "ongoing", "maintain", "follow-up", "adjust"),
+    'final': ("complete", "discontinue", "stop", "final", "resolved", "cured")
+}
+
+
+def _compile_terms(terms):
+    """Compile a list of literal terms into one word-boundary alternation"""
+    # Longest first so a term is never shadowed by one of its prefixes
+    alternation = "|".join(
+        re.escape(term) for term in sorted(terms, key=len, reverse=True)
+    )
+    return re.compile(r'\b(?:' + alternation + r')\b')
+
+
+def _invert_terms(indicators):
+    """Map each indicator term to its category"""
+    return {
+        term: category
+        for category, terms in indicators.items()
+        for term in terms
+    }
+
+
+# Compiled once per process so each text or token is scanned a single time
+# rather than once per term
+_URGENCY_REGEX = _compile_terms(URGENCY_INDICATORS)
+_CONDITION_LOOKUP = _invert_terms(CONDITION_INDICATORS)
+_STAGE_LOOKUP = _invert_terms(TREATMENT_STAGES)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_spacy(name, disable=()):
+    """Load a spaCy model once per process and share it between instances"""
+    return spacy.load(name, disable=list(disable))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pipeline(task, model, quantize):
+    """Load a transformers pipeline once per process and share it between instances"""
+    if torch.cuda.is_available():
+        # Run on the first GPU in half precision
+        return pipeline(
+            task,
+            model=model,
+            truncation=True,
+            device=0,
+            torch_dtype=torch.float16
+        )
+        
+    nlp_pipeline = pipeline(task, model=model, truncation=True, device=-1)
+    
+    # Weights are stored as int8 and activations quantized on the fly,
+    # roughly halving the memory traffic of the matrix multiplications
+    if quantize:
+        nlp_pipeline.model = torch.quantization.quantize_dynamic(
+            nlp_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info(f"Quantized {model} to int8")
+        
+    return nlp_pipeline
+
+
 class ContextAnalyzer:
     """Analyzes medical context in prescriptions and notes"""
     
-    def __init__(self):
-        """Initialize the context analyzer"""
+    # Inputs per forward pass; the zero-shot classifier batches (text, label)
+    # pairs, so one text with 12 candidate labels already fills 12 slots
+    SENTIMENT_BATCH_SIZE = 32
+    CLASSIFIER_BATCH_SIZE = 64
+    
+    def __init__(self, quantize=True):
+        """
+        Initialize the context analyzer
+        
+        Models are loaded once per process, so constructing further
+        analyzers is cheap. The transformer pipelines run on GPU in half
+        precision when CUDA is available, and are loaded on first use.
+        
+        Args:
+            quantize: Quantize the transformer models' linear layers to int8
+                when they run on CPU
+        """
         try:
-            # Load language model
-            self.nlp = spacy.load("en_core_web_lg")
-            
-            # Initialize sentiment analysis from transformers
-            self.sentiment_analyzer = pipeline(
-                "sentiment-analysis",
-                model="distilbert-base-uncased-finetuned-sst-2-english",
-                truncation=True
-            )
+            # Load language model; only tokens and noun chunks are read, which
+            # need the tagger, attribute ruler and parser but not NER or lemmas
+            self.nlp = _load_spacy("en_core_web_lg", disable=("ner", "lemmatizer"))
             
-            # Initialize zero-shot classification
-            self.classifier = pipeline(
-                "zero-shot-classification",
-                model="facebook/bart-large-mnli",
-                truncation=True
-            )
-            
-            # Common medical contexts
-            self.medical_contexts = [
-                "emergency", "routine care", "chronic condition",
-                "acute illness", "preventative care", "post-surgery",
-                "pregnancy", "pediatric", "geriatric", "mental health",
-                "infectious disease", "cardiovascular"
-            ]
+            self.quantize = quantize
             
-            # Medical urgency indicators
-            self.urgency_indicators = [
-                "emergency", "urgent", "immediately", "asap", "critical",
-                "severe", "life-threatening", "deteriorating", "acute"
-            ]
+            self.medical_contexts = MEDICAL_CONTEXTS
+            self.urgency_indicators = URGENCY_INDICATORS
+            self.symptom_terms = SYMPTOM_TERMS
+            self.condition_indicators = CONDITION_INDICATORS
+            self.treatment_stages = TREATMENT_STAGES
             
             logger.info("Context analyzer initialized successfully")
             
@@ -49,6 +155,44 @@ class ContextAnalyzer:
             logger.error(f"Error initializing context analyzer: {str(e)}")
             raise
             
+    @property
+    def sentiment_analyzer(self):
+        """Sentiment analysis pipeline from transformers"""
+        return _load_pipeline(
+            "sentiment-analysis",
+            "distilbert-base-uncased-finetuned-sst-2-english",
+            self.quantize
+        )
+        
+    @property
+    def classifier(self):
+        """Zero-shot classification pipeline"""
+        return _load_pipeline(
+            "zero-shot-classification",
+            "facebook/bart-large-mnli",
+            self.quantize
+        )
+        
+    def _count_indicators(self, doc, indicators, lookup):
+        """
+        Count and collect the tokens of a doc that match each category
+        
+        Returns:
+            tuple: (counts, found_terms, top category or None if no token matched)
+        """
+        counts = Counter(dict.fromkeys(indicators, 0))
+        found_terms = {category: [] for category in indicators}
+        
+        # One dict lookup per token
+        for token in doc:
+            category = lookup.get(token.lower_)
+            if category:
+                counts[category] += 1
+                found_terms[category].append(token.text)
+                
+        top_category, top_count = counts.most_common(1)[0]
+        return counts, found_terms, top_category if top_count else None
+        
     def analyze_context(self, text):
         """
         Analyze the medical context of a text
@@ -59,50 +203,130 @@ class ContextAnalyzer:
         Returns:
             dict: Context analysis results
         """
+        return self.analyze_batch([text])[0]
+        
+    def analyze_batch(self, texts, batch_size=64, n_process=1):
+        """
+        Analyze the medical context of several texts
+        
+        spaCy and both transformer pipelines process the texts in batches
+        rather than one call per text, which amortizes per-call overhead on
+        bulk prescription imports.
+        
+        Args:
+            texts: List of medical texts to analyze
+            batch_size: Number of texts per spaCy batch
+            n_process: Number of spaCy worker processes
+            
+        Returns:
+            list: Context analysis results, one per text
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+            
         try:
             # Process with spaCy
-            doc = self.nlp(text)
+            docs = self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process)
             
-            # Extract key metrics
-            results = {
-                'sentiment': self._analyze_sentiment(text),
-                'urgency': self._detect_urgency(text),
-                'medical_context': self._classify_medical_context(text),
-                'key_concerns': self._extract_key_concerns(doc),
-                'patient_condition': self._analyze_patient_condition(doc),
-                'treatment_stage': self._detect_treatment_stage(doc)
-            }
+            sentiments = self._analyze_sentiment(texts)
+            medical_contexts = self._classify_medical_context(texts)
             
-            return results
+            return self._combine_results(texts, docs, sentiments, medical_contexts)
             
         except Exception as e:
             logger.error(f"Error analyzing context: {str(e)}")
-            return {'error': str(e)}
+            return [{'error': str(e)} for _ in texts]
+            
+    async def analyze_context_async(self, text):
+        """
+        Analyze the medical context of a text without blocking the event loop
+        
+        Args:
+            text: Medical text to analyze
+            
+        Returns:
+            dict: Context analysis results
+        """
+        return (await self.analyze_batch_async([text]))[0]
+        
+    async def analyze_batch_async(self, texts, batch_size=64):
+        """
+        Analyze the medical context of several texts without blocking the event loop
+        
+        spaCy and the two transformer pipelines are independent, so they run
+        concurrently in worker threads; PyTorch and spaCy release the GIL
+        during inference.
+        
+        Args:
+            texts: List of medical texts to analyze
+            batch_size: Number of texts per spaCy batch
+            
+        Returns:
+            list: Context analysis results, one per text
+        """
+        texts = list(texts)
+        if not texts:
+            return []
             
-    def _analyze_sentiment(self, text):
-        """Analyze the sentiment of the text"""
         try:
-            result = self.sentiment_analyzer(text)[0]
-            return {
-                'label': result['label'],
-                'score': result['score']
+            docs, sentiments, medical_contexts = await asyncio.gather(
+                asyncio.to_thread(lambda: list(self.nlp.pipe(texts, batch_size=batch_size))),
+                asyncio.to_thread(self._analyze_sentiment, texts),
+                asyncio.to_thread(self._classify_medical_context, texts)
+            )
+            
+            return self._combine_results(texts, docs, sentiments, medical_contexts)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing context: {str(e)}")
+            return [{'error': str(e)} for _ in texts]
+            
+    def _combine_results(self, texts, docs, sentiments, medical_contexts):
+        """Combine model outputs with the rule-based metrics for each text"""
+        # Extract key metrics
+        return [
+            {
+                'sentiment': sentiment,
+                'urgency': self._detect_urgency(text),
+                'medical_context': medical_context,
+                'key_concerns': self._extract_key_concerns(doc),
+                'patient_condition': self._analyze_patient_condition(doc),
+                'treatment_stage': self._detect_treatment_stage(doc)
             }
+            for text, doc, sentiment, medical_context
+            in zip(texts, docs, sentiments, medical_contexts)
+        ]
+            
+    def _analyze_sentiment(self, texts):
+        """Analyze the sentiment of each text"""
+        try:
+            # Run each distinct text through the model once
+            unique_texts = list(dict.fromkeys(texts))
+            results = dict(zip(unique_texts, self.sentiment_analyzer(
+                unique_texts,
+                batch_size=self.SENTIMENT_BATCH_SIZE
+            )))
+            
+            return [
+                {
+                    'label': results[text]['label'],
+                    'score': results[text]['score']
+                }
+                for text in texts
+            ]
         except Exception as e:
             logger.error(f"Error in sentiment analysis: {str(e)}")
-            return {'label': 'UNKNOWN', 'score': 0.0}
+            return [{'label': 'UNKNOWN', 'score': 0.0} for _ in texts]
             
     def _detect_urgency(self, text):
         """Detect the urgency level in the text"""
-        text_lower = text.lower()
-        
-        # Check for urgent indicators
-        urgency_score = 0
-        found_indicators = []
-        
-        for indicator in self.urgency_indicators:
-            if re.search(r'\b' + re.escape(indicator) + r'\b', text_lower):
-                urgency_score += 1
-                found_indicators.append(indicator)
+        # Check for urgent indicators in a single pass over the text
+        matched = {match.group(0) for match in _URGENCY_REGEX.finditer(text.lower())}
+        found_indicators = [
+            indicator for indicator in self.urgency_indicators if indicator in matched
+        ]
+        urgency_score = len(found_indicators)
                 
         # Classify urgency level
         if urgency_score >= 3:
@@ -118,118 +342,86 @@ class ContextAnalyzer:
             'indicators': found_indicators
         }
         
-    def _classify_medical_context(self, text):
-        """Classify the medical context using zero-shot classification"""
+    def _classify_medical_context(self, texts):
+        """Classify the medical context of each text using zero-shot classification"""
         try:
-            result = self.classifier(
-                text,
-                candidate_labels=self.medical_contexts,
-                multi_label=True
+            # Run each distinct text through the model once
+            unique_texts = list(dict.fromkeys(texts))
+            results = self.classifier(
+                unique_texts,
+                candidate_labels=list(self.medical_contexts),
+                multi_label=True,
+                batch_size=self.CLASSIFIER_BATCH_SIZE
             )
-            
-            # Get top 3 contexts
-            top_contexts = []
-            for i in range(min(3, len(result['labels']))):
-                if result['scores'][i] > 0.3:  # Only include if confidence > 0.3
-                    top_contexts.append({
-                        'context': result['labels'][i],
-                        'confidence': result['scores'][i]
-                    })
-                    
-            return top_contexts
+            # A single input comes back as a dict rather than a list
+            if isinstance(results, dict):
+                results = [results]
+                
+            top_contexts = {
+                text: self._top_contexts(result)
+                for text, result in zip(unique_texts, results)
+            }
+            return [top_contexts[text] for text in texts]
             
         except Exception as e:
             logger.error(f"Error in medical context classification: {str(e)}")
-            return []
+            return [[] for _ in texts]
+            
+    def _top_contexts(self, result):
+        """Get the top 3 contexts from a zero-shot classification result"""
+        top_contexts = []
+        for i in range(min(3, len(result['labels']))):
+            if result['scores'][i] > 0.3:  # Only include if confidence > 0.3
+                top_contexts.append({
+                    'context': result['labels'][i],
+                    'confidence': result['scores'][i]
+                })
+                
+        return top_contexts
             
     def _extract_key_concerns(self, doc):
         """Extract key medical concerns from the text"""
         concerns = []
         
-        # Look for symptoms and conditions
-        symptom_patterns = [
-            "pain", "ache", "discomfort", "fever", "cough", "nausea",
-            "vomiting", "diarrhea", "fatigue", "weakness", "dizziness",
-            "headache", "inflammation", "swelling", "rash", "infection"
-        ]
+        # Map each token inside a noun chunk to that chunk, in one pass
+        token_chunks = {
+            token.i: chunk
+            for chunk in doc.noun_chunks
+            for token in chunk
+        }
         
+        # Look for symptoms and conditions, reporting the full noun chunk
+        # if possible
         for token in doc:
-            if token.lower_ in symptom_patterns or any(
-                symptom in token.lower_ for symptom in symptom_patterns):
+            if token.lower_ in self.symptom_terms:
+                chunk = token_chunks.get(token.i)
+                concerns.append(chunk.text if chunk is not None else token.text)
                 
-                # Get the full noun chunk if possible
-                for chunk in doc.noun_chunks:
-                    if token in chunk:
-                        concerns.append(chunk.text)
-                        break
-                else:
-                    concerns.append(token.text)
-                    
         # Remove duplicates while preserving order
-        unique_concerns = []
-        for concern in concerns:
-            if concern not in unique_concerns:
-                unique_concerns.append(concern)
-                
-        return unique_concerns
+        return list(dict.fromkeys(concerns))
         
     def _analyze_patient_condition(self, doc):
         """Analyze the patient's condition based on text"""
-        condition_indicators = {
-            'stable': ["stable", "improving", "better", "good", "satisfactory"],
-            'unstable': ["unstable", "worsening", "deteriorating", "poor", "critical"],
-            'chronic': ["chronic", "long-term", "persistent", "recurring", "ongoing"],
-            'acute': ["acute", "sudden", "severe", "intense", "new onset"]
-        }
-        
         # Count indicators for each condition type
-        counts = {category: 0 for category in condition_indicators}
-        found_terms = {category: [] for category in condition_indicators}
-        
-        for token in doc:
-            for category, indicators in condition_indicators.items():
-                if token.lower_ in indicators:
-                    counts[category] += 1
-                    found_terms[category].append(token.text)
+        counts, found_terms, primary_condition = self._count_indicators(
+            doc, self.condition_indicators, _CONDITION_LOOKUP
+        )
                     
-        # Determine primary condition
-        if max(counts.values()) == 0:
-            primary_condition = "unknown"
-        else:
-            primary_condition = max(counts, key=counts.get)
-            
         return {
-            'primary_condition': primary_condition,
-            'indicator_counts': counts,
+            'primary_condition': primary_condition or "unknown",
+            'indicator_counts': dict(counts),
             'found_terms': found_terms
         }
         
     def _detect_treatment_stage(self, doc):
         """Detect the stage of treatment from text"""
-        treatment_stages = {
-            'initial': ["new", "initial", "first", "start", "beginning", "diagnose"],
-            'ongoing': ["continue", "ongoing", "maintain", "follow-up", "adjust"],
-            'final': ["complete", "discontinue", "stop", "final", "resolved", "cured"]
-        }
-        
         # Count indicators for each stage
-        counts = {stage: 0 for stage in treatment_stages}
-        evidence = {stage: [] for stage in treatment_stages}
-        
-        for token in doc:
-            for stage, indicators in treatment_stages.items():
-                if token.lower_ in indicators:
-                    counts[stage] += 1
-                    evidence[stage].append(token.text)
+        counts, evidence, most_likely_stage = self._count_indicators(
+            doc, self.treatment_stages, _STAGE_LOOKUP
+        )
                     
-        # Determine most likely stage
-        if max(counts.values()) == 0:
-            most_likely_stage = "unknown"
-        else:
-            most_likely_stage = max(counts, key=counts.get)
-            
         return {
-            'stage': most_likely_stage,
+            'stage': most_likely_stage or "unknown",
             'evidence': evidence,
             'confidence': counts[most_likely_stage] / (sum(counts.values()) or 1)
         }
\ No newline at end of file
@@ -1,18 +1,38 @@
-import numpy as np
-import cv2
-from langdetect import detect, detect_langs
+import functools
+import os
+from langdetect import detect_langs
 from langdetect.lang_detect_exception import LangDetectException
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-def detect_language(image=None, text=None):
+# Tesseract language models tried for image-based detection
+OCR_LANGUAGES = ['eng', 'fra', 'deu', 'spa', 'ara', 'hin', 'chi_sim']
+
+# fastText language identification model, used instead of langdetect when
+# the fasttext package and the model file are available
+LID_MODEL_PATH = os.environ.get('FASTTEXT_LID_MODEL', 'lid.176.bin')
+
+# fastText scores at most this many characters of a text
+LID_MAX_CHARS = 1000
+
+# Tesseract language models to recognize with for each OSD script
+SCRIPT_LANGUAGES = {
+    'Latin': ['eng', 'fra', 'deu', 'spa'],
+    'Arabic': ['ara'],
+    'Devanagari': ['hin'],
+    'Han': ['chi_sim']
+}
+
+def detect_language(image=None, text=None, use_osd=True):
     """
     Detect the language of text in an image or provided text
     
     Args:
         image: Optional image array
         text: Optional text string
+        use_osd: Detect the script first and recognize only with the
+            language models for that script
         
     Returns:
         Detected language code (e.g., 'en', 'fr', 'es')
@@ -28,46 +48,35 @@ def detect_language(image=None, text=None):
             # This is a simplified implementation using Tesseract
             import pytesseract
             
-            # Extract text using multiple language models
-            languages = ['eng', 'fra', 'deu', 'spa', 'ara', 'hin', 'chi_sim']
-            texts = {}
-            confidences = {}
-            
-            for lang in languages:
-                try:
-                    # Extract text with language-specific model
-                    text = pytesseract.image_to_string(image, lang=lang)
-                    
-                    # Calculate confidence based on character count
-                    if len(text.strip()) > 0:
-                        texts[lang] = text
-                        confidences[lang] = len(text.strip())
-                except Exception:
-                    continue
-                    
+            languages = OCR_LANGUAGES
+            if use_osd:
+                languages = _script_languages(pytesseract, image)
+                
+            # A single missing model fails the whole combined run, so only
+            # request the installed ones
+            installed = _installed_languages(pytesseract)
+            if installed is not None:
+                languages = [lang for lang in languages if lang in installed]
+            if not languages:
+                logger.warning("No Tesseract language models installed for detection")
+                return 'eng'
+                
+            # Extract text in a single Tesseract run with all candidate
+            # language models loaded together
+            try:
+                extracted_text = pytesseract.image_to_string(
+                    image, lang='+'.join(languages)
+                )
+            except Exception as e:
+                logger.warning(f"Text recognition with {'+'.join(languages)} failed: {str(e)}")
+                extracted_text = ''
+                
             # If no text was extracted, return default
-            if not texts:
+            if not extracted_text.strip():
                 return 'eng'
                 
-            # Use the language with highest text extraction
-            best_lang = max(confidences, key=confidences.get)
-            
-            # Try to detect language from the best text
-            extracted_text = texts[best_lang]
-            detected_lang = detect_text_language(extracted_text)
-            
-            # Map Tesseract language codes to standard codes
-            lang_mapping = {
-                'eng': 'en',
-                'fra': 'fr',
-                'deu': 'de',
-                'spa': 'es',
-                'ara': 'ar',
-                'hin': 'hi',
-                'chi_sim': 'zh-cn'
-            }
-            
-            return detected_lang
+            # Try to detect language from the extracted text
+            return detect_text_language(extracted_text)
             
         # If neither text nor image is provided
         logger.error("Either text or image must be provided")
@@ -78,10 +87,107 @@ def detect_language(image=None, text=None):
         return 'en'  # Default to English on error
 
 
+@functools.lru_cache(maxsize=None)
+def _installed_languages(pytesseract):
+    """
+    List the Tesseract language models installed, once per process
+    
+    Args:
+        pytesseract: The imported pytesseract module
+        
+    Returns:
+        frozenset: Installed language codes, or None if they cannot be listed
+    """
+    try:
+        return frozenset(pytesseract.get_languages(config=''))
+    except Exception as e:
+        logger.warning(f"Could not list installed Tesseract languages: {str(e)}")
+        return None
+
+
+def _script_languages(pytesseract, image):
+    """
+    Pick the language models for the script Tesseract's OSD detects
+    
+    Args:
+        pytesseract: The imported pytesseract module
+        image: Image array
+        
+    Returns:
+        list: Tesseract language codes, all of OCR_LANGUAGES if the
+            script is unknown or OSD fails
+    """
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        return SCRIPT_LANGUAGES.get(osd.get('script'), OCR_LANGUAGES)
+    except Exception as e:
+        # OSD needs osd.traineddata and enough text to be confident
+        logger.debug(f"Script detection failed, using all languages: {str(e)}")
+        return OCR_LANGUAGES
+
+
+@functools.lru_cache(maxsize=None)
+def _load_lid_model():
+    """
+    Load the fastText language identification model once per process
+    
+    Returns:
+        The fastText model, or None to fall back to langdetect
+    """
+    try:
+        import fasttext
+        
+        model = fasttext.load_model(LID_MODEL_PATH)
+        logger.info(f"Loaded fastText language model from {LID_MODEL_PATH}")
+        return model
+    except Exception as e:
+        logger.info(f"fastText language model unavailable, using langdetect: {str(e)}")
+        return None
+
+
+def _lid_input(text):
+    """Prepare text for fastText, which predicts one line at a time"""
+    return text[:LID_MAX_CHARS].replace('\n', ' ')
+
+
+def _lid_label(label):
+    """Strip fastText's label prefix, e.g. '__label__en' to 'en'"""
+    return label.replace('__label__', '')
+
+
+def detect_text_languages(texts):
+    """
+    Detect the language of several texts
+    
+    With fastText the texts are classified in a single batched call.
+    
+    Args:
+        texts: List of strings to analyze
+        
+    Returns:
+        list: Language codes, one per text
+    """
+    texts = list(texts)
+    model = _load_lid_model()
+    if model is None or not texts:
+        return [detect_text_language(text) for text in texts]
+        
+    try:
+        labels, _ = model.predict([_lid_input(text) for text in texts], k=1)
+        return [_lid_label(text_labels[0]) for text_labels in labels]
+    except Exception as e:
+        logger.error(f"Unexpected error in language detection: {str(e)}")
+        return ['en' for _ in texts]  # Default to English on error
+
+
+@functools.lru_cache(maxsize=1024)
 def detect_text_language(text):
     """
     Detect the language of the provided text
     
+    Results are cached, since many prescriptions repeat the same
+    boilerplate text.
+    
     Args:
         text: String of text to analyze
         
@@ -89,16 +195,19 @@ def detect_text_language(text):
         Language code (e.g., 'en', 'fr', 'es')
     """
     try:
-        # Try to detect the language
-        language = detect(text)
-        
-        # Get language with confidence scores
+        model = _load_lid_model()
+        if model is not None:
+            labels, scores = model.predict(_lid_input(text), k=1)
+            logger.debug(f"Language probabilities: {labels[0]}:{scores[0]}")
+            return _lid_label(labels[0])
+            
+        # Get languages with confidence scores, most probable first
         language_probabilities = detect_langs(text)
         
         # Log the confidence scores
         logger.debug(f"Language probabilities: {language_probabilities}")
         
-        return language
+        return language_probabilities[0].lang
     except LangDetectException as e:
         logger.warning(f"Failed to detect language: {str(e)}")
         return 'en'  # Default to English on error
@@ -118,21 +227,27 @@ def process_prescription_image(image_path):
         dict: Dictionary containing language and processed image information
     """
     try:
+        # OpenCV is only needed for image input, so text-only callers do not
+        # pay for importing it
+        import cv2
+        
         # Load image
         image = cv2.imread(image_path)
         if image is None:
             logger.error(f"Failed to load image: {image_path}")
             return {'error': 'Failed to load image'}
             
-        # Preprocess image
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        # Preprocess image through OpenCV's transparent API, which keeps the
+        # intermediates on an OpenCL device when one is available and falls
+        # back to the CPU otherwise
+        gray = cv2.cvtColor(cv2.UMat(image), cv2.COLOR_BGR2GRAY)
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
         
         # Adaptive thresholding to handle varying lighting
         binary = cv2.adaptiveThreshold(
             blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
             cv2.THRESH_BINARY_INV, 11, 2
-        )
+        ).get()
         
         # Detect language
         language = detect_language(image=binary)
@@ -1,11 +1,108 @@
+import functools
 import spacy
+from spacy.matcher import PhraseMatcher
 from spacy.tokens import Doc, Span
 import re
-import numpy as np
+from array import array
+from bisect import bisect_left
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Medication-related patterns
+MEDICATION_PATTERNS = {
+    'dose_pattern': r'(\d+(?:\.\d+)?)\s*(mg|g|ml|mcg|IU)',
+    'frequency_pattern': r'(\d+(?:-\d+)?)\s*times?\s*(?:a|per)\s*(day|daily|week|month|hour|evening|morning|night|noon)',
+    'duration_pattern': r'for\s+(\d+(?:-\d+)?)\s*(days?|weeks?|months?|years?)',
+    'route_pattern': r'(oral|IV|intravenous|topical|sublingual|subcutaneous|intramuscular|rectal|inhaled)'
+}
+
+# Compiled once per process rather than on every extraction
+_PATTERNS = {
+    name: re.compile(pattern)
+    for name, pattern in MEDICATION_PATTERNS.items()
+}
+
+# Common drug categories
+DRUG_CATEGORIES = (
+    'antibiotic', 'analgesic', 'antipyretic', 'antihistamine',
+    'antihypertensive', 'antidepressant', 'antipsychotic', 'diuretic',
+    'steroid', 'nsaid', 'statin', 'sedative', 'laxative'
+)
+
+# Common medication names; this would typically load from a database or
+# file, for demonstration a small sample list is used
+MEDICATIONS = frozenset([
+    "acetaminophen", "paracetamol", "ibuprofen", "aspirin", "amoxicillin",
+    "lisinopril", "metformin", "atorvastatin", "levothyroxine", "amlodipine",
+    "metoprolol", "albuterol", "omeprazole", "losartan", "gabapentin",
+    "hydrochlorothiazide", "sertraline", "fluoxetine", "montelukast", "pantoprazole"
+])
+
+
+@functools.lru_cache(maxsize=None)
+def _load_spacy(name, disable=()):
+    """Load a spaCy model once per process and share it between instances"""
+    return spacy.load(name, disable=list(disable))
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_medication_regex(medications):
+    """Compile medication names into one case-insensitive alternation"""
+    # Longest first so a name is never shadowed by one of its prefixes
+    names = sorted(medications, key=len, reverse=True)
+    return re.compile(
+        r'\b(?:' + '|'.join(re.escape(med) for med in names) + r')\b',
+        re.IGNORECASE
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _build_phrase_matcher(nlp, medications):
+    """Build a case-insensitive token matcher over medication names"""
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    matcher.add("MEDICATION", list(nlp.tokenizer.pipe(sorted(medications))))
+    return matcher
+
+
+class _EntityColumns:
+    """Start offsets and texts of one entity kind, stored as parallel arrays"""
+    
+    __slots__ = ('starts', 'texts')
+    
+    def __init__(self, entity_list):
+        """
+        Args:
+            entity_list: Entities sorted by start offset
+        """
+        self.starts = array('l', [e['start'] for e in entity_list])
+        self.texts = [e['text'] for e in entity_list]
+        
+    def closest_text(self, position, max_distance=100):
+        """
+        Find the text of the entity starting closest to a position
+        
+        Args:
+            position: Character offset to measure from
+            max_distance: Maximum distance in characters
+            
+        Returns:
+            str: Entity text, or None if no entity is close enough
+        """
+        starts = self.starts
+        if not starts:
+            return None
+            
+        # Only the entities either side of the insertion point can be closest
+        index = bisect_left(starts, position)
+        candidates = [i for i in (index - 1, index) if 0 <= i < len(starts)]
+        closest_index = min(candidates, key=lambda i: abs(starts[i] - position))
+        
+        if abs(starts[closest_index] - position) <= max_distance:
+            return self.texts[closest_index]
+        return None
+
+
 class MedicalNER:
     """Named Entity Recognition for medical prescriptions"""
     
@@ -13,76 +110,67 @@ class MedicalNER:
         """
         Initialize the NER model
         
+        Models are loaded once per process, so constructing further
+        recognizers is cheap.
+        
         Args:
             model_path: Path to a custom spaCy model, if None use a pretrained model
         """
         try:
             # Load medical NER model
             if model_path:
-                self.nlp = spacy.load(model_path)
+                self.nlp = _load_spacy(model_path)
                 logger.info(f"Loaded custom NER model from {model_path}")
             else:
-                # Load general model and configure for medical domain
-                self.nlp = spacy.load("en_core_web_lg")
+                # Load general model and configure for medical domain. Only
+                # entity labels and offsets are read, and NER has its own
+                # embedding layer, so the shared tok2vec and the components
+                # listening to it are skipped
+                self.nlp = _load_spacy(
+                    "en_core_web_lg",
+                    disable=("tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer")
+                )
                 logger.info("Loaded standard spaCy model")
                 
-            # Add custom entity recognizer pipe for prescriptions
+            # Add custom entity recognizer pipe for prescriptions; the model
+            # is shared, so only the first instance adds it
             if "prescription_ner" not in self.nlp.pipe_names:
                 self.nlp.add_pipe("prescription_ner", after="ner")
                 logger.info("Added prescription NER component")
                 
-            # Medication-related patterns
-            self.medication_patterns = {
-                'dose_pattern': r'(\d+(?:\.\d+)?)\s*(mg|g|ml|mcg|IU)',
-                'frequency_pattern': r'(\d+(?:-\d+)?)\s*times?\s*(?:a|per)\s*(day|daily|week|month|hour|evening|morning|night|noon)',
-                'duration_pattern': r'for\s+(\d+(?:-\d+)?)\s*(days?|weeks?|months?|years?)',
-                'route_pattern': r'(oral|IV|intravenous|topical|sublingual|subcutaneous|intramuscular|rectal|inhaled)'
-            }
-            
-            # Common drug names and categories
-            self.drug_categories = [
-                'antibiotic', 'analgesic', 'antipyretic', 'antihistamine',
-                'antihypertensive', 'antidepressant', 'antipsychotic', 'diuretic',
-                'steroid', 'nsaid', 'statin', 'sedative', 'laxative'
-            ]
+            self.medication_patterns = MEDICATION_PATTERNS
+            self._patterns = _PATTERNS
+            self.drug_categories = DRUG_CATEGORIES
             
             # Load common medication names
             self.medications = self._load_medications()
             
+            # Match every known medication in a single scan of the tokens,
+            # and of raw strings when validating names
+            self._phrase_matcher = _build_phrase_matcher(self.nlp, self.medications)
+            self._medication_regex = _compile_medication_regex(self.medications)
+            
         except Exception as e:
             logger.error(f"Error initializing Medical NER: {str(e)}")
             raise
             
     def _load_medications(self):
-        """Load common medication names from a resource file"""
-        try:
-            # This would typically load from a database or file
-            # For demonstration, a small sample list is used
-            medications = [
-                "acetaminophen", "paracetamol", "ibuprofen", "aspirin", "amoxicillin",
-                "lisinopril", "metformin", "atorvastatin", "levothyroxine", "amlodipine",
-                "metoprolol", "albuterol", "omeprazole", "losartan", "gabapentin",
-                "hydrochlorothiazide", "sertraline", "fluoxetine", "montelukast", "pantoprazole"
-            ]
-            return medications
-        except Exception as e:
-            logger.error(f"Error loading medications: {str(e)}")
-            return []
+        """Load common medication names"""
+        return MEDICATIONS
             
-    def extract_entities(self, text):
+    def extract_entities(self, text, use_model=True):
         """
         Extract medical entities from prescription text
         
         Args:
             text: Prescription text
+            use_model: Run the spaCy NER pass; if False only the dictionary
+                and regex extractors run, skipping model inference entirely
             
         Returns:
             dict: Dictionary of extracted entities
         """
         try:
-            # Process the text with spaCy
-            doc = self.nlp(text)
-            
             # Extract standard entities
             entities = {
                 'medications': [],
@@ -92,11 +180,14 @@ class MedicalNER:
                 'routes': []
             }
             
+            # Tokenize only when the model pass is skipped
+            doc = self.nlp(text) if use_model else self.nlp.make_doc(text)
+            
             # Extract medications from general entities
             for ent in doc.ents:
                 if ent.label_ in ['ORG', 'PRODUCT', 'GPE']:
                     # Check if this might be a medication
-                    if any(med in ent.text.lower() for med in self.medications):
+                    if self._medication_regex.search(ent.text):
                         entities['medications'].append({
                             'text': ent.text,
                             'start': ent.start_char,
@@ -104,17 +195,16 @@ class MedicalNER:
                         })
                         
             # Extract medication names based on our custom dictionary
-            for med in self.medications:
-                med_regex = r'\b' + re.escape(med) + r'\b'
-                for match in re.finditer(med_regex, text, re.IGNORECASE):
-                    entities['medications'].append({
-                        'text': match.group(0),
-                        'start': match.start(),
-                        'end': match.end()
-                    })
+            for _, start, end in self._phrase_matcher(doc):
+                span = doc[start:end]
+                entities['medications'].append({
+                    'text': span.text,
+                    'start': span.start_char,
+                    'end': span.end_char
+                })
                     
             # Extract dosages using regex
-            for match in re.finditer(self.medication_patterns['dose_pattern'], text):
+            for match in self._patterns['dose_pattern'].finditer(text):
                 entities['dosages'].append({
                     'text': match.group(0),
                     'value': match.group(1),
@@ -124,7 +214,7 @@ class MedicalNER:
                 })
                 
             # Extract frequencies
-            for match in re.finditer(self.medication_patterns['frequency_pattern'], text):
+            for match in self._patterns['frequency_pattern'].finditer(text):
                 entities['frequencies'].append({
                     'text': match.group(0),
                     'count': match.group(1),
@@ -134,7 +224,7 @@ class MedicalNER:
                 })
                 
             # Extract durations
-            for match in re.finditer(self.medication_patterns['duration_pattern'], text):
+            for match in self._patterns['duration_pattern'].finditer(text):
                 entities['durations'].append({
                     'text': match.group(0),
                     'count': match.group(1),
@@ -144,7 +234,7 @@ class MedicalNER:
                 })
                 
             # Extract administration routes
-            for match in re.finditer(self.medication_patterns['route_pattern'], text):
+            for match in self._patterns['route_pattern'].finditer(text):
                 entities['routes'].append({
                     'text': match.group(0),
                     'route': match.group(1),
@@ -177,49 +267,30 @@ class MedicalNER:
         """
         prescriptions = []
         
-        # Try to associate medications with their details
+        # Detail entities as parallel offset/text arrays; each list is
+        # already sorted because it comes from a left-to-right regex scan
+        dosages = _EntityColumns(entities['dosages'])
+        frequencies = _EntityColumns(entities['frequencies'])
+        durations = _EntityColumns(entities['durations'])
+        routes = _EntityColumns(entities['routes'])
+        
+        # Try to associate medications with their closest details
         for med in entities['medications']:
-            med_start = med['start']
             med_end = med['end']
             
-            # Find closest dosage
-            closest_dosage = self._find_closest_entity(med_end, entities['dosages'])
-            
-            # Find closest frequency
-            closest_frequency = self._find_closest_entity(med_end, entities['frequencies'])
-            
-            # Find closest duration
-            closest_duration = self._find_closest_entity(med_end, entities['durations'])
-            
-            # Find closest route
-            closest_route = self._find_closest_entity(med_end, entities['routes'])
-            
             # Create structured prescription
             prescription = {
                 'medication': med['text'],
-                'dosage': closest_dosage['text'] if closest_dosage else None,
-                'frequency': closest_frequency['text'] if closest_frequency else None,
-                'duration': closest_duration['text'] if closest_duration else None,
-                'route': closest_route['text'] if closest_route else None
+                'dosage': dosages.closest_text(med_end),
+                'frequency': frequencies.closest_text(med_end),
+                'duration': durations.closest_text(med_end),
+                'route': routes.closest_text(med_end)
             }
             
             prescriptions.append(prescription)
             
         return prescriptions
         
-    def _find_closest_entity(self, position, entity_list):
-        """Find the entity closest to a position in text"""
-        if not entity_list:
-            return None
-            
-        distances = [abs(e['start'] - position) for e in entity_list]
-        min_distance_index = np.argmin(distances)
-        
-        # Only return if reasonably close (within 100 characters)
-        if distances[min_distance_index] <= 100:
-            return entity_list[min_distance_index]
-        return None
-        
     def get_drug_interactions(self, medications):
         """
         Check for potential drug interactions between medications
@@ -282,8 +353,7 @@ class MedicalNER:
                 
         # Check if medication name is recognized
         if prescription.get('medication'):
-            med_name = prescription['medication'].lower()
-            if not any(med.lower() in med_name for med in self.medications):
+            if not self._medication_regex.search(prescription['medication']):
                 validation['warnings'].append(f"Medication '{prescription['medication']}' not recognized")
                 
         return validation
\ No newline at end of file
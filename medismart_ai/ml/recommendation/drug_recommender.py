@@ -1,33 +1,133 @@
+import functools
 import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
 import tensorflow as tf
 from tensorflow.keras import layers, models
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Columns read from the drug and condition CSVs with their parsed types;
+# names that repeat across rows are stored as categories
+DRUG_COLUMNS = {
+    'drug_name': 'string',
+    'drug_class': 'category',
+    'indications': 'string',
+    'mechanism': 'string',
+    'description': 'string'
+}
+CONDITION_COLUMNS = {
+    'condition': 'category',
+    'drug': 'category',
+    'efficacy': 'float32',
+    'frequency': 'float32'
+}
+
+# Sample interaction pairs (would be from a drug interaction database)
+INTERACTION_PAIRS = [
+    ('ibuprofen', 'aspirin', 'Increased risk of bleeding'),
+    ('lisinopril', 'potassium', 'Risk of hyperkalemia'),
+    ('warfarin', 'aspirin', 'Increased risk of bleeding'),
+    ('fluoxetine', 'sertraline', 'Serotonin syndrome risk')
+]
+
+
+def _read_csv(path, **kwargs):
+    """
+    Read a CSV with pandas' multithreaded pyarrow parser
+    
+    Falls back to the default C parser when pyarrow is not installed.
+    """
+    try:
+        return pd.read_csv(path, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(path, **kwargs)
+
+
+def _read_csv_columns(path, columns):
+    """
+    Read only the given columns of a CSV that the file actually has
+    
+    Args:
+        path: Path to the CSV
+        columns: Mapping of column name to dtype
+    """
+    # The header alone is cheap to parse and tells which optional columns exist
+    header = pd.read_csv(path, nrows=0).columns
+    present = {name: dtype for name, dtype in columns.items() if name in header}
+    return _read_csv(path, usecols=list(present), dtype=present)
+
+
+def _top_n_indices(scores, n):
+    """
+    Indices of the n largest scores, largest first
+    
+    Partitions in linear time and sorts only the selected n, rather than
+    sorting every score.
+    """
+    if n <= 0:
+        return np.empty(0, dtype=np.intp)
+    if len(scores) <= n:
+        return np.argsort(-scores)
+        
+    top = np.argpartition(-scores, n - 1)[:n]
+    return top[np.argsort(-scores[top])]
+
+
 class DrugRecommender:
     """
     ML-based drug recommendation system for physicians
     Uses collaborative filtering and content-based approaches
     """
     
+    # Similar drugs precomputed per drug at load time, and the number of
+    # drugs scored together while precomputing
+    SIMILAR_TOP_K = 20
+    SIMILARITY_BLOCK_SIZE = 1024
+    
+    # Quantized embedding rows dequantized together when scoring
+    EMBEDDING_BLOCK_SIZE = 4096
+    
+    # Queries beyond the precomputed neighbours whose results are kept
+    SIMILAR_CACHE_SIZE = 2048
+    
     def __init__(self):
         """Initialize the drug recommender"""
         try:
             self.drug_features = None
-            self.drug_similarity = None
+            self.drug_features_norm = None
+            self._similar_ids = None
+            self._similar_scores = None
+            self._similar_top_cached = functools.lru_cache(maxsize=self.SIMILAR_CACHE_SIZE)(
+                self._compute_similar_top
+            )
             self.condition_drug_matrix = None
-            self.vectorizer = TfidfVectorizer(stop_words='english')
+            # Single precision halves the bytes read by similarity scoring;
+            # rows come out L2-normalized, ready for cosine similarity
+            self.vectorizer = TfidfVectorizer(stop_words='english', dtype=np.float32, norm='l2')
             self.deep_model = None
             self.drug_embeddings = None
+            self._embeddings_q8 = None
+            self._embedding_scales = None
+            self._inference_weights = None
+            self._predict_fn = None
             self.drug_names = []
             self.condition_names = []
+            self._drug_index = {}
+            self._condition_index = {}
             self.drug_descriptions = {}
             self.drug_interactions = {}
             
+            # Interaction partners and risks keyed by lower-cased drug name,
+            # in both directions
+            self._interaction_index = {}
+            for med1, med2, risk in INTERACTION_PAIRS:
+                self._interaction_index.setdefault(med1, []).append((med2, risk))
+                self._interaction_index.setdefault(med2, []).append((med1, risk))
+            
             logger.info("Drug recommender initialized")
             
         except Exception as e:
@@ -44,29 +144,39 @@ class DrugRecommender:
         """
         try:
             # Load drug data
-            drug_df = pd.read_csv(drug_data_path)
+            drug_df = _read_csv_columns(drug_data_path, DRUG_COLUMNS)
             self.drug_names = drug_df['drug_name'].tolist()
+            self._drug_index = self._build_index(self.drug_names)
             
-            # Create drug feature matrix
-            drug_features = []
-            for _, row in drug_df.iterrows():
-                # Combine relevant features into a single text string
-                feature_text = f"{row['drug_name']} {row['drug_class']} {row['indications']} {row['mechanism']}"
-                drug_features.append(feature_text)
-                
-                # Store drug description for explanations
-                self.drug_descriptions[row['drug_name']] = row['description']
+            # Combine relevant features into a single text string per drug,
+            # column-wise rather than row by row
+            feature_columns = drug_df[['drug_class', 'indications', 'mechanism']].astype(str)
+            drug_features = drug_df['drug_name'].astype(str).str.cat(feature_columns, sep=' ')
+            
+            # Store drug descriptions for explanations
+            self.drug_descriptions.update(zip(drug_df['drug_name'], drug_df['description']))
                 
             # Use TF-IDF to create feature vectors
             self.drug_features = self.vectorizer.fit_transform(drug_features)
             
-            # Calculate drug similarity matrix
-            self.drug_similarity = cosine_similarity(self.drug_features)
+            # With L2-normalized rows a sparse dot product gives cosine
+            # similarity; scores are computed per query instead of storing a
+            # dense drugs x drugs similarity matrix. The vectorizer already
+            # normalizes, so only a differently configured one needs a pass
+            if self.vectorizer.norm == 'l2':
+                self.drug_features_norm = self.drug_features
+            else:
+                self.drug_features_norm = normalize(self.drug_features, norm='l2', copy=False)
+                
+            # Precompute each drug's nearest neighbours for similar-drug queries
+            self._precompute_similar_drugs()
+            self._similar_top_cached.cache_clear()
             
             # Load condition-drug associations if available
             if condition_data_path:
-                condition_df = pd.read_csv(condition_data_path)
+                condition_df = _read_csv_columns(condition_data_path, CONDITION_COLUMNS)
                 self.condition_names = sorted(condition_df['condition'].unique())
+                self._condition_index = self._build_index(self.condition_names)
                 
                 # Create condition-drug matrix
                 self._create_condition_drug_matrix(condition_df)
@@ -81,57 +191,111 @@ class DrugRecommender:
             logger.error(f"Error loading drug data: {str(e)}")
             raise
             
+    @staticmethod
+    def _build_index(names):
+        """
+        Map each name to its position for O(1) lookups
+        
+        A repeated name maps to its first position, matching list.index.
+        """
+        index = {}
+        for idx, name in enumerate(names):
+            index.setdefault(name, idx)
+        return index
+        
+    def _association_indices(self, condition_df):
+        """
+        Resolve the condition and drug of every association row to matrix indices
+        
+        Args:
+            condition_df: Condition-drug associations
+            
+        Returns:
+            tuple: (condition indices, drug indices) as integer arrays
+        """
+        condition_indices = condition_df['condition'].map(self._condition_index)
+        drug_indices = condition_df['drug'].map(self._drug_index)
+        
+        unknown_drugs = condition_df.loc[drug_indices.isna(), 'drug']
+        if not unknown_drugs.empty:
+            raise ValueError(f"Unknown drugs in condition data: {sorted(unknown_drugs.unique())}")
+            
+        return condition_indices.to_numpy(dtype=np.int64), drug_indices.to_numpy(dtype=np.int64)
+        
     def _create_condition_drug_matrix(self, condition_df):
-        """Create a matrix of condition-drug associations"""
-        # Initialize matrix with zeros
-        matrix = np.zeros((len(self.condition_names), len(self.drug_names)))
+        """
+        Create a sparse matrix of condition-drug associations
         
-        # Fill matrix with prescription counts or efficacy scores
-        for _, row in condition_df.iterrows():
-            condition_idx = self.condition_names.index(row['condition'])
-            drug_idx = self.drug_names.index(row['drug'])
-            
-            # Use efficacy or frequency as the value
-            if 'efficacy' in row:
-                value = row['efficacy']
-            elif 'frequency' in row:
-                value = row['frequency']
-            else:
-                value = 1  # Binary association
-                
-            matrix[condition_idx, drug_idx] = value
+        Most drugs are never prescribed for a given condition, so the matrix
+        is stored as CSR: memory grows with the number of associations and
+        each condition row holds only its associated drugs.
+        """
+        shape = (len(self.condition_names), len(self.drug_names))
+        condition_indices, drug_indices = self._association_indices(condition_df)
+        
+        # Use efficacy or frequency as the value
+        if 'efficacy' in condition_df:
+            values = condition_df['efficacy'].to_numpy(dtype=np.float64)
+        elif 'frequency' in condition_df:
+            values = condition_df['frequency'].to_numpy(dtype=np.float64)
+        else:
+            values = np.ones(len(condition_df))  # Binary association
             
+        # A repeated condition-drug pair keeps its last value rather than
+        # being summed by the CSR constructor
+        pair_keys = condition_indices * shape[1] + drug_indices
+        _, last_from_end = np.unique(pair_keys[::-1], return_index=True)
+        keep = len(pair_keys) - 1 - last_from_end
+        
+        # Fill matrix with prescription counts or efficacy scores
+        matrix = sparse.csr_matrix(
+            (values[keep], (condition_indices[keep], drug_indices[keep])),
+            shape=shape
+        )
+        matrix.eliminate_zeros()
+        
         self.condition_drug_matrix = matrix
         
     def _train_deep_model(self, condition_df):
         """Train a deep learning model for drug recommendations"""
         try:
-            # Create embedding dimensions
+            # Create embedding dimensions; every size is a multiple of 8 so
+            # half-precision matrix products can run on GPU Tensor Cores
             n_drugs = len(self.drug_names)
             n_conditions = len(self.condition_names)
-            embedding_dim = 50
+            embedding_dim = 64
+            
+            # Pad the vocabularies to a multiple of 8; padding rows are never looked up
+            n_drug_rows = -(-n_drugs // 8) * 8
+            n_condition_rows = -(-n_conditions // 8) * 8
+            
+            # Compute in float16 with float32 weights on GPU; CPUs gain nothing from it
+            if tf.config.list_physical_devices('GPU'):
+                policy = 'mixed_float16'
+            else:
+                policy = 'float32'
             
             # Build the model
             drug_input = layers.Input(shape=(1,))
             condition_input = layers.Input(shape=(1,))
             
             # Embedding layers
-            drug_embedding = layers.Embedding(n_drugs, embedding_dim)(drug_input)
+            drug_embedding = layers.Embedding(n_drug_rows, embedding_dim, name='drug_embedding', dtype=policy)(drug_input)
             drug_embedding = layers.Flatten()(drug_embedding)
             
-            condition_embedding = layers.Embedding(n_conditions, embedding_dim)(condition_input)
+            condition_embedding = layers.Embedding(n_condition_rows, embedding_dim, name='condition_embedding', dtype=policy)(condition_input)
             condition_embedding = layers.Flatten()(condition_embedding)
             
             # Concatenate embeddings
-            concat = layers.Concatenate()([drug_embedding, condition_embedding])
+            concat = layers.Concatenate(dtype=policy)([drug_embedding, condition_embedding])
             
             # Dense layers
-            dense1 = layers.Dense(128, activation='relu')(concat)
-            dense2 = layers.Dense(64, activation='relu')(dense1)
-            dense3 = layers.Dense(32, activation='relu')(dense2)
+            dense1 = layers.Dense(128, activation='relu', name='dense_1', dtype=policy)(concat)
+            dense2 = layers.Dense(64, activation='relu', name='dense_2', dtype=policy)(dense1)
+            dense3 = layers.Dense(32, activation='relu', name='dense_3', dtype=policy)(dense2)
             
-            # Output layer
-            output = layers.Dense(1, activation='sigmoid')(dense3)
+            # Output layer, kept in float32 for a numerically stable sigmoid
+            output = layers.Dense(1, activation='sigmoid', name='output', dtype='float32')(dense3)
             
             # Create and compile model
             self.deep_model = models.Model(
@@ -145,52 +309,323 @@ class DrugRecommender:
                 metrics=['accuracy']
             )
             
-            # Prepare training data
-            drug_indices = []
-            condition_indices = []
-            targets = []
+            # Prepare training data, in the int32/float32 types the model
+            # consumes so Keras does not convert them on every batch
+            condition_indices, drug_indices = self._association_indices(condition_df)
+            condition_indices = condition_indices.astype(np.int32)
+            drug_indices = drug_indices.astype(np.int32)
+            
+            # Use efficacy or frequency as target, normalized to 0-1
+            if 'efficacy' in condition_df:
+                targets = condition_df['efficacy'].to_numpy(dtype=np.float32) / 10.0  # Assuming efficacy is 0-10
+            elif 'frequency' in condition_df:
+                targets = np.minimum(condition_df['frequency'].to_numpy(dtype=np.float32) / 100.0, 1.0)  # Normalize frequency
+            else:
+                targets = np.ones(len(condition_df), dtype=np.float32)  # Binary association
             
-            for _, row in condition_df.iterrows():
-                drug_idx = self.drug_names.index(row['drug'])
-                condition_idx = self.condition_names.index(row['condition'])
-                
-                # Use efficacy or frequency as target, normalized to 0-1
-                if 'efficacy' in row:
-                    target = row['efficacy'] / 10.0  # Assuming efficacy is 0-10
-                elif 'frequency' in row:
-                    target = min(row['frequency'] / 100.0, 1.0)  # Normalize frequency
-                else:
-                    target = 1.0  # Binary association
-                    
-                drug_indices.append(drug_idx)
-                condition_indices.append(condition_idx)
-                targets.append(target)
-                
-            # Convert to numpy arrays
-            drug_indices = np.array(drug_indices)
-            condition_indices = np.array(condition_indices)
-            targets = np.array(targets)
+            # Hold out the last 20% for validation, as validation_split did
+            split = int(len(targets) * 0.8)
+            train_data = self._training_dataset(
+                drug_indices[:split], condition_indices[:split], targets[:split], shuffle=True
+            )
+            validation_data = self._training_dataset(
+                drug_indices[split:], condition_indices[split:], targets[split:]
+            )
             
             # Train the model
             self.deep_model.fit(
-                [drug_indices, condition_indices],
-                targets,
+                train_data,
+                validation_data=validation_data,
                 epochs=20,
-                batch_size=64,
-                validation_split=0.2,
                 verbose=0
             )
             
             # Extract drug embeddings for similarity calculations
-            drug_ids = np.arange(n_drugs)
-            drug_layer = self.deep_model.get_layer('embedding')
-            self.drug_embeddings = drug_layer.get_weights()[0]
+            drug_layer = self.deep_model.get_layer('drug_embedding')
+            self.drug_embeddings = drug_layer.get_weights()[0][:n_drugs]
+            self._quantize_drug_embeddings()
+            
+            self._inference_weights = self._extract_inference_weights()
+            self._predict_fn = self._compile_predict_fn()
             
             logger.info("Deep learning model trained successfully")
             
         except Exception as e:
             logger.error(f"Error training deep model: {str(e)}")
             self.deep_model = None
+            self._inference_weights = None
+            self._predict_fn = None
+            self._embeddings_q8 = None
+            self._embedding_scales = None
+            
+    def _quantize_drug_embeddings(self):
+        """
+        Store unit-length drug embeddings as int8 with a scale per row
+        
+        Similarity scoring reads the whole embedding matrix per query, so
+        int8 storage cuts the bytes moved to a quarter of float32.
+        """
+        embeddings = self.drug_embeddings.astype(np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.maximum(norms, np.finfo(np.float32).tiny)
+        
+        scales = np.abs(embeddings).max(axis=1, keepdims=True) / 127.0
+        scales = np.maximum(scales, np.finfo(np.float32).tiny)
+        
+        self._embeddings_q8 = np.round(embeddings / scales).astype(np.int8)
+        self._embedding_scales = scales.ravel().astype(np.float32)
+        
+    def _embedding_similarity_row(self, drug_idx):
+        """
+        Cosine similarity of one drug's embedding to every drug's embedding
+        
+        The int8 rows are dequantized a block at a time, so the float32
+        working set stays in cache while memory traffic stays int8.
+        
+        Args:
+            drug_idx: Index of the drug in drug_names
+            
+        Returns:
+            numpy.ndarray: Similarity per drug, in drug_names order
+        """
+        quantized, scales = self._embeddings_q8, self._embedding_scales
+        query = quantized[drug_idx].astype(np.float32) * scales[drug_idx]
+        
+        scores = np.empty(len(quantized), dtype=np.float32)
+        for start in range(0, len(quantized), self.EMBEDDING_BLOCK_SIZE):
+            stop = start + self.EMBEDDING_BLOCK_SIZE
+            scores[start:stop] = quantized[start:stop].astype(np.float32) @ query
+        return scores * scales
+        
+    def recommend_similar_by_embedding(self, drug_name, n=5):
+        """
+        Recommend drugs prescribed for similar conditions, using the deep
+        model's learned drug embeddings
+        
+        Args:
+            drug_name: Name of the drug to find alternatives for
+            n: Number of recommendations to return
+            
+        Returns:
+            list: Similar drugs with similarity scores
+        """
+        try:
+            if self._embeddings_q8 is None:
+                logger.warning("No drug embeddings available")
+                return []
+                
+            # Check if drug is known
+            drug_idx = self._drug_index.get(drug_name)
+            if drug_idx is None:
+                logger.warning(f"Unknown drug: {drug_name}")
+                return []
+                
+            similarity_scores = self._embedding_similarity_row(drug_idx)
+            
+            # Get top n similar drugs (excluding the drug itself)
+            similar_drugs = []
+            for idx in _top_n_indices(similarity_scores, n + 1):
+                if idx == drug_idx or len(similar_drugs) == n:
+                    continue
+                similar_drugs.append({
+                    'drug': self.drug_names[idx],
+                    'similarity': float(similarity_scores[idx]),
+                    'reason': f"Prescribed for similar conditions as {drug_name}"
+                })
+                
+            return similar_drugs
+            
+        except Exception as e:
+            logger.error(f"Error finding similar drugs by embedding: {str(e)}")
+            return []
+            
+    def _compile_predict_fn(self):
+        """
+        Build an XLA-compiled prediction function for the trained model
+        
+        The function is traced once for any batch size and warmed up here,
+        so queries skip eager dispatch and XLA fuses the embedding lookups,
+        concatenation and dense layers.
+        
+        Returns:
+            Callable taking (drug_ids, condition_ids) int32 tensors of shape [batch, 1]
+        """
+        model = self.deep_model
+        id_spec = tf.TensorSpec(shape=[None, 1], dtype=tf.int32)
+        
+        @tf.function(jit_compile=True, input_signature=[id_spec, id_spec])
+        def predict_fn(drug_ids, condition_ids):
+            return model([drug_ids, condition_ids], training=False)
+            
+        # Trace and compile once up front rather than on the first query
+        predict_fn(tf.zeros([1, 1], tf.int32), tf.zeros([1, 1], tf.int32))
+        return predict_fn
+        
+    def predict_associations(self, pairs):
+        """
+        Predict association scores for drug-condition pairs with the deep model
+        
+        Args:
+            pairs: List of (drug_name, condition) tuples
+            
+        Returns:
+            list: Predicted score per pair, None where the drug or condition
+                is unknown; empty if no model is trained
+        """
+        if self._predict_fn is None:
+            return []
+            
+        pairs = list(pairs)
+        known = [
+            (i, self._drug_index[drug], self._condition_index[condition])
+            for i, (drug, condition) in enumerate(pairs)
+            if drug in self._drug_index and condition in self._condition_index
+        ]
+        
+        scores = [None] * len(pairs)
+        if known:
+            positions, drug_ids, condition_ids = zip(*known)
+            predictions = self._predict_fn(
+                tf.constant(drug_ids, shape=[len(known), 1], dtype=tf.int32),
+                tf.constant(condition_ids, shape=[len(known), 1], dtype=tf.int32)
+            ).numpy().ravel()
+            for position, score in zip(positions, predictions):
+                scores[position] = float(score)
+                
+        return scores
+        
+    def export_deep_model(self, export_dir, tensorrt=False):
+        """
+        Export the trained deep model for a dedicated inference server
+        
+        Saves a SavedModel whose serving signature is the compiled
+        prediction function. With tensorrt=True the SavedModel is also
+        converted with TF-TRT into an FP16 TensorRT engine, saved to
+        export_dir + '_trt', for GPU serving.
+        
+        Args:
+            export_dir: Directory to write the SavedModel to
+            tensorrt: Also build an FP16 TensorRT version
+            
+        Returns:
+            str: Directory of the exported model to serve, or None if no
+                model is trained
+        """
+        if self._predict_fn is None:
+            logger.warning("No trained deep model to export")
+            return None
+            
+        try:
+            serving_fn = self._predict_fn.get_concrete_function()
+            tf.saved_model.save(
+                self.deep_model,
+                export_dir,
+                signatures={'serving_default': serving_fn}
+            )
+            logger.info(f"Exported deep model to {export_dir}")
+            
+            if not tensorrt:
+                return export_dir
+                
+            from tensorflow.python.compiler.tensorrt import trt_convert as trt
+            
+            trt_dir = f"{export_dir}_trt"
+            converter = trt.TrtGraphConverterV2(
+                input_saved_model_dir=export_dir,
+                precision_mode=trt.TrtPrecisionMode.FP16
+            )
+            converter.convert()
+            converter.save(trt_dir)
+            logger.info(f"Exported TensorRT deep model to {trt_dir}")
+            return trt_dir
+            
+        except Exception as e:
+            logger.error(f"Error exporting deep model: {str(e)}")
+            raise
+            
+    @staticmethod
+    def _training_dataset(drug_indices, condition_indices, targets, shuffle=False, batch_size=256):
+        """
+        Build a tf.data input pipeline over the training arrays
+        
+        The examples are cached after the first epoch and batches are
+        prefetched, so host-side batching overlaps with training steps.
+        
+        Args:
+            drug_indices: Drug index per example
+            condition_indices: Condition index per example
+            targets: Target score per example
+            shuffle: Reshuffle the examples every epoch
+            batch_size: Examples per training step
+            
+        Returns:
+            tf.data.Dataset: Batched ((drug_ids, condition_ids), targets)
+        """
+        dataset = tf.data.Dataset.from_tensor_slices((
+            (drug_indices[:, np.newaxis], condition_indices[:, np.newaxis]),
+            targets
+        )).cache()
+        
+        if shuffle:
+            dataset = dataset.shuffle(len(targets), reshuffle_each_iteration=True)
+            
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+        
+    def _extract_inference_weights(self):
+        """
+        Copy the trained model's weights into NumPy arrays for query-time scoring
+        
+        The first dense layer acts on [drug embedding, condition embedding],
+        so its product with every drug embedding is precomputed here; a query
+        then only adds the condition's share and runs the smaller layers.
+        
+        Returns:
+            dict: Arrays used by predict_drug_scores
+        """
+        # Drop the padding rows added for Tensor Core alignment
+        drug_embeddings = self.deep_model.get_layer('drug_embedding').get_weights()[0][:len(self.drug_names)]
+        condition_embeddings = self.deep_model.get_layer('condition_embedding').get_weights()[0][:len(self.condition_names)]
+        kernel, bias = self.deep_model.get_layer('dense_1').get_weights()
+        embedding_dim = drug_embeddings.shape[1]
+        
+        return {
+            'drug_hidden': drug_embeddings @ kernel[:embedding_dim],
+            'condition_hidden': condition_embeddings @ kernel[embedding_dim:] + bias,
+            'dense': [
+                self.deep_model.get_layer(name).get_weights()
+                for name in ('dense_2', 'dense_3')
+            ],
+            'output': self.deep_model.get_layer('output').get_weights()
+        }
+        
+    def predict_drug_scores(self, condition):
+        """
+        Score every drug for a condition with the trained deep model
+        
+        Runs the model's forward pass as plain NumPy matrix products over all
+        drugs at once, avoiding per-query TensorFlow dispatch.
+        
+        Args:
+            condition: Medical condition name
+            
+        Returns:
+            numpy.ndarray: Predicted association score per drug, in drug_names
+                order, or None if no model is trained or the condition is unknown
+        """
+        condition_idx = self._condition_index.get(condition)
+        if self._inference_weights is None or condition_idx is None:
+            return None
+            
+        weights = self._inference_weights
+        hidden = np.maximum(
+            weights['drug_hidden'] + weights['condition_hidden'][condition_idx], 0
+        )
+        for kernel, bias in weights['dense']:
+            hidden = np.maximum(hidden @ kernel + bias, 0)
+            
+        kernel, bias = weights['output']
+        logits = (hidden @ kernel + bias).ravel()
+        return 1.0 / (1.0 + np.exp(-logits))
             
     def recommend_for_condition(self, condition, n=5):
         """
@@ -205,26 +640,24 @@ class DrugRecommender:
         """
         try:
             # Check if condition is known
-            if condition not in self.condition_names:
+            condition_idx = self._condition_index.get(condition)
+            if condition_idx is None:
                 logger.warning(f"Unknown condition: {condition}")
                 return []
-                
-            condition_idx = self.condition_names.index(condition)
             
             # Get drugs already associated with this condition
             if self.condition_drug_matrix is not None:
-                condition_drugs = self.condition_drug_matrix[condition_idx]
-                
-                # Sort drugs by association strength
-                sorted_indices = np.argsort(condition_drugs)[::-1]
+                # Only the drugs associated with the condition are stored
+                row = self.condition_drug_matrix.getrow(condition_idx)
+                scores, drug_indices = row.data, row.indices
                 
-                # Get top n drugs
+                # Get top n drugs by association strength
                 recommendations = []
-                for idx in sorted_indices[:n]:
-                    if condition_drugs[idx] > 0:
+                for pos in _top_n_indices(scores, n):
+                    if scores[pos] > 0:
                         recommendations.append({
-                            'drug': self.drug_names[idx],
-                            'score': float(condition_drugs[idx]),
+                            'drug': self.drug_names[drug_indices[pos]],
+                            'score': float(scores[pos]),
                             'reason': f"Commonly prescribed for {condition}"
                         })
                         
@@ -250,24 +683,20 @@ class DrugRecommender:
         """
         try:
             # Check if drug is known
-            if drug_name not in self.drug_names:
+            drug_idx = self._drug_index.get(drug_name)
+            if drug_idx is None:
                 logger.warning(f"Unknown drug: {drug_name}")
                 return []
-                
-            drug_idx = self.drug_names.index(drug_name)
             
-            # Get similarity scores
-            similarity_scores = self.drug_similarity[drug_idx]
+            # Sorted by similarity; the drug itself comes first
+            similar_ids, similar_scores = self._similar_top(drug_idx, n + 1)
             
-            # Sort by similarity (excluding the drug itself)
-            sorted_indices = np.argsort(similarity_scores)[::-1][1:n+1]
-            
-            # Get top n similar drugs
+            # Get top n similar drugs (excluding the drug itself)
             similar_drugs = []
-            for idx in sorted_indices:
+            for idx, score in zip(similar_ids[1:], similar_scores[1:]):
                 similar_drugs.append({
                     'drug': self.drug_names[idx],
-                    'similarity': float(similarity_scores[idx]),
+                    'similarity': float(score),
                     'reason': f"Similar to {drug_name} in mechanism and indication"
                 })
                 
@@ -277,6 +706,84 @@ class DrugRecommender:
             logger.error(f"Error finding similar drugs: {str(e)}")
             return []
             
+    def _precompute_similar_drugs(self):
+        """
+        Precompute the SIMILAR_TOP_K most similar drugs for every drug
+        
+        Similarities are computed a block of drugs at a time as one sparse
+        matrix product, so only SIMILARITY_BLOCK_SIZE rows of the full
+        drugs x drugs matrix exist at once. Each row keeps its top entries,
+        the drug itself included, largest first.
+        """
+        features = self.drug_features_norm
+        n_drugs = features.shape[0]
+        k = min(self.SIMILAR_TOP_K + 1, n_drugs)
+        
+        similar_ids = np.empty((n_drugs, k), dtype=np.int32)
+        similar_scores = np.empty((n_drugs, k), dtype=np.float32)
+        features_t = features.T.tocsc()
+        
+        for start in range(0, n_drugs, self.SIMILARITY_BLOCK_SIZE):
+            stop = min(start + self.SIMILARITY_BLOCK_SIZE, n_drugs)
+            block = (features[start:stop] @ features_t).toarray()
+            
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            
+            similar_ids[start:stop] = np.take_along_axis(top, order, axis=1)
+            similar_scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+            
+        self._similar_ids = similar_ids
+        self._similar_scores = similar_scores
+        
+    def _similar_top(self, drug_idx, n):
+        """
+        The n drugs most similar to a drug, largest similarity first
+        
+        Served from the precomputed neighbours when n fits, otherwise scored
+        against every drug and kept in an LRU cache.
+        
+        Args:
+            drug_idx: Index of the drug in drug_names
+            n: Number of drugs to return, the drug itself included
+            
+        Returns:
+            tuple: (drug indices, similarity scores) arrays
+        """
+        if self._similar_ids is not None and n <= self._similar_ids.shape[1]:
+            return self._similar_ids[drug_idx, :n], self._similar_scores[drug_idx, :n]
+            
+        return self._similar_top_cached(drug_idx, n)
+        
+    def _compute_similar_top(self, drug_idx, n):
+        """Score a drug against every drug and keep the n most similar"""
+        scores = self._similar_row(drug_idx)
+        top = _top_n_indices(scores, n)
+        top_scores = scores[top]
+        
+        # Cached results are shared between callers
+        top.setflags(write=False)
+        top_scores.setflags(write=False)
+        return top, top_scores
+        
+    def _similar_row(self, drug_idx):
+        """
+        Cosine similarity of one drug to every drug
+        
+        A CSR matrix-vector product over the normalized TF-IDF rows, which
+        scipy runs in C straight over the indptr/indices/data arrays.
+        
+        Args:
+            drug_idx: Index of the drug in drug_names
+            
+        Returns:
+            numpy.ndarray: Similarity per drug, in drug_names order
+        """
+        return (
+            self.drug_features_norm @ self.drug_features_norm[drug_idx].T
+        ).toarray().ravel()
+        
     def recommend_for_patient(self, patient_data, n=5):
         """
         Recommend drugs based on patient-specific data
@@ -292,7 +799,7 @@ class DrugRecommender:
             recommendations = []
             
             # Get recommendations for patient's condition
-            if 'condition' in patient_data and patient_data['condition'] in self.condition_names:
+            if 'condition' in patient_data and patient_data['condition'] in self._condition_index:
                 condition_recs = self.recommend_for_condition(patient_data['condition'], n=n)
                 recommendations.extend(condition_recs)
                 
@@ -316,12 +823,12 @@ class DrugRecommender:
                         
             # Consider patient's current medications for interactions
             if 'current_medications' in patient_data:
+                # Normalize the medication list once for every recommendation
+                meds_set = {m.lower() for m in patient_data['current_medications']}
+                
                 for rec in recommendations:
                     # Check for interactions (this would use a proper drug interaction database)
-                    interactions = self._check_interactions(
-                        rec['drug'], 
-                        patient_data['current_medications']
-                    )
+                    interactions = self._check_interactions(rec['drug'], meds_set)
                     if interactions:
                         rec['interactions'] = interactions
                         
@@ -335,26 +842,26 @@ class DrugRecommender:
             logger.error(f"Error in patient-specific recommendations: {str(e)}")
             return []
             
-    def _check_interactions(self, drug, current_medications):
-        """Check for interactions between a drug and current medications"""
+    def _check_interactions(self, drug, meds_set):
+        """
+        Check for interactions between a drug and current medications
+        
+        Args:
+            drug: Drug name
+            meds_set: Set of lowercased current medication names
+            
+        Returns:
+            list: Interactions with the current medications
+        """
         # This would typically use a drug interaction database
         # For demonstration, using a simplified approach
         
-        # Sample interaction pairs (would be from a database)
-        interaction_pairs = [
-            ('ibuprofen', 'aspirin', 'Increased risk of bleeding'),
-            ('lisinopril', 'potassium', 'Risk of hyperkalemia'),
-            ('warfarin', 'aspirin', 'Increased risk of bleeding'),
-            ('fluoxetine', 'sertraline', 'Serotonin syndrome risk')
-        ]
-        
-        # Check for interactions
+        # Check only the pairs this drug takes part in
         interactions = []
-        for med1, med2, risk in interaction_pairs:
-            if (drug.lower() == med1 and med2 in [m.lower() for m in current_medications]) or \
-               (drug.lower() == med2 and med1 in [m.lower() for m in current_medications]):
+        for partner, risk in self._interaction_index.get(drug.lower(), ()):
+            if partner in meds_set:
                 interactions.append({
-                    'medication': med1 if drug.lower() == med2 else med2,
+                    'medication': partner,
                     'risk': risk
                 })
                 
@@ -1,25 +1,76 @@
+import itertools
+import os
+import tempfile
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.multioutput import MultiOutputClassifier
+from sklearn.preprocessing import normalize
 import networkx as nx
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+
+def _rank_by_similarity(similarities, shortlist):
+    """
+    Yield drug rows from most to least similar
+    
+    Only the best shortlist rows are sorted up front; the rest are sorted
+    only if the caller keeps going past them. Rows scored -inf are skipped.
+    """
+    n_candidates = int(np.isfinite(similarities).sum())
+    shortlist = min(shortlist, n_candidates)
+    if shortlist == 0:
+        return
+        
+    order = np.argpartition(-similarities, shortlist - 1)
+    top = order[:shortlist]
+    yield from top[np.argsort(-similarities[top], kind='stable')]
+    
+    rest = order[shortlist:]
+    rest = rest[np.isfinite(similarities[rest])]
+    yield from rest[np.argsort(-similarities[rest], kind='stable')]
+
+
 class InteractionPredictor:
     """ML-based drug interaction prediction model"""
     
-    def __init__(self):
-        """Initialize the interaction predictor"""
+    # Alternatives ranked up front per requested alternative, leaving room
+    # for candidates rejected by the interaction checks
+    ALTERNATIVE_SHORTLIST_FACTOR = 5
+    
+    # Largest dense copy of the drug features kept for serving; beyond it
+    # pair features are built from the sparse rows
+    DENSE_FEATURES_MAX_BYTES = 256 * 1024 * 1024
+    
+    def __init__(self, compile_model=False):
+        """
+        Initialize the interaction predictor
+        
+        Args:
+            compile_model: Compile the trained forests to native code with
+                Treelite for inference, when treelite and tl2cgen are
+                installed; this runs a C compiler for every interaction type
+                on each load
+        """
         try:
             self.drug_features = None
+            self._drug_dense = None  # Dense float32 copy of drug_features, if small enough
+            self._drug_features_norm = None  # L2-normalized drug_features
+            self._drug_names = []  # Drug name of each feature row
+            self._indexed_rows = None  # Rows that drug_index points to
             self.interaction_model = None
+            self.compile_model = compile_model
+            self._fast_predictors = None  # Compiled forest per interaction type
+            self._compiled_dir = None  # TemporaryDirectory holding the compiled libraries
             self.vectorizer = TfidfVectorizer(stop_words='english')
             self.drug_index = {}  # Maps drug names to indices
             self.interaction_types = []  # Types of interactions to predict
             self.interaction_graph = nx.Graph()  # Graph of known interactions
+            self._edge_cache = {}  # Edge data of interaction_graph by sorted drug pair
             self.severity_threshold = 0.7  # Threshold for high severity interactions
             
             logger.info("Interaction predictor initialized")
@@ -55,6 +106,27 @@ class InteractionPredictor:
             # Create TF-IDF feature matrix
             self.drug_features = self.vectorizer.fit_transform(drug_features)
             
+            # Keep a dense copy so predictions slice rows instead of
+            # converting sparse rows on every call; the vocabulary grows with
+            # the number of drugs, so the copy is only kept while it is small
+            n_drugs, n_terms = self.drug_features.shape
+            if n_drugs * n_terms * 4 <= self.DENSE_FEATURES_MAX_BYTES:
+                self._drug_dense = self.drug_features.toarray().astype(np.float32)
+            else:
+                self._drug_dense = None
+            
+            # With unit-length rows one sparse product gives the cosine
+            # similarity to every drug; the vectorizer normalizes by default
+            if self.vectorizer.norm == 'l2':
+                self._drug_features_norm = self.drug_features
+            else:
+                self._drug_features_norm = normalize(self.drug_features)
+                
+            # A repeated drug name maps to its last row only
+            self._drug_names = drug_df['drug_name'].tolist()
+            self._indexed_rows = np.zeros(len(self._drug_names), dtype=bool)
+            self._indexed_rows[list(self.drug_index.values())] = True
+            
             # Load interaction data
             interaction_df = pd.read_csv(interaction_data_path)
             
@@ -77,52 +149,130 @@ class InteractionPredictor:
             raise
             
     def _prepare_interaction_training_data(self, interaction_df):
-        """Prepare training data for interaction prediction"""
-        # Create feature pairs for interacting drugs
-        X = []
-        y = []
+        """
+        Prepare training data for interaction prediction
         
-        for _, row in interaction_df.iterrows():
-            drug1 = row['drug1']
-            drug2 = row['drug2']
-            
-            # Skip if either drug is not in our index
-            if drug1 not in self.drug_index or drug2 not in self.drug_index:
-                continue
-                
-            # Get drug feature vectors
-            idx1 = self.drug_index[drug1]
-            idx2 = self.drug_index[drug2]
-            
-            # Combine feature vectors (concatenate)
-            feature_vector = np.hstack([
-                self.drug_features[idx1].toarray(),
-                self.drug_features[idx2].toarray()
-            ])
-            
-            X.append(feature_vector.flatten())
-            
-            # Create multi-label target
-            interaction_label = [0] * len(self.interaction_types)
-            interaction_label[self.interaction_types.index(row['interaction_type'])] = 1
-            y.append(interaction_label)
-            
-        return np.array(X), np.array(y)
+        Each pair's features are the two drugs' TF-IDF rows side by side,
+        kept sparse rather than expanded into a dense pairs x 2D matrix.
+        """
+        # Get drug feature rows for every interaction
+        idx1 = interaction_df['drug1'].map(self.drug_index)
+        idx2 = interaction_df['drug2'].map(self.drug_index)
+        
+        # Skip if either drug is not in our index
+        known = (idx1.notna() & idx2.notna()).to_numpy()
+        idx1 = idx1.to_numpy()[known].astype(np.int64)
+        idx2 = idx2.to_numpy()[known].astype(np.int64)
+        
+        # Combine feature vectors (concatenate)
+        X = sparse.hstack([self.drug_features[idx1], self.drug_features[idx2]], format='csr')
+        
+        # Create multi-label target, one column per interaction type
+        type_index = {interaction_type: i for i, interaction_type in enumerate(self.interaction_types)}
+        labels = interaction_df['interaction_type'].map(type_index).to_numpy()[known].astype(np.int64)
+        
+        # Stored as int8: sklearn's forests only accept dense targets, so a
+        # sparse label matrix would be densified again on fit
+        y = np.zeros((len(labels), len(self.interaction_types)), dtype=np.int8)
+        y[np.arange(len(labels)), labels] = 1
+        
+        return X, y
         
     def _train_model(self, X, y):
         """Train the interaction prediction model"""
         # Use Random Forest for multi-label classification
+        # Predictions are mostly for a single pair, where starting joblib
+        # workers costs more than the trees, so everything runs in-process;
+        # predict_interactions_bulk amortizes the call overhead instead
         base_classifier = RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
+            n_jobs=1,
             random_state=42
         )
         
-        self.interaction_model = MultiOutputClassifier(base_classifier)
+        self.interaction_model = MultiOutputClassifier(base_classifier, n_jobs=1)
         self.interaction_model.fit(X, y)
         
         logger.info("Interaction prediction model trained successfully")
         
+        # The previous model's libraries are stale once it is retrained
+        self._release_fast_predictors()
+        if self.compile_model:
+            self._fast_predictors = self._compile_fast_predictors()
+            
+    def _release_fast_predictors(self):
+        """Unload the compiled forests and delete their libraries"""
+        self._fast_predictors = None
+        if self._compiled_dir is not None:
+            self._compiled_dir.cleanup()
+            self._compiled_dir = None
+            
+    def _compile_fast_predictors(self):
+        """
+        Compile each interaction type's forest into a native library
+        
+        The compiled trees are laid out contiguously and traversed without
+        going through sklearn's Python predict path.
+        
+        Returns:
+            list: One tl2cgen predictor per interaction type, or None to
+                keep predicting with sklearn
+        """
+        lib_dir = None
+        try:
+            import treelite
+            import tl2cgen
+            
+            # Removed on the next retrain, or when the predictor is collected
+            lib_dir = tempfile.TemporaryDirectory(prefix='interaction_model_')
+            predictors = []
+            for k, estimator in enumerate(self.interaction_model.estimators_):
+                libpath = os.path.join(lib_dir.name, f'interaction_{k}.so')
+                tl2cgen.export_lib(
+                    treelite.sklearn.import_model(estimator),
+                    toolchain='gcc',
+                    libpath=libpath,
+                    params={'parallel_comp': os.cpu_count() or 1}
+                )
+                predictors.append(tl2cgen.Predictor(libpath, nthread=1))
+                
+            self._compiled_dir = lib_dir
+            logger.info(f"Compiled {len(predictors)} interaction forests to {lib_dir.name}")
+            return predictors
+            
+        except Exception as e:
+            if lib_dir is not None:
+                lib_dir.cleanup()
+            logger.info(f"Compiled interaction model unavailable, using sklearn: {str(e)}")
+            return None
+            
+    def _predict_probs(self, X):
+        """
+        Score drug pair features against every interaction type
+        
+        Args:
+            X: Dense pair feature matrix, one row per pair
+            
+        Returns:
+            np.ndarray: Interaction probabilities, shape (pairs, types)
+        """
+        probs = np.empty((X.shape[0], len(self.interaction_types)), dtype=np.float32)
+        
+        if self._fast_predictors is not None:
+            import tl2cgen
+            
+            dmat = tl2cgen.DMatrix(X, dtype='float32')
+            for k, predictor in enumerate(self._fast_predictors):
+                # The positive class is the last output column for binary forests
+                probs[:, k] = np.asarray(predictor.predict(dmat)).reshape(X.shape[0], -1)[:, -1]
+            return probs
+            
+        # sklearn returns one (pairs, 2) array per interaction type
+        for k, prob in enumerate(self.interaction_model.predict_proba(X)):
+            probs[:, k] = prob[:, 1]
+        return probs
+        
     def _build_interaction_graph(self, interaction_df):
         """Build a graph of known drug interactions"""
         for _, row in interaction_df.iterrows():
@@ -141,8 +291,23 @@ class InteractionPredictor:
                 description=row.get('description', '')
             )
             
+        # The graph is read-only once built, so serve lookups from a flat dict
+        self._edge_cache = {
+            self._pair_key(drug1, drug2): data
+            for drug1, drug2, data in self.interaction_graph.edges(data=True)
+        }
+        
         logger.info(f"Built interaction graph with {self.interaction_graph.number_of_edges()} known interactions")
         
+    @staticmethod
+    def _pair_key(drug1, drug2):
+        """Order-independent key for a drug pair"""
+        return (drug1, drug2) if drug1 <= drug2 else (drug2, drug1)
+        
+    def _known_edge(self, drug1, drug2):
+        """Edge data of a known interaction, or None"""
+        return self._edge_cache.get(self._pair_key(drug1, drug2))
+        
     def predict_interaction(self, drug1, drug2):
         """
         Predict potential interactions between two drugs
@@ -156,81 +321,170 @@ class InteractionPredictor:
         """
         try:
             # Check if this is a known interaction first
-            if self.interaction_graph.has_edge(drug1, drug2):
-                edge_data = self.interaction_graph.get_edge_data(drug1, drug2)
-                return {
-                    'drug1': drug1,
-                    'drug2': drug2,
-                    'interaction_type': edge_data['interaction_type'],
-                    'severity': edge_data['severity'],
-                    'description': edge_data['description'],
-                    'is_known': True,
-                    'confidence': 1.0
-                }
+            edge_data = self._known_edge(drug1, drug2)
+            if edge_data is not None:
+                return self._known_interaction(drug1, drug2, edge_data)
                 
             # Check if both drugs are in our index
             if drug1 not in self.drug_index or drug2 not in self.drug_index:
-                logger.warning(f"One or both drugs not in database: {drug1}, {drug2}")
-                return {
-                    'drug1': drug1,
-                    'drug2': drug2,
-                    'interaction_predicted': False,
-                    'reason': "One or both drugs not in database"
-                }
+                return self._unknown_drugs(drug1, drug2)
                 
             # Get drug feature vectors
             idx1 = self.drug_index[drug1]
             idx2 = self.drug_index[drug2]
             
             # Combine feature vectors
-            feature_vector = np.hstack([
-                self.drug_features[idx1].toarray(),
-                self.drug_features[idx2].toarray()
-            ])
+            X = self._pair_features([idx1], [idx2])
             
             # Make prediction
-            X = feature_vector.reshape(1, -1)
-            y_pred = self.interaction_model.predict(X)[0]
-            y_prob = self.interaction_model.predict_proba(X)
+            interaction_probs = self._predict_probs(X)[0]
+            max_prob_idx = int(interaction_probs.argmax())
             
             # Get interaction type with highest probability
-            interaction_probs = [prob[0][1] for prob in y_prob]
-            max_prob_idx = np.argmax(interaction_probs)
-            max_prob = interaction_probs[max_prob_idx]
-            
-            # Only predict interaction if probability exceeds threshold
-            if max_prob >= 0.5:
-                predicted_type = self.interaction_types[max_prob_idx]
+            return self._predicted_interaction(
+                drug1, drug2, max_prob_idx, float(interaction_probs[max_prob_idx])
+            )
                 
-                # Estimate severity based on probability
-                if max_prob >= self.severity_threshold:
-                    severity = "high"
+        except Exception as e:
+            logger.error(f"Error predicting interaction: {str(e)}")
+            return {
+                'drug1': drug1,
+                'drug2': drug2,
+                'error': str(e)
+            }
+            
+    def predict_interactions_bulk(self, pairs):
+        """
+        Predict potential interactions for many drug pairs at once
+        
+        Known interactions are answered from the graph and all remaining
+        pairs are scored with a single model call.
+        
+        Args:
+            pairs: List of (drug1, drug2) tuples
+            
+        Returns:
+            list: Predicted interaction details, one per pair
+        """
+        try:
+            results = [None] * len(pairs)
+            to_score = []
+            idx1 = []
+            idx2 = []
+            
+            # Answer known pairs and pairs with unknown drugs directly,
+            # resolving feature rows for the rest
+            for i, (drug1, drug2) in enumerate(pairs):
+                edge_data = self._known_edge(drug1, drug2)
+                if edge_data is not None:
+                    results[i] = self._known_interaction(drug1, drug2, edge_data)
+                elif drug1 not in self.drug_index or drug2 not in self.drug_index:
+                    results[i] = self._unknown_drugs(drug1, drug2)
                 else:
-                    severity = "moderate"
+                    to_score.append(i)
+                    idx1.append(self.drug_index[drug1])
+                    idx2.append(self.drug_index[drug2])
                     
-                return {
-                    'drug1': drug1,
-                    'drug2': drug2,
-                    'interaction_predicted': True,
-                    'interaction_type': predicted_type,
-                    'severity': severity,
-                    'confidence': float(max_prob),
-                    'is_known': False
-                }
-            else:
-                return {
-                    'drug1': drug1,
-                    'drug2': drug2,
-                    'interaction_predicted': False,
-                    'confidence': float(1 - max_prob)
-                }
+            if to_score:
+                # Combine feature vectors of every pair into one matrix
+                X = self._pair_features(idx1, idx2)
                 
+                # Most probable interaction type of every pair
+                interaction_probs = self._predict_probs(X)
+                max_prob_idx = interaction_probs.argmax(axis=1)
+                max_prob = interaction_probs[np.arange(len(to_score)), max_prob_idx]
+                
+                for i, type_idx, prob in zip(to_score, max_prob_idx.tolist(), max_prob.tolist()):
+                    drug1, drug2 = pairs[i]
+                    results[i] = self._predicted_interaction(drug1, drug2, type_idx, prob)
+                    
+            return results
+            
         except Exception as e:
-            logger.error(f"Error predicting interaction: {str(e)}")
+            logger.error(f"Error predicting interactions: {str(e)}")
+            return [
+                {'drug1': drug1, 'drug2': drug2, 'error': str(e)}
+                for drug1, drug2 in pairs
+            ]
+            
+    def _pair_features(self, idx1, idx2):
+        """
+        Build dense model input for drug pairs
+        
+        Args:
+            idx1: Feature rows of the first drug of each pair
+            idx2: Feature rows of the second drug of each pair
+            
+        Returns:
+            np.ndarray: Float32 pair features, one row per pair
+        """
+        if self._drug_dense is not None:
+            return np.hstack((self._drug_dense[idx1], self._drug_dense[idx2]))
+            
+        # Densify only the rows of the requested pairs
+        pairs = sparse.hstack([self.drug_features[idx1], self.drug_features[idx2]], format='csr')
+        return pairs.toarray().astype(np.float32)
+        
+    def _known_interaction(self, drug1, drug2, edge_data):
+        """Describe an interaction recorded in the interaction graph"""
+        return {
+            'drug1': drug1,
+            'drug2': drug2,
+            'interaction_type': edge_data['interaction_type'],
+            'severity': edge_data['severity'],
+            'description': edge_data['description'],
+            'is_known': True,
+            'confidence': 1.0
+        }
+        
+    def _unknown_drugs(self, drug1, drug2):
+        """Describe a pair that cannot be scored because a drug is not indexed"""
+        logger.warning(f"One or both drugs not in database: {drug1}, {drug2}")
+        return {
+            'drug1': drug1,
+            'drug2': drug2,
+            'interaction_predicted': False,
+            'reason': "One or both drugs not in database"
+        }
+        
+    def _predicted_interaction(self, drug1, drug2, max_prob_idx, max_prob):
+        """
+        Describe the model's prediction for a drug pair
+        
+        Args:
+            drug1: First drug name
+            drug2: Second drug name
+            max_prob_idx: Index of the most probable interaction type
+            max_prob: Probability of that interaction type
+            
+        Returns:
+            dict: Predicted interaction details
+        """
+        # Only predict interaction if probability exceeds threshold
+        if max_prob >= 0.5:
+            predicted_type = self.interaction_types[max_prob_idx]
+            
+            # Estimate severity based on probability
+            if max_prob >= self.severity_threshold:
+                severity = "high"
+            else:
+                severity = "moderate"
+                
             return {
                 'drug1': drug1,
                 'drug2': drug2,
-                'error': str(e)
+                'interaction_predicted': True,
+                'interaction_type': predicted_type,
+                'severity': severity,
+                'confidence': float(max_prob),
+                'is_known': False
+            }
+        else:
+            return {
+                'drug1': drug1,
+                'drug2': drug2,
+                'interaction_predicted': False,
+                'confidence': float(1 - max_prob)
             }
             
     def predict_interactions_for_prescription(self, medications):
@@ -245,18 +499,15 @@ class InteractionPredictor:
         """
         interactions = []
         
-        # Check all pairs of medications
-        for i in range(len(medications)):
-            for j in range(i+1, len(medications)):
-                drug1 = medications[i]
-                drug2 = medications[j]
-                
-                interaction = self.predict_interaction(drug1, drug2)
+        # Check all pairs of medications in one batch
+        pairs = list(itertools.combinations(medications, 2))
+        
+        for interaction in self.predict_interactions_bulk(pairs):
+            # Add to results if interaction is predicted
+            if interaction.get('interaction_predicted', False) or interaction.get('is_known', False):
+                interactions.append(interaction)
                 
-                # Add to results if interaction is predicted
-                if interaction.get('interaction_predicted', False) or interaction.get('is_known', False):
-                    interactions.append(interaction)
-                    
+
         # Sort by confidence/severity
         interactions.sort(key=lambda x: x.get('confidence', 0), reverse=True)
         
@@ -287,29 +538,22 @@ class InteractionPredictor:
             if idx is None:
                 return []
                 
-            # Get feature vector for current medication
-            med_features = self.drug_features[idx].toarray().flatten()
-            
-            # Calculate similarity to all other medications
-            similarities = []
-            for name, i in self.drug_index.items():
-                if name == medication:
-                    continue
-                    
-                other_features = self.drug_features[i].toarray().flatten()
-                similarity = np.dot(med_features, other_features) / (
-                    np.linalg.norm(med_features) * np.linalg.norm(other_features))
-                
-                similarities.append((name, similarity))
-                
-            # Sort by similarity
-            similarities.sort(key=lambda x: x[1], reverse=True)
-            
-            # Check each potential alternative for interactions
-            for alt_name, similarity in similarities:
+            # Calculate similarity to all other medications at once
+            features = self._drug_features_norm
+            similarities = (features @ features[idx].T).toarray().ravel()
+            similarities[~self._indexed_rows] = -np.inf
+            similarities[idx] = -np.inf
+            
+            # Check each potential alternative for interactions, most
+            # similar first
+            shortlist = n * self.ALTERNATIVE_SHORTLIST_FACTOR
+            for row in _rank_by_similarity(similarities, shortlist):
                 if len(alternatives) >= n:
                     break
                     
+                alt_name = self._drug_names[row]
+                similarity = similarities[row]
+                
                 # Check for interactions with medications to avoid
                 has_interaction = False
                 for med in medications_to_avoid:
@@ -345,9 +589,8 @@ class InteractionPredictor:
         # This would typically use a detailed drug interaction database
         # For demonstration, using a simplified approach with the graph
         
-        if self.interaction_graph.has_edge(drug1, drug2):
-            edge_data = self.interaction_graph.get_edge_data(drug1, drug2)
-            
+        edge_data = self._known_edge(drug1, drug2)
+        if edge_data is not None:
             explanation = (
                 f"Interaction: {drug1} + {drug2}\n"
                 f"Type: {edge_data['interaction_type']}\n"
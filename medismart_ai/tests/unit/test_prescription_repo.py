@@ -0,0 +1,87 @@
+"""
+Unit tests for the MongoDB prescription repository.
+"""
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+from bson.objectid import ObjectId
+from pymongo import errors
+from data.mongodb.prescription_repo import PrescriptionPage, PrescriptionRepository
+
+class TestPrescriptionRepository(unittest.TestCase):
+    """Test suite for PrescriptionRepository inserts."""
+
+    def setUp(self):
+        """Set up a repository on mocked collections."""
+        with patch("data.mongodb.prescription_repo.MongoClient", MagicMock()):
+            self.repo = PrescriptionRepository("mongodb://test", db_name="test_db")
+
+    def test_save_patient_stamps_one_utc_time(self):
+        """Test that created_at and updated_at share one UTC timestamp."""
+        patient_id = ObjectId()
+        self.repo.patients.insert_one.return_value = MagicMock(inserted_id=patient_id)
+
+        saved_id = self.repo.save_patient({"name": "John Doe", "medical_id": "M-1"})
+
+        self.assertEqual(saved_id, str(patient_id))
+        document = self.repo.patients.insert_one.call_args[0][0]
+        self.assertEqual(document["created_at"], document["updated_at"])
+        self.assertEqual(document["created_at"].tzinfo, datetime.timezone.utc)
+
+    def test_save_patient_duplicate_id_raises(self):
+        """Test that an existing _id fails like insert_one and updates nothing."""
+        self.repo.patients.insert_one.side_effect = errors.DuplicateKeyError("E11000 duplicate key", 11000)
+
+        with self.assertRaises(errors.DuplicateKeyError):
+            self.repo.save_patient({"_id": ObjectId(), "name": "John Doe"})
+
+        self.repo.patients.update_one.assert_not_called()
+        self.repo.patients.bulk_write.assert_not_called()
+
+    def test_save_prescription_duplicate_id_raises(self):
+        """Test that saving a prescription with an existing _id raises."""
+        self.repo.prescriptions.insert_one.side_effect = errors.DuplicateKeyError("E11000 duplicate key", 11000)
+
+        with self.assertRaises(errors.DuplicateKeyError):
+            self.repo.save_prescription({"_id": ObjectId(), "patient_id": "p1"})
+
+        self.repo.prescriptions.update_one.assert_not_called()
+
+    def test_bulk_save_uses_ordered_insert_many(self):
+        """Test that bulk saves insert in order and return the inserted IDs."""
+        ids = [ObjectId(), ObjectId()]
+        self.repo.prescriptions.insert_many.return_value = MagicMock(inserted_ids=ids)
+
+        saved_ids = self.repo.bulk_save_prescriptions([{"patient_id": "p1"}, {"patient_id": "p2"}])
+
+        self.assertEqual(saved_ids, [str(i) for i in ids])
+        args, kwargs = self.repo.prescriptions.insert_many.call_args
+        self.assertEqual(len(args[0]), 2)
+        self.assertTrue(kwargs.get("ordered", True))
+        self.repo.prescriptions.bulk_write.assert_not_called()
+
+    def test_page_can_only_be_iterated_once(self):
+        """Test that a second pass over a listing page raises instead of yielding nothing."""
+        docs = [{"_id": ObjectId(), "created_at": datetime.datetime.now(datetime.timezone.utc)}]
+        page = PrescriptionPage(iter(docs), limit=20)
+
+        self.assertEqual(list(page), docs)
+        with self.assertRaises(RuntimeError):
+            list(page)
+
+    def test_page_logs_errors_raised_while_streaming(self):
+        """Test that cursor errors are logged from the iteration that raises them."""
+        def failing_cursor():
+            raise errors.OperationFailure("cursor killed")
+            yield
+
+        page = PrescriptionPage(failing_cursor(), limit=20, label="patient p1")
+
+        with patch("data.mongodb.prescription_repo.logger") as mock_logger:
+            with self.assertRaises(errors.OperationFailure):
+                list(page)
+        mock_logger.error.assert_called_once()
+        self.assertIn("patient p1", mock_logger.error.call_args[0][0])
+
+if __name__ == "__main__":
+    unittest.main()